@@ -0,0 +1,254 @@
+import json
+import time
+import base64
+import random
+import asyncio
+from dataclasses import dataclass, field
+
+import aiohttp
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# Asyncio client for the Chronos inference container.
+#
+# Talks either to a container exposing the SageMaker HTTP contract (local
+# docker-compose or a stub server) or to a deployed SageMaker endpoint through
+# the `sagemaker-runtime` API. Small requests that share the same options can
+# be coalesced into one batched payload and their forecasts split back out.
+# -----------------------------------------------------------------------------
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Batch-wide options. Anything else (covariates, series_ids, hierarchy, sample
+# paths, ...) is tied to the request's own series, so those are never merged.
+COALESCE_OPTIONS = {"prediction_length", "quantile_levels", "outputs", "encoding", "dtype", "precision"}
+
+
+class InferenceError(Exception):
+    """Raised when a request fails after all retries."""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+    max_attempts: int = 4
+    base_delay: float = 0.05
+    max_delay: float = 2.0
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+# -----------------------------------------------------------------------------
+# Transports
+# -----------------------------------------------------------------------------
+class HttpTransport:
+    """POSTs payloads to `<base_url>/invocations` over a pooled aiohttp session."""
+
+    def __init__(self, base_url: str = "http://localhost:8080", pool_size: int = 64, timeout: float = 60.0):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+
+    async def invoke(self, body: bytes) -> tuple:
+        async with self._session.post(
+            f"{self.base_url}/invocations",
+            data=body,
+            headers={"Content-Type": "application/json", "Accept": "application/json"},
+        ) as resp:
+            return resp.status, await resp.read()
+
+
+class SageMakerTransport:
+    """Calls `invoke_endpoint` from a thread pool; botocore pools the connections."""
+
+    def __init__(self, endpoint_name: str, profile: str = None, region: str = None, pool_size: int = 64):
+        self.endpoint_name = endpoint_name
+        self.profile = profile
+        self.region = region
+        self.pool_size = pool_size
+        self._client = None
+
+    async def __aenter__(self):
+        import boto3
+        from botocore.config import Config
+
+        session = boto3.Session(profile_name=self.profile, region_name=self.region)
+        self._client = session.client(
+            "sagemaker-runtime",
+            # Retries are handled by ChronosClient so backoff is applied once.
+            config=Config(max_pool_connections=self.pool_size, retries={"max_attempts": 0}),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        self._client.close()
+
+    async def invoke(self, body: bytes) -> tuple:
+        from botocore.exceptions import ClientError, ConnectionError, HTTPClientError
+
+        def call():
+            try:
+                response = self._client.invoke_endpoint(
+                    EndpointName=self.endpoint_name,
+                    ContentType="application/json",
+                    Accept="application/json",
+                    Body=body,
+                )
+                return 200, response["Body"].read()
+            except ClientError as e:
+                return e.response["ResponseMetadata"]["HTTPStatusCode"], str(e).encode()
+            except (ConnectionError, HTTPClientError) as e:
+                # Endpoint unreachable, connection closed or read timeout: no
+                # status, retried like a network error on the HTTP transport.
+                return None, str(e).encode()
+
+        return await asyncio.to_thread(call)
+
+
+# -----------------------------------------------------------------------------
+# Client
+# -----------------------------------------------------------------------------
+@dataclass
+class _Pending:
+    series: list
+    future: asyncio.Future
+
+
+@dataclass
+class _Batch:
+    options: dict
+    items: list = field(default_factory=list)
+    flush_task: asyncio.Task = None
+
+
+class ChronosClient:
+    """Async client with retries and optional client-side request coalescing.
+
+    With `coalesce=True`, single-series requests sharing the same options and
+    series length, and carrying only batch-wide options, are merged for up to `max_wait` seconds (or `max_batch`
+    series) into one payload; each caller still receives its own forecast.
+    """
+
+    def __init__(self, transport, retry: RetryPolicy = None, coalesce: bool = False,
+                 max_batch: int = 32, max_wait: float = 0.005):
+        self.transport = transport
+        self.retry = retry or RetryPolicy()
+        self.coalesce = coalesce
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._batches = {}
+
+    async def __aenter__(self):
+        await self.transport.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        batches, self._batches = list(self._batches.values()), {}
+        for batch in batches:
+            batch.flush_task.cancel()
+            await self._flush(batch)
+        await self.transport.__aexit__(*exc)
+
+    async def invoke(self, payload: dict) -> dict:
+        """Sends one payload (with retries) and returns the decoded response."""
+        body = json.dumps(payload).encode()
+        for attempt in range(self.retry.max_attempts):
+            try:
+                status, data = await self.transport.invoke(body)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status, data = None, str(e).encode()
+
+            if status == 200:
+                return json.loads(data)
+            if status is not None and status not in RETRYABLE_STATUS:
+                raise InferenceError(data.decode(errors="replace"), status)
+            if attempt + 1 < self.retry.max_attempts:
+                await asyncio.sleep(self.retry.delay(attempt))
+
+        raise InferenceError(f"Request failed after {self.retry.max_attempts} attempts: {data[:200]!r}", status)
+
+    async def forecast(self, payload: dict) -> dict:
+        """Forecasts a payload, coalescing it with others when possible."""
+        series = payload["series"]
+        single = bool(series) and isinstance(series[0], (int, float))
+        options = {k: v for k, v in payload.items() if k != "series"}
+        if (not self.coalesce or not single or payload.get("encoding", "json") != "json"
+                or not COALESCE_OPTIONS.issuperset(options)):
+            return await self.invoke(payload)
+
+        key = (json.dumps(options, sort_keys=True), len(series))
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(options=options)
+            batch.flush_task = asyncio.ensure_future(self._flush_later(key, batch))
+
+        future = asyncio.get_running_loop().create_future()
+        batch.items.append(_Pending(series=series, future=future))
+        if len(batch.items) >= self.max_batch:
+            batch.flush_task.cancel()
+            await self._flush(self._batches.pop(key))
+        return await future
+
+    async def _flush_later(self, key, batch: _Batch):
+        await asyncio.sleep(self.max_wait)
+        if self._batches.get(key) is batch:
+            del self._batches[key]
+            await self._flush(batch)
+
+    async def _flush(self, batch: _Batch):
+        payload = dict(batch.options, series=[p.series for p in batch.items])
+        try:
+            result = await self.invoke(payload)
+        except Exception as e:
+            for p in batch.items:
+                if not p.future.done():
+                    p.future.set_exception(e)
+            return
+
+        forecast = result["forecast"]
+        for i, p in enumerate(batch.items):
+            part = {k: (v[i:i + 1] if k in ("quantiles", "mean") else v) for k, v in forecast.items()}
+            if not p.future.done():
+                p.future.set_result({"forecast": part})
+
+
+def decode_array(encoded: dict) -> np.ndarray:
+    """Decodes a base64 forecast array ({"dtype", "shape", "data"}) into numpy."""
+    dtype = np.dtype(encoded["dtype"]).newbyteorder("<")
+    return np.frombuffer(base64.b64decode(encoded["data"]), dtype=dtype).reshape(encoded["shape"])
+
+
+def percentiles(latencies: list, levels=(50, 90, 95, 99)) -> dict:
+    """Latency percentiles (in ms) from a list of seconds."""
+    if not latencies:
+        return {}
+    ordered = sorted(latencies)
+    return {
+        f"p{p}": ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+        for p in levels
+    }
+
+
+async def timed(coro) -> tuple:
+    """Awaits `coro` and returns (result_or_exception, elapsed seconds)."""
+    start = time.perf_counter()
+    try:
+        result = await coro
+    except Exception as e:
+        result = e
+    return result, time.perf_counter() - start
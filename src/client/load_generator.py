@@ -0,0 +1,100 @@
+import os
+import json
+import asyncio
+import argparse
+from itertools import cycle, islice
+
+from dotenv import load_dotenv
+
+from chronos_client import ChronosClient, HttpTransport, SageMakerTransport, InferenceError, percentiles, timed
+
+# -----------------------------------------------------------------------------
+# Open-loop load generator.
+#
+# Replays a JSONL file (one request payload per line, or {"body": payload}) at a
+# fixed target RPS, independently of how fast responses come back, and reports
+# achieved throughput, error counts and latency percentiles.
+# -----------------------------------------------------------------------------
+load_dotenv()
+
+
+def load_payloads(path: str) -> list:
+    """Reads request payloads from a JSONL file."""
+    payloads = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            body = record.get("body", record)
+            payloads.append(json.loads(body) if isinstance(body, str) else body)
+    if not payloads:
+        raise ValueError(f"No payloads found in {path}")
+    return payloads
+
+
+async def replay(client: ChronosClient, payloads: list, rps: float, total: int) -> dict:
+    """Fires `total` requests at `rps` and collects per-request latencies."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks = []
+    for i, payload in enumerate(islice(cycle(payloads), total)):
+        delay = start + i / rps - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(timed(client.forecast(payload))))
+
+    results = await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+
+    latencies = [t for r, t in results if not isinstance(r, Exception)]
+    errors = {}
+    for r, _ in results:
+        if isinstance(r, Exception):
+            name = f"{type(r).__name__}({r.status})" if isinstance(r, InferenceError) else type(r).__name__
+            errors[name] = errors.get(name, 0) + 1
+
+    return {
+        "requests": total,
+        "succeeded": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "achieved_rps": round(total / elapsed, 2),
+        "latency_ms": {k: round(v, 2) for k, v in percentiles(latencies).items()},
+    }
+
+
+async def run(args) -> dict:
+    payloads = load_payloads(args.requests)
+    if args.endpoint_name:
+        transport = SageMakerTransport(args.endpoint_name, profile=os.getenv("AWS_PROFILE"), pool_size=args.pool_size)
+    else:
+        transport = HttpTransport(args.url, pool_size=args.pool_size)
+
+    async with ChronosClient(transport, coalesce=args.coalesce, max_batch=args.max_batch,
+                             max_wait=args.max_wait_ms / 1000) as client:
+        return await replay(client, payloads, args.rps, args.count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay inference traffic at a target RPS.")
+    parser.add_argument("--requests", required=True, help="JSONL file with request payloads")
+    parser.add_argument("--url", default="http://localhost:8080", help="Container base URL")
+    parser.add_argument("--endpoint-name", default=None, help="Use a SageMaker endpoint instead of --url")
+    parser.add_argument("--rps", type=float, default=10.0)
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--pool-size", type=int, default=64)
+    parser.add_argument("--coalesce", action="store_true")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    target = args.endpoint_name or args.url
+    print(f"🚦 Replaying {args.count} requests at {args.rps} RPS → {target}")
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import json
+import asyncio
+import argparse
+
+from aiohttp import web
+
+# -----------------------------------------------------------------------------
+# Stub implementation of the SageMaker container contract (/ping, /invocations).
+#
+# Returns forecasts of the same shape as inference.py without loading a model,
+# with a configurable service time, so the client and load generator can be
+# exercised without Docker or AWS.
+# -----------------------------------------------------------------------------
+DEFAULT_QUANTILES = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+STATE_KEY = web.AppKey("state", dict)
+
+
+def fake_forecast(payload: dict) -> dict:
+    """Repeats the last observed value of every series over the horizon."""
+    series = payload["series"]
+    if series and isinstance(series[0], (int, float)):
+        series = [series]
+    pred_len = payload.get("prediction_length", 3)
+    levels = payload.get("quantile_levels", DEFAULT_QUANTILES)
+    outputs = payload.get("outputs", ["quantiles", "mean"])
+
+    last = [s[-1] for s in series]
+    forecast = {}
+    if "quantiles" in outputs:
+        forecast["quantiles"] = [[[v] * len(levels) for _ in range(pred_len)] for v in last]
+        forecast["quantile_levels"] = levels
+    if "mean" in outputs:
+        forecast["mean"] = [[v] * pred_len for v in last]
+    return {"forecast": forecast}
+
+
+def create_app(latency: float = 0.01, max_inflight: int = 0) -> web.Application:
+    """Builds the stub app. `max_inflight` > 0 returns 429 beyond that concurrency."""
+    app = web.Application()
+    state = {"inflight": 0, "requests": 0, "series": 0}
+    app[STATE_KEY] = state
+
+    async def ping(request):
+        return web.Response(text="")
+
+    async def invocations(request):
+        if max_inflight and state["inflight"] >= max_inflight:
+            return web.Response(status=429, text="Too many requests")
+        state["inflight"] += 1
+        try:
+            payload = json.loads(await request.read())
+            if "series" not in payload:
+                return web.Response(status=400, text="Missing required key: 'series'")
+            await asyncio.sleep(latency)
+            body = fake_forecast(payload)
+            state["requests"] += 1
+            state["series"] += len(body["forecast"].get("mean", body["forecast"].get("quantiles", [])))
+            return web.json_response(body)
+        finally:
+            state["inflight"] -= 1
+
+    app.router.add_get("/ping", ping)
+    app.router.add_post("/invocations", invocations)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub Chronos inference server.")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.01, help="Service time per request (s)")
+    parser.add_argument("--max-inflight", type=int, default=0)
+    args = parser.parse_args()
+
+    web.run_app(create_app(args.latency, args.max_inflight), port=args.port)
@@ -0,0 +1,166 @@
+import os
+import time
+import math
+import heapq
+import asyncio
+import itertools
+from collections import deque
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# Admission control and deadline-aware scheduling for /invocations.
+#
+# Requests wait in a priority queue instead of the executor's FIFO. Interactive
+# requests (explicitly flagged, or small payloads) are served before bulk ones,
+# earliest deadline first within a class. Work whose deadline has passed, or
+# whose caller has disconnected, is dropped before the forward pass.
+# -----------------------------------------------------------------------------
+SMALL_REQUEST_BYTES = int(os.getenv("SMALL_REQUEST_BYTES", "16384"))
+# SageMaker's real-time invocation timeout; 0 means no deadline.
+DEFAULT_DEADLINE_MS = float(os.getenv("DEFAULT_DEADLINE_MS", "60000")) or None
+
+PRIORITIES = {"interactive": 0, "bulk": 1}
+
+
+class QueueFullError(Exception):
+    """Raised when the admission queue is at capacity."""
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a request's deadline passes before it reaches the model."""
+
+
+def parse_request_hints(headers, body_size: int) -> tuple:
+    """Reads (priority, deadline_ms) from the request headers.
+
+    SageMaker only forwards custom data through X-Amzn-SageMaker-Custom-Attributes,
+    e.g. "priority=bulk,deadline_ms=500"; X-Priority / X-Deadline-Ms are accepted
+    for direct calls.
+    """
+    hints = {}
+    for pair in headers.get("X-Amzn-SageMaker-Custom-Attributes", "").split(","):
+        key, _, value = pair.partition("=")
+        if value:
+            hints[key.strip().lower()] = value.strip()
+
+    priority = headers.get("X-Priority", hints.get("priority"))
+    if priority not in PRIORITIES:
+        priority = "interactive" if body_size <= SMALL_REQUEST_BYTES else "bulk"
+
+    deadline_ms = headers.get("X-Deadline-Ms", hints.get("deadline_ms"))
+    if deadline_ms is None:
+        return priority, DEFAULT_DEADLINE_MS
+    try:
+        deadline_ms = float(deadline_ms)
+    except ValueError:
+        raise ValueError(f"deadline_ms must be a number of milliseconds, got {deadline_ms!r}") from None
+    return priority, check_deadline(deadline_ms)
+
+
+def check_deadline(deadline_ms):
+    """None (no deadline) or a positive, finite number of milliseconds."""
+    if deadline_ms is not None and not (math.isfinite(deadline_ms) and deadline_ms > 0):
+        raise ValueError(f"deadline_ms must be a positive, finite number of milliseconds, got {deadline_ms!r}")
+    return deadline_ms
+
+
+class AdmissionController:
+    """Schedules work onto `concurrency` executor slots by (priority, deadline)."""
+
+    def __init__(self, executor, concurrency: int, max_queue_depth: int, window: int = 1000):
+        self.executor = executor
+        self.concurrency = concurrency
+        self.max_queue_depth = max_queue_depth
+        self._heap = []
+        self._seq = itertools.count()
+        self._ready = None
+        self._workers = []
+        self._running = 0
+        self._queue_ms = {p: deque(maxlen=window) for p in PRIORITIES}
+        self._counts = {k: 0 for k in ("admitted", "completed", "rejected", "expired", "cancelled")}
+        self._published = dict(self._counts)
+
+    async def start(self):
+        self._ready = asyncio.Semaphore(0)
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    async def submit(self, fn, *args, priority: str = "interactive", deadline_ms: float = DEFAULT_DEADLINE_MS):
+        """Queues `fn(*args)` and returns its result once a slot runs it.
+
+        `deadline_ms` is relative to now; None means the request never expires.
+        """
+        check_deadline(deadline_ms)
+        if len(self._heap) + self._running >= self.max_queue_depth:
+            self._counts["rejected"] += 1
+            raise QueueFullError(f"Admission queue is full ({self.max_queue_depth} requests)")
+
+        now = time.monotonic()
+        deadline = now + deadline_ms / 1000 if deadline_ms is not None else float("inf")
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (PRIORITIES[priority], deadline, next(self._seq), now, priority, future, fn, args))
+        self._counts["admitted"] += 1
+        self._ready.release()
+        return await future
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._ready.acquire()
+            _, deadline, _, enqueued, priority, future, fn, args = heapq.heappop(self._heap)
+
+            # The caller went away (client timeout / disconnect): nothing to do.
+            if future.cancelled():
+                self._counts["cancelled"] += 1
+                continue
+
+            now = time.monotonic()
+            self._queue_ms[priority].append((now - enqueued) * 1000)
+            if now > deadline:
+                self._counts["expired"] += 1
+                future.set_exception(DeadlineExceededError(
+                    f"Deadline exceeded after {(now - enqueued) * 1000:.0f} ms in queue"
+                ))
+                continue
+
+            self._running += 1
+            try:
+                result = await loop.run_in_executor(self.executor, fn, *args)
+                if not future.cancelled():
+                    future.set_result(result)
+                self._counts["completed"] += 1
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self._running -= 1
+
+    def metrics(self) -> dict:
+        """Queue depth, outcome counters and queue-time percentiles per priority."""
+        queue_time = {}
+        for priority, samples in self._queue_ms.items():
+            if samples:
+                p50, p90, p99 = np.percentile(samples, [50, 90, 99]).round(2).tolist()
+                queue_time[priority] = {"p50": p50, "p90": p90, "p99": p99, "n": len(samples)}
+        return {
+            "queued": len(self._heap),
+            "running": self._running,
+            **self._counts,
+            "queue_time_ms": queue_time,
+        }
+
+    def interval_metrics(self) -> dict:
+        """Flat metrics for cloudwatch.publish: counters since the previous call, queue state and p50/p99."""
+        metrics = {k: v - self._published[k] for k, v in self._counts.items()}
+        self._published = dict(self._counts)
+        metrics.update(queued=len(self._heap), running=self._running)
+        for priority, samples in self._queue_ms.items():
+            if samples:
+                p50, p99 = np.percentile(samples, [50, 99]).tolist()
+                metrics[f"{priority}_queue_p50_ms"], metrics[f"{priority}_queue_p99_ms"] = p50, p99
+        return metrics
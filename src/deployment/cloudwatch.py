@@ -0,0 +1,81 @@
+import os
+import json
+import time
+import socket
+
+# -----------------------------------------------------------------------------
+# Metric publishing for the serving container.
+#
+# On SageMaker only /ping and /invocations are reachable, so operational
+# metrics leave the container through its logs: each publish prints one line in
+# CloudWatch Embedded Metric Format (EMF), which Logs Insights can query and
+# metric filters can turn into metrics. With CLOUDWATCH_PUT_METRICS=1 the
+# values are also sent with PutMetricData (needs cloudwatch:PutMetricData on
+# the endpoint's role).
+# -----------------------------------------------------------------------------
+CLOUDWATCH_NAMESPACE   = os.getenv("CLOUDWATCH_NAMESPACE", "ChronosServing")
+CLOUDWATCH_PUT_METRICS = os.getenv("CLOUDWATCH_PUT_METRICS", "0") == "1"
+METRICS_INTERVAL       = float(os.getenv("METRICS_INTERVAL_SECONDS", "60"))  # 0 disables publishing
+ENDPOINT_NAME          = os.getenv("ENDPOINT_NAME", os.getenv("AWS_SAGEMAKER_ENDPOINT_NAME", "local"))
+
+# Published in Count units; event counters go out as per-interval deltas so
+# CloudWatch can sum them across workers and hosts.
+COUNT_METRICS = {"admitted", "completed", "rejected", "expired", "cancelled", "queued", "running",
+                 "requests", "dropped", "actuals", "unmatched_actuals", "expired_forecasts", "untracked_series"}
+
+_client = None
+
+
+def unit_of(name: str) -> str:
+    if name.endswith("_ms"):
+        return "Milliseconds"
+    return "Count" if name in COUNT_METRICS else "None"
+
+
+def emf_record(metrics: dict, dimensions: dict, namespace: str = CLOUDWATCH_NAMESPACE) -> dict:
+    """One EMF log record for `metrics` ({name: value}); None values are skipped."""
+    metrics = {k: float(v) for k, v in metrics.items() if v is not None}
+    return {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": namespace,
+                "Dimensions": [sorted(dimensions)],
+                "Metrics": [{"Name": k, "Unit": unit_of(k)} for k in metrics],
+            }],
+        },
+        **dimensions,
+        **metrics,
+    }
+
+
+def publish(metrics: dict, **dimensions):
+    """Prints the metrics as an EMF line (and sends them with PutMetricData if enabled)."""
+    dimensions = {"Endpoint": ENDPOINT_NAME, "Host": socket.gethostname(), **dimensions}
+    record = emf_record(metrics, dimensions)
+    print(json.dumps(record), flush=True)
+    if CLOUDWATCH_PUT_METRICS:
+        put_metric_data(record, dimensions)
+
+
+def put_metric_data(record: dict, dimensions: dict):
+    global _client
+    if _client is None:
+        import boto3
+        _client = boto3.client("cloudwatch")
+    names = [m["Name"] for m in record["_aws"]["CloudWatchMetrics"][0]["Metrics"]]
+    data = [
+        {
+            "MetricName": name,
+            "Dimensions": [{"Name": k, "Value": str(v)} for k, v in dimensions.items()],
+            "Value": record[name],
+            "Unit": unit_of(name),
+        }
+        for name in names
+    ]
+    try:
+        # PutMetricData takes up to 1000 values per call; keep well under it.
+        for i in range(0, len(data), 500):
+            _client.put_metric_data(Namespace=CLOUDWATCH_NAMESPACE, MetricData=data[i:i + 500])
+    except Exception as e:
+        print(f"[CloudWatch] put_metric_data failed: {e}", flush=True)
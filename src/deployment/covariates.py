@@ -0,0 +1,138 @@
+import os
+import json
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# Known-covariate regressor shared by training and serving.
+#
+# Chronos-Bolt is univariate. Training fits target ~ f(covariates) on the
+# history, fine-tunes Chronos on the residual target - f(covariates) and ships
+# f in the model artifact. Serving subtracts f over the context and adds it
+# back over the horizon, so the model always sees the residual it was trained
+# on. f is a ridge regression on a piecewise-linear (hinge) basis of each
+# standardised covariate, which follows curved responses such as a turbine's
+# power curve. train_entrypoint.py imports this module from the training image.
+#
+# Past covariates are only observed up to the forecast origin. The regressor
+# sees them `lag` (the training prediction_length) steps late, so every step of
+# the horizon is explained by values already observed at the origin. Callers
+# lag them with lag_frame (time-ordered DataFrames) or lag_request (packed
+# request arrays) before predict.
+# -----------------------------------------------------------------------------
+REGRESSOR_FILE = "covariate_regressor.json"
+
+
+class CovariateRegressor:
+    """Additive hinge-basis ridge regression over named covariates."""
+
+    def __init__(self, names: list, mean: list, scale: list, knots: list, coef: list, intercept: float,
+                 past_names: list = (), lag: int = 0):
+        self.names = list(names)
+        self.past_names = list(past_names)
+        self.lag = int(lag)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.knots = [np.asarray(k, dtype=np.float64) for k in knots]
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+
+    @property
+    def columns(self) -> list:
+        """Known then past covariates, the column order of predict."""
+        return self.names + self.past_names
+
+    @classmethod
+    def fit(cls, X: np.ndarray, y: np.ndarray, names: list, n_knots: int = 16, ridge: float = 1.0,
+            past_names: list = (), lag: int = 0):
+        """Fits on (N, C) covariates (past ones already lagged) and (N,) targets.
+
+        Rows with a missing target are skipped.
+        """
+        X, y = np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        keep = np.isfinite(y) & np.isfinite(X).all(axis=1)
+        X, y = X[keep], y[keep]
+        if len(y) == 0:
+            raise ValueError("No rows with both a target and all covariates to fit the regressor on")
+
+        mean, scale = X.mean(axis=0), X.std(axis=0)
+        scale = np.where(scale > 0, scale, 1.0)
+        z = (X - mean) / scale
+        # Knots at interior quantiles, so each hinge covers a similar share of the data.
+        levels = np.linspace(0, 1, n_knots + 2)[1:-1]
+        knots = [np.unique(np.quantile(z[:, c], levels)) for c in range(z.shape[1])]
+
+        regressor = cls(names, mean, scale, knots, np.zeros(0), 0.0, past_names, lag)
+        # Centring leaves the intercept out of the penalty.
+        basis = regressor.basis(X)
+        basis_mean = basis.mean(axis=0)
+        centred = basis - basis_mean
+        gram = centred.T @ centred + ridge * np.eye(basis.shape[1])
+        regressor.coef = np.linalg.solve(gram, centred.T @ (y - y.mean()))
+        regressor.intercept = float(y.mean() - basis_mean @ regressor.coef)
+        return regressor
+
+    def basis(self, X: np.ndarray) -> np.ndarray:
+        """(..., C) covariates -> (..., F) features: each standardised covariate plus its hinges."""
+        z = (np.asarray(X, dtype=np.float64) - self.mean) / self.scale
+        columns = []
+        for c, knots in enumerate(self.knots):
+            columns.append(z[..., c:c + 1])
+            columns.append(np.maximum(z[..., c:c + 1] - knots, 0))
+        return np.concatenate(columns, axis=-1)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Covariate effect for (..., C) covariates, shape (...)."""
+        return self.basis(X) @ self.coef + self.intercept
+
+    def lag_frame(self, df, item_column: str = None):
+        """lag_frame with this regressor's past covariates and lag."""
+        return lag_frame(df, self.past_names, self.lag, item_column)
+
+    def lag_request(self, past: np.ndarray, pred_len: int) -> np.ndarray:
+        """(B, P, T) past covariates -> (B, P, T + pred_len), `lag` steps late.
+
+        Edge values fill the start and, when `pred_len` exceeds the trained lag,
+        the horizon steps past the last observation.
+        """
+        T = past.shape[2]
+        return past[:, :, np.clip(np.arange(T + pred_len) - self.lag, 0, T - 1)]
+
+    def to_dict(self) -> dict:
+        return {
+            "names": self.names,
+            "mean": self.mean.tolist(),
+            "scale": self.scale.tolist(),
+            "knots": [k.tolist() for k in self.knots],
+            "coef": self.coef.tolist(),
+            "intercept": self.intercept,
+            "past_names": self.past_names,
+            "lag": self.lag,
+        }
+
+    def save(self, model_dir: str):
+        with open(os.path.join(model_dir, REGRESSOR_FILE), "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def lag_frame(df, past_names: list, lag: int, item_column: str = None):
+    """Copy of a time-ordered DataFrame with each past covariate `lag` rows late within its item.
+
+    The first rows of an item take its earliest value.
+    """
+    if not past_names:
+        return df
+    df = df.copy()
+    groups = df[item_column] if item_column is not None else np.zeros(len(df))
+    lagged = df.groupby(groups)[past_names].shift(lag)
+    df[past_names] = lagged.groupby(groups).bfill()
+    return df
+
+
+def load_regressor(model_dir: str):
+    """The regressor stored in a model directory, or None for a model trained without covariates."""
+    path = os.path.join(model_dir, REGRESSOR_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return CovariateRegressor(**json.load(f))
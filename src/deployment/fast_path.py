@@ -0,0 +1,66 @@
+import os
+import time
+import itertools
+
+# -----------------------------------------------------------------------------
+# Opt-in compiled fast path (FAST_PATH=1).
+#
+# The Chronos model's forward is compiled with torch.compile for a fixed grid
+# of (batch, context) shapes during warm-up. At request time, inputs whose
+# shape is in the grid go through the compiled graph; anything else falls
+# back to the eager forward, so an unusual request never triggers a compile.
+# -----------------------------------------------------------------------------
+FAST_PATH     = os.getenv("FAST_PATH", "0") == "1"
+BATCH_BUCKETS = tuple(int(b) for b in os.getenv("FAST_PATH_BATCH_BUCKETS", "1,8,32").split(",") if b)
+COMPILE_MODE  = os.getenv("FAST_PATH_COMPILE_MODE", "default")
+
+
+def log(msg: str):
+    print(f"[FastPath] {time.strftime('%Y-%m-%d %H:%M:%S')} | {msg}", flush=True)
+
+
+def batch_bucket(batch: int, buckets: tuple = BATCH_BUCKETS) -> int:
+    """Smallest batch bucket that fits `batch` (or `batch` itself)."""
+    for bucket in buckets:
+        if bucket >= batch:
+            return bucket
+    return batch
+
+
+def enable(pipe, context_buckets: tuple, batch_buckets: tuple = BATCH_BUCKETS,
+           prediction_length: int = 24) -> dict:
+    """Compiles `pipe.model` for every (batch, context) bucket and installs the dispatcher.
+
+    Returns the warm-up compile time per shape in seconds.
+    """
+    import torch
+    import torch._dynamo
+
+    model = pipe.model
+    eager_forward = model.forward
+    compiled_forward = torch.compile(eager_forward, dynamic=False, mode=COMPILE_MODE)
+    compiled_shapes = set()
+
+    # One graph per shape; make sure dynamo keeps them all.
+    shapes = list(itertools.product(batch_buckets, context_buckets))
+    torch._dynamo.config.cache_size_limit = max(torch._dynamo.config.cache_size_limit, len(shapes) + 8)
+
+    def forward(*args, **kwargs):
+        context = kwargs["context"] if "context" in kwargs else args[0]
+        if tuple(context.shape) in compiled_shapes:
+            return compiled_forward(*args, **kwargs)
+        return eager_forward(*args, **kwargs)
+
+    model.forward = forward
+
+    timings = {}
+    with torch.inference_mode():
+        for batch, length in shapes:
+            compiled_shapes.add((batch, length))
+            start = time.perf_counter()
+            pipe.predict_quantiles(torch.zeros(batch, length), prediction_length=prediction_length)
+            timings[(batch, length)] = time.perf_counter() - start
+
+    log(f"Compiled {len(shapes)} shapes in {sum(timings.values()):.1f}s | "
+        f"batch buckets {batch_buckets}, context buckets {context_buckets}")
+    return timings
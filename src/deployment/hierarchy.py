@@ -0,0 +1,87 @@
+from statistics import NormalDist
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# Bottom-up hierarchical aggregation (turbine -> farm -> portfolio).
+#
+# Leaves are forecast in one batch; every aggregate node is a row of a summing
+# matrix S (n_nodes x n_leaves), so all levels are reconciled with a couple of
+# matrix products and the means are coherent by construction.
+# -----------------------------------------------------------------------------
+AGGREGATIONS = ("comonotonic", "independent")
+
+
+def summing_matrix(leaf_ids: list, hierarchy: dict) -> tuple:
+    """Builds S for `hierarchy` ({node: [children]}) over `leaf_ids`.
+
+    Returns (node_ids, S) where node_ids are the aggregate nodes in definition
+    order and S has one row per aggregate node.
+    """
+    if not isinstance(hierarchy, dict) or not hierarchy:
+        raise ValueError("'hierarchy' must be a non-empty object of {node: [children]}")
+    for node, children in hierarchy.items():
+        if not isinstance(children, list) or not children:
+            raise ValueError(f"Hierarchy node '{node}' must list at least one child, got {children!r}")
+        if not all(isinstance(child, str) for child in children):
+            raise ValueError(f"Hierarchy node '{node}' has non-string children {children}")
+
+    leaf_index = {leaf: i for i, leaf in enumerate(leaf_ids)}
+    if len(leaf_index) != len(leaf_ids):
+        raise ValueError("'leaf_ids' must be unique")
+    overlap = set(hierarchy) & set(leaf_index)
+    if overlap:
+        raise ValueError(f"Hierarchy nodes cannot also be leaves: {sorted(overlap)}")
+
+    rows, visiting = {}, set()
+
+    def resolve(node):
+        if node in leaf_index:
+            row = np.zeros(len(leaf_ids), dtype=np.float32)
+            row[leaf_index[node]] = 1
+            return row
+        if node in rows:
+            return rows[node]
+        if node not in hierarchy:
+            raise ValueError(f"Unknown node '{node}' in hierarchy")
+        if node in visiting:
+            raise ValueError(f"Cycle in hierarchy at node '{node}'")
+        visiting.add(node)
+        rows[node] = np.sum([resolve(child) for child in hierarchy[node]], axis=0)
+        visiting.discard(node)
+        return rows[node]
+
+    node_ids = list(hierarchy)
+    S = np.stack([resolve(node) for node in node_ids]) if node_ids else np.zeros((0, len(leaf_ids)), np.float32)
+    return node_ids, S
+
+
+def aggregate(S: np.ndarray, quantiles: np.ndarray, mean: np.ndarray, levels: list,
+              method: str = "comonotonic") -> tuple:
+    """Aggregates leaf forecasts to every node of S.
+
+    quantiles: (n_leaves, H, Q), mean: (n_leaves, H).
+
+    `comonotonic` sums the leaf quantiles, i.e. assumes leaves move together
+    (a reasonable default for turbines driven by the same wind).
+    `independent` treats leaves as independent: variances add and the node
+    quantiles follow a normal around the summed mean.
+    """
+    agg_mean = np.einsum("nl,lh->nh", S, mean)
+
+    if method == "comonotonic":
+        agg_q = np.einsum("nl,lhq->nhq", S, quantiles)
+    elif method == "independent":
+        if len(levels) < 2:
+            raise ValueError("'independent' aggregation needs at least two quantile levels")
+        # Read each leaf's spread off its outermost quantiles.
+        lo, hi = int(np.argmin(levels)), int(np.argmax(levels))
+        z_span = NormalDist().inv_cdf(levels[hi]) - NormalDist().inv_cdf(levels[lo])
+        sd = (quantiles[..., hi] - quantiles[..., lo]) / z_span
+        agg_sd = np.sqrt(np.einsum("nl,lh->nh", S, sd ** 2))
+        z = np.array([NormalDist().inv_cdf(q) for q in levels], dtype=np.float32)
+        agg_q = agg_mean[..., None] + agg_sd[..., None] * z
+    else:
+        raise ValueError(f"Unknown aggregation '{method}', expected one of {list(AGGREGATIONS)}")
+
+    return agg_q.astype(np.float32), agg_mean.astype(np.float32)
@@ -1,11 +1,51 @@
 import os
 import json
 import time
-import torch
-from chronos import ChronosBoltPipeline
+import uuid
+import base64
+from itertools import chain
+
+import numpy as np
+
+import covariates as covariate_model
+import fast_path
+import hierarchy
+import monitoring
+import runtime_tuning
+import sampling
+import student
+
+# torch and chronos take seconds to import; they are imported inside the
+# handlers so the server can bind its port (and answer /ping) right away.
 
 MODEL_DIR = "/opt/ml/model"  # This is where your local model is mounted
 
+DEFAULT_QUANTILES = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+OUTPUT_KEYS = ("quantiles", "mean")
+# Besides forecasts, /invocations takes actuals for earlier forecasts and
+# monitoring queries: SageMaker only routes /ping and /invocations to the container.
+MODES = ("forecast", "actuals", "monitoring")
+OUTPUT_DTYPES = {"float32": np.float32, "float16": np.float16}
+# float16 JSON output is rounded to the digits the dtype actually carries.
+FLOAT16_DIGITS = np.finfo(np.float16).precision + 1
+MAX_PRECISION = 15  # decimals float64 can represent
+# Python types json.loads produces for numbers and null (bool is excluded on purpose).
+VALUE_TYPES = {int, float, type(None)}
+
+# Context policy: histories are truncated to the model's context window and
+# left-padded with NaN (treated as missing by Chronos) up to the next bucket,
+# so the forward pass only ever sees a handful of input shapes.
+# MAX_CONTEXT_LENGTH=0 disables truncation, an empty CONTEXT_BUCKETS disables padding.
+MAX_CONTEXT_LENGTH = int(os.getenv("MAX_CONTEXT_LENGTH", "2048"))
+CONTEXT_BUCKETS = tuple(int(b) for b in os.getenv("CONTEXT_BUCKETS", "64,128,256,512,1024,2048").split(",") if b)
+
+# Request limits (0 disables). Async inference requests are chunked, so they skip the batch limit.
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1024"))
+MAX_SERIES_LENGTH = int(os.getenv("MAX_SERIES_LENGTH", "100000"))
+
+# Covariate regressor shipped with the model (covariates.py); set by model_fn.
+COVARIATE_REGRESSOR = None
+
 
 def log(msg: str):
     """Helper to print logs with timestamps (visible in CloudWatch or local console)."""
@@ -17,63 +57,522 @@ def model_fn(model_dir: str):
     if not os.path.exists(model_dir):
         raise FileNotFoundError(f"❌ Model not found in {model_dir}")
 
+    # No-op when serve.py already tuned this worker. The numpy student never imports torch.
+    runtime_tuning.apply_profile(configure_torch=not student.is_student(model_dir))
+
+    # A model fine-tuned on covariate residuals needs its regressor to serve.
+    global MAX_CONTEXT_LENGTH, COVARIATE_REGRESSOR
+    COVARIATE_REGRESSOR = covariate_model.load_regressor(model_dir)
+    if COVARIATE_REGRESSOR is not None:
+        log(f"Loaded covariate regressor over {COVARIATE_REGRESSOR.names}")
+
+    if student.is_student(model_dir):
+        model = student.StudentModel(model_dir)
+        MAX_CONTEXT_LENGTH = model.context_length
+        log(f"Loaded distilled student from: {model_dir} | context {model.context_length}, "
+            f"horizon {model.prediction_length}")
+        return model
+
+    from chronos import ChronosBoltPipeline
+
     log(f"Loading Chronos model from: {model_dir}")
     pipe = ChronosBoltPipeline.from_pretrained(model_dir, device_map="cpu")
-    log("Model successfully loaded.")
+
+    # Never keep more history than the model can attend to.
+    model_context = getattr(getattr(pipe.model, "chronos_config", None), "context_length", None)
+    if model_context and (not MAX_CONTEXT_LENGTH or MAX_CONTEXT_LENGTH > model_context):
+        MAX_CONTEXT_LENGTH = model_context
+    log(f"Model successfully loaded. | context policy: max {MAX_CONTEXT_LENGTH}, buckets {CONTEXT_BUCKETS}")
+
+    if fast_path.FAST_PATH:
+        fast_path.enable(pipe, tuple(b for b in CONTEXT_BUCKETS if b <= (MAX_CONTEXT_LENGTH or b)))
     return pipe
 
-def input_fn(request_body, content_type):
-    """Parses the received input JSON."""
+
+def context_bucket(length: int) -> int:
+    """Smallest configured bucket that fits `length` (or `length` itself)."""
+    for bucket in CONTEXT_BUCKETS:
+        if bucket >= length:
+            return bucket
+    return length
+
+
+def to_float32(flat: list):
+    """Converts the flattened batch in one vectorised pass; None becomes NaN.
+
+    Returns None when some value is not a JSON number or null. The value types
+    are checked before the cast, which would otherwise accept numeric strings
+    ("1.5") and booleans, alone or mixed with numbers.
+    """
+    if not set(map(type, flat)) <= VALUE_TYPES:
+        return None
+    try:
+        values = np.asarray(flat, dtype=np.float32)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    return values if values.ndim == 1 else None
+
+
+def is_number(value) -> bool:
+    """Slow per-value check, only used to locate a bad value for the error message."""
+    if value is None:
+        return True
+    if type(value) not in VALUE_TYPES:
+        return False
+    try:
+        float(value)
+    except OverflowError:
+        return False
+    return True
+
+
+def is_integer(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def is_real(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def value_error(flat_index: int, lengths: np.ndarray, raw_lengths: np.ndarray, problem: str) -> ValueError:
+    """Error naming the series and (untruncated) position of a flattened value."""
+    ends = np.cumsum(lengths)
+    series = int(np.searchsorted(ends, flat_index, side="right"))
+    position = int(flat_index - (ends[series] - lengths[series]) + raw_lengths[series] - lengths[series])
+    return ValueError(f"Series {series}, position {position}: {problem}")
+
+
+def pack_series(rows: list, max_batch_size: int = MAX_BATCH_SIZE) -> tuple:
+    """Validates the batch, applies the context policy and packs it into a (B, bucket) float32 array.
+
+    Truncation happens on the Python lists, before any conversion, so long
+    histories cost nothing beyond the JSON parse. The values of the whole batch
+    are then converted and checked at once. Returns (packed, raw lengths).
+    """
+    if max_batch_size and len(rows) > max_batch_size:
+        raise ValueError(f"Batch has {len(rows)} series, the limit is {max_batch_size}")
+    for i, row in enumerate(rows):
+        if not isinstance(row, (list, tuple)):
+            raise ValueError(f"Series {i}: expected a list of numbers, got {type(row).__name__}")
+
+    raw_lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+    empty = np.flatnonzero(raw_lengths == 0)
+    if empty.size:
+        raise ValueError(f"Series {empty[0]} is empty")
+    if MAX_SERIES_LENGTH:
+        too_long = np.flatnonzero(raw_lengths > MAX_SERIES_LENGTH)
+        if too_long.size:
+            raise ValueError(f"Series {too_long[0]} has {raw_lengths[too_long[0]]} values, "
+                             f"the limit is {MAX_SERIES_LENGTH}")
+
+    lengths = raw_lengths
+    if MAX_CONTEXT_LENGTH and raw_lengths.max() > MAX_CONTEXT_LENGTH:
+        rows = [row[-MAX_CONTEXT_LENGTH:] for row in rows]
+        lengths = np.minimum(raw_lengths, MAX_CONTEXT_LENGTH)
+
+    flat = list(chain.from_iterable(rows))
+    values = to_float32(flat)
+    if values is None:
+        # Error path only: find the first offending value.
+        index = next((i for i, v in enumerate(flat) if not is_number(v)), 0)
+        raise value_error(index, lengths, raw_lengths, f"expected a number or null, got {flat[index]!r}")
+    infinite = np.flatnonzero(np.isinf(values))
+    if infinite.size:
+        raise value_error(infinite[0], lengths, raw_lengths, "infinite values are not allowed")
+
+    width = int(lengths.max())
+    if (lengths == width).all():
+        packed = values.reshape(len(rows), width)
+    else:
+        # Scatter the ragged rows right-aligned into a NaN-filled block.
+        starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        shift = np.repeat(width - lengths, lengths)
+        packed = np.full((len(rows), width), np.nan, dtype=np.float32)
+        packed[np.repeat(np.arange(len(rows)), lengths), np.arange(len(values)) - starts + shift] = values
+
+    pad = context_bucket(width) - width
+    if pad:
+        packed = np.pad(packed, ((0, 0), (pad, 0)), constant_values=np.nan)
+    return packed, raw_lengths
+
+
+def pack_covariates(covariates: np.ndarray, context_length: int, pred_len: int) -> np.ndarray:
+    """Aligns covariates with a packed context: same truncation, edge-padded on the left."""
+    covariates = covariates[:, :, -(min(covariates.shape[2] - pred_len, context_length) + pred_len):]
+    pad = context_length + pred_len - covariates.shape[2]
+    if pad:
+        covariates = np.pad(covariates, ((0, 0), (0, 0), (pad, 0)), mode="edge")
+    return covariates
+
+def covariate_array(data: dict, key: str, names: list, shape: tuple, raw_lengths: np.ndarray) -> np.ndarray:
+    """Validates one (batch, len(names), length) covariate field of a request."""
+    values = data.get(key)
+    if values is None:
+        raise ValueError(f"This model needs '{key}' {names}")
+    values = np.asarray(values, dtype=np.float32) if isinstance(values, list) else np.empty(0)
+    if values.ndim == 2:
+        values = values[None, :, :]
+    expected = (shape[0], len(names), shape[1])
+    if values.shape != expected or (raw_lengths != raw_lengths.max()).any():
+        raise ValueError(
+            f"'{key}' must have shape (batch, n_covariates, length) = {expected} for covariates {names}, "
+            f"got {values.shape}, and all series must share one length"
+        )
+    not_finite = np.flatnonzero(~np.isfinite(values).all(axis=(1, 2)))
+    if not_finite.size:
+        raise ValueError(f"Series {not_finite[0]}: {key} contain missing or infinite values")
+    return values
+
+
+def parse_covariates(data: dict, shape: tuple, raw_lengths: np.ndarray, pred_len: int):
+    """Known and lagged past covariates as one packed (B, C, context + horizon) array, or None."""
+    regressor = COVARIATE_REGRESSOR
+    if regressor is None:
+        for key in ("covariates", "past_covariates"):
+            if data.get(key) is not None:
+                raise ValueError(f"This model was trained without covariates; remove '{key}' from the request")
+        return None
+    for key, names in (("covariates", regressor.names), ("past_covariates", regressor.past_names)):
+        if not names and data.get(key) is not None:
+            raise ValueError(f"This model has no {key.replace('_', ' ')}; remove '{key}' from the request")
+
+    raw_length, packed = int(raw_lengths.max()), []
+    if regressor.names:
+        known = covariate_array(data, "covariates", regressor.names, (shape[0], raw_length + pred_len), raw_lengths)
+        packed.append(known)
+    if regressor.past_names:
+        past = covariate_array(data, "past_covariates", regressor.past_names, (shape[0], raw_length), raw_lengths)
+        packed.append(regressor.lag_request(past, pred_len))
+    covariates = packed[0] if len(packed) == 1 else np.concatenate(packed, axis=1)
+    return pack_covariates(covariates, shape[1], pred_len)
+
+
+def parse_actuals(data: dict) -> dict:
+    """Validates {"mode": "actuals", "forecast_id", "series_ids", "actuals"}."""
+    forecast_id = data.get("forecast_id")
+    if not isinstance(forecast_id, str) or not forecast_id:
+        raise ValueError("Actuals need the 'forecast_id' returned with the forecast")
+    ids, actuals = data.get("series_ids"), data.get("actuals")
+    if not isinstance(ids, list) or not isinstance(actuals, list) or len(ids) != len(actuals):
+        raise ValueError("'series_ids' and 'actuals' must be lists of the same length")
+    rows = []
+    for i, row in enumerate(actuals):
+        values = to_float32(row) if isinstance(row, list) else None
+        if values is None:
+            raise ValueError(f"Actuals {i}: expected a list of numbers or null")
+        rows.append(values)
+    return {"mode": "actuals", "forecast_id": forecast_id, "series_ids": [str(i) for i in ids], "actuals": rows}
+
+
+def input_fn(request_body, content_type, max_batch_size: int = MAX_BATCH_SIZE):
+    """Parses and validates the received input JSON."""
     log("📥 Received new inference request")
 
     try:
         data = json.loads(request_body)
-        log(f"Raw request: {data}")
+        # Log the request shape, not its contents: histories can be long.
+        log(f"Request keys: {sorted(data)}")
+
+        mode = data.get("mode", "forecast")
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}', expected one of {list(MODES)}")
+        if mode == "actuals":
+            return parse_actuals(data)
+        if mode == "monitoring":
+            return {"mode": "monitoring"}
 
         if "series" not in data:
             raise ValueError("Missing required key: 'series'")
 
-        series = data["series"]
+        rows = data["series"]
+        if not isinstance(rows, list) or not rows:
+            raise ValueError("'series' must be a non-empty list")
+        if not isinstance(rows[0], (list, tuple)):
+            rows = [rows]
+
         pred_len = data.get("prediction_length", 3)
+        if not isinstance(pred_len, int) or isinstance(pred_len, bool) or pred_len < 1:
+            raise ValueError(f"'prediction_length' must be a positive integer, got {pred_len!r}")
+
+        # Validate and pack the whole batch into one contiguous float32 array up front.
+        series, raw_lengths = pack_series(rows, max_batch_size)
+        raw_length = int(raw_lengths.max())
+
+        # Known covariates: (n_covariates, context + horizon) per series, in the
+        # order the model's regressor was trained on. Past covariates: (n_past,
+        # context), observed only up to the origin. Required by such models.
+        covariates = parse_covariates(data, series.shape, raw_lengths, pred_len)
+
+        quantile_levels = data.get("quantile_levels", DEFAULT_QUANTILES)
+        if not isinstance(quantile_levels, list) or not quantile_levels:
+            raise ValueError(f"'quantile_levels' must be a non-empty list, got {quantile_levels!r}")
+        if not all(is_real(q) and 0 < q < 1 for q in quantile_levels):
+            raise ValueError(f"Quantile levels must be numbers in (0, 1), got {quantile_levels}")
+        # Sampling and hierarchy aggregation interpolate between neighbouring levels.
+        if any(lo >= hi for lo, hi in zip(quantile_levels, quantile_levels[1:])):
+            raise ValueError(f"Quantile levels must be unique and in increasing order, got {quantile_levels}")
 
-        log(f"Series length: {len(series)} | Prediction length: {pred_len}")
-        return series, pred_len
+        outputs = data.get("outputs", list(OUTPUT_KEYS))
+        if not isinstance(outputs, list) or not outputs or not all(isinstance(o, str) for o in outputs):
+            raise ValueError(f"'outputs' must be a non-empty list of names from {list(OUTPUT_KEYS)}, got {outputs!r}")
+        unknown = set(outputs) - set(OUTPUT_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown outputs {sorted(unknown)}, expected a subset of {list(OUTPUT_KEYS)}")
+
+        encoding = data.get("encoding", "json")
+        if encoding not in ("json", "base64"):
+            raise ValueError(f"Unknown encoding '{encoding}', expected 'json' or 'base64'")
+
+        dtype = data.get("dtype", "float32")
+        if dtype not in OUTPUT_DTYPES:
+            raise ValueError(f"Unknown dtype '{dtype}', expected one of {list(OUTPUT_DTYPES)}")
+
+        precision = data.get("precision")
+        if precision is not None and not (is_integer(precision) and 0 <= precision <= MAX_PRECISION):
+            raise ValueError(f"'precision' must be an integer between 0 and {MAX_PRECISION}, got {precision!r}")
+        if precision is not None and encoding == "base64":
+            raise ValueError("'precision' only applies to JSON output; base64 returns the raw buffer")
+
+        # Hierarchy: {node: [children]} over leaf series named by 'leaf_ids'.
+        summing = None
+        if data.get("hierarchy") is not None:
+            leaf_ids = [str(i) for i in data.get("leaf_ids", range(series.shape[0]))]
+            if len(leaf_ids) != series.shape[0]:
+                raise ValueError(f"'leaf_ids' has {len(leaf_ids)} entries for {series.shape[0]} series")
+            node_ids, S = hierarchy.summing_matrix(leaf_ids, data["hierarchy"])
+            aggregation = data.get("aggregation", "comonotonic")
+            if aggregation not in hierarchy.AGGREGATIONS:
+                raise ValueError(f"Unknown aggregation '{aggregation}', expected one of {list(hierarchy.AGGREGATIONS)}")
+            summing = {"ids": leaf_ids + node_ids, "S": S, "aggregation": aggregation}
+
+        # Stable series identifiers let the monitor keep per-series statistics.
+        series_ids = data.get("series_ids", data.get("leaf_ids"))
+        if series_ids is not None:
+            series_ids = [str(i) for i in series_ids]
+            if len(series_ids) != series.shape[0]:
+                raise ValueError(f"'series_ids' has {len(series_ids)} entries for {series.shape[0]} series")
+
+        # Sample paths: N trajectories per series, always returned base64-encoded.
+        num_samples = data.get("num_samples", 0)
+        if not is_integer(num_samples) or not 0 <= num_samples <= sampling.MAX_SAMPLE_PATHS:
+            raise ValueError(f"'num_samples' must be an integer between 0 and {sampling.MAX_SAMPLE_PATHS}, "
+                             f"got {num_samples!r}")
+        if num_samples and len(quantile_levels) < 2:
+            raise ValueError("Sampling needs at least two quantile levels")
+        if num_samples:
+            # Aggregate nodes get paths too.
+            rows = series.shape[0] + (summing["S"].shape[0] if summing is not None else 0)
+            elements = rows * num_samples * pred_len
+            if elements > sampling.MAX_SAMPLE_ELEMENTS:
+                raise ValueError(
+                    f"Sampling {rows} series x {num_samples} paths x {pred_len} steps = {elements:,} values "
+                    f"exceeds the limit of {sampling.MAX_SAMPLE_ELEMENTS:,}"
+                )
+        correlation = data.get("sample_correlation", sampling.SAMPLE_CORRELATION)
+        if not is_real(correlation) or not 0 <= correlation < 1:
+            raise ValueError(f"'sample_correlation' must be a number in [0, 1), got {correlation!r}")
+        seed = data.get("seed")
+        if seed is not None and not (is_integer(seed) and seed >= 0):
+            raise ValueError(f"'seed' must be a non-negative integer, got {seed!r}")
+
+        log(f"Series shape: {series.shape} | Prediction length: {pred_len}")
+        return {
+            "series": series,
+            "lengths": raw_lengths,
+            "series_ids": series_ids,
+            "covariates": covariates,
+            "hierarchy": summing,
+            "prediction_length": pred_len,
+            "quantile_levels": quantile_levels,
+            "outputs": outputs,
+            "encoding": encoding,
+            "dtype": dtype,
+            "precision": precision,
+            "num_samples": num_samples,
+            "seed": seed,
+            "sample_correlation": correlation,
+        }
 
     except Exception as e:
         log(f"❌ Error parsing input: {e}")
         raise
 
+def round_significant(array: np.ndarray, digits: int) -> np.ndarray:
+    """Rounds every element to `digits` significant digits (float64)."""
+    array = np.asarray(array, dtype=np.float64)
+    nonzero = np.isfinite(array) & (array != 0)
+    magnitude = np.floor(np.log10(np.abs(np.where(nonzero, array, 1))))
+    scale = 10.0 ** (digits - 1 - magnitude)
+    return np.where(nonzero, np.round(array * scale) / scale, array)
+
+
+def encode_array(array: np.ndarray, encoding: str, dtype: str, precision=None):
+    """Encodes a forecast array for the response.
+
+    `json` returns nested lists, rounded to `precision` decimals if given
+    (float16 values default to the significant digits float16 holds);
+    `base64` returns the raw little-endian buffer in `dtype` with its shape.
+    """
+    array = array.astype(np.dtype(OUTPUT_DTYPES[dtype]).newbyteorder("<"), copy=False)
+    if encoding == "base64":
+        array = np.ascontiguousarray(array)
+        return {
+            "dtype": dtype,
+            "shape": list(array.shape),
+            "data": base64.b64encode(array.tobytes()).decode("ascii"),
+        }
+    # Round in float64 so the JSON floats come out short.
+    if precision is not None:
+        return np.round(array.astype(np.float64), int(precision)).tolist()
+    if dtype == "float16":
+        return round_significant(array, FLOAT16_DIGITS).tolist()
+    return array.tolist()
+
+
+def covariate_effect(context: np.ndarray, covariates: np.ndarray):
+    """Applies the model's covariate regressor to a packed batch.
+
+    Returns the residual context (B, T) the model was fine-tuned on and the
+    future effect (B, H) to add back to its forecast.
+    """
+    T = context.shape[1]
+    effect = COVARIATE_REGRESSOR.predict(covariates.transpose(0, 2, 1)).astype(np.float32)
+    return context - effect[:, :T], effect[:, T:]
+
+
+def chronos_forecast(model, series: np.ndarray, pred_len: int, quantile_levels: list) -> dict:
+    """Chronos forward pass on a (B, T) float array."""
+    import torch
+
+    # Pad the batch with empty (all-NaN) rows up to a compiled batch bucket.
+    batch = len(series)
+    if fast_path.FAST_PATH:
+        pad = fast_path.batch_bucket(batch) - batch
+        if pad:
+            series = np.pad(series, ((0, pad), (0, 0)), constant_values=np.nan)
+
+    series_tensor = torch.from_numpy(np.ascontiguousarray(series, dtype=np.float32))
+    with torch.inference_mode():
+        quantiles, out = model.predict_quantiles(
+            series_tensor,
+            prediction_length=pred_len,
+            quantile_levels=quantile_levels,
+        )
+    return {"quantiles": quantiles[:batch].numpy(), "mean": out[:batch].numpy()}
+
+
+def forecast_batch(model, series: np.ndarray, covariates, pred_len: int, quantile_levels: list) -> dict:
+    """Runs one forward pass and returns raw quantile / mean arrays."""
+    effect = None
+    if covariates is not None:
+        series, effect = covariate_effect(series, covariates)
+
+    if isinstance(model, student.StudentModel):
+        quantiles, mean = model.predict_quantiles(series, pred_len, quantile_levels)
+        arrays = {"quantiles": quantiles, "mean": mean}
+    else:
+        arrays = chronos_forecast(model, series, pred_len, quantile_levels)
+    if effect is not None:
+        arrays["quantiles"] = arrays["quantiles"] + effect[..., None].astype(np.float32)
+        arrays["mean"] = arrays["mean"] + effect.astype(np.float32)
+    return arrays
+
+
+def monitoring_request(data: dict) -> dict:
+    """Records actuals or returns the monitoring summary."""
+    if data["mode"] == "actuals":
+        if not monitoring.observe_actuals(data["forecast_id"], data["series_ids"], data["actuals"]):
+            raise ValueError("Monitoring is disabled")
+        return {"mode": "actuals", "result": {"accepted": len(data["series_ids"])}}
+    summary = monitoring.summary()
+    if summary is None:
+        raise ValueError("Monitoring is disabled")
+    return {"mode": "monitoring", "result": summary}
+
+
 def predict_fn(data, model):
     """Performs inference."""
+    if data.get("mode", "forecast") != "forecast":
+        return monitoring_request(data)
     start = time.time()
-    series, pred_len = data
-
-    # Ensure tensor format
-    if isinstance(series[0], (float, int)):
-        series = [series]
+    series, covariates = data["series"], data.get("covariates")
 
-    series_tensor = torch.tensor(series, dtype=torch.float32)
+    # Large requests (async inference) are split into chunks of `batch_size` series.
+    batch_size = data.get("batch_size") or len(series)
+    log(f"Running prediction | input shape: {series.shape} | batch size: {batch_size}")
 
-    log(f"Running prediction | input shape: {series_tensor.shape}")
-    quantiles, out = model.predict_quantiles(series_tensor, prediction_length=pred_len)
+    chunks = [
+        forecast_batch(
+            model,
+            series[i:i + batch_size],
+            None if covariates is None else covariates[i:i + batch_size],
+            data["prediction_length"],
+            data["quantile_levels"],
+        )
+        for i in range(0, len(series), batch_size)
+    ]
+    if len(chunks) == 1:
+        arrays = chunks[0]
+    else:
+        arrays = {key: np.concatenate([c[key] for c in chunks]) for key in OUTPUT_KEYS}
 
     elapsed = time.time() - start
     log(f"Prediction completed in {elapsed:.2f}s")
 
     # Example log
-    sample = quantiles.tolist()[0]
-    
-    log(f"Example forecast (first series, 3 values): {sample[:3]}")
+    log(f"Example forecast (first series, 3 values): {arrays['quantiles'][0, :3].tolist()}")
 
-    return quantiles.tolist(), out.tolist()
+    # Hands the arrays to the background monitor (a non-blocking enqueue). Forecasts
+    # of named series get an id; actuals sent back with it are scored against them.
+    forecast_id = uuid.uuid4().hex if monitoring.enabled() and data.get("series_ids") is not None else None
+    monitoring.observe(forecast_id, data.get("series_ids"), series, data.get("lengths"), arrays["mean"],
+                       arrays["quantiles"], data["quantile_levels"])
+
+    num_samples = data.get("num_samples")
+    if num_samples:
+        start = time.time()
+        samples = sampling.sample_paths(
+            arrays["quantiles"], data["quantile_levels"], num_samples, data.get("seed"), data["sample_correlation"]
+        )
+        log(f"Sampled {num_samples} paths per series in {time.time() - start:.2f}s")
+
+    # Append every aggregate level after the leaves, in one reconciliation step.
+    summing = data.get("hierarchy")
+    if summing is not None:
+        agg_q, agg_mean = hierarchy.aggregate(
+            summing["S"], arrays["quantiles"], arrays["mean"], data["quantile_levels"], summing["aggregation"]
+        )
+        arrays["quantiles"] = np.concatenate([arrays["quantiles"], agg_q])
+        arrays["mean"] = np.concatenate([arrays["mean"], agg_mean])
+        # Aggregate paths are sums of leaf paths, so every path is coherent.
+        if num_samples:
+            samples = np.concatenate([samples, np.einsum("nl,lsh->nsh", summing["S"], samples)])
+
+    prediction = {
+        key: encode_array(arrays[key], data["encoding"], data["dtype"], data["precision"])
+        for key in data["outputs"]
+    }
+    if num_samples:
+        prediction["samples"] = encode_array(samples, "base64", data["dtype"])
+    if "quantiles" in prediction:
+        prediction["quantile_levels"] = data["quantile_levels"]
+    if summing is not None:
+        prediction["ids"] = summing["ids"]
+    if forecast_id is not None:
+        prediction["forecast_id"] = forecast_id
+    return prediction
 
 def output_fn(prediction, accept):
     """Formats the output as JSON."""
-    response = {"forecast": prediction}
-    
-    log(f"Sending response: keys={list(response.keys())}, size={len(json.dumps(response))} bytes")
-    
-    return json.dumps(response)
+    if "mode" in prediction:
+        response = {prediction["mode"]: prediction["result"]}
+    else:
+        response = {"forecast": prediction}
+    body = json.dumps(response)
+
+    log(f"Sending response: keys={list(response[next(iter(response))])}, size={len(body)} bytes")
+
+    return body
 
 # if __name__ == "__main__":
 #     request_body = json.dumps({
@@ -85,8 +584,8 @@ def output_fn(prediction, accept):
 
 #     model = model_fn(MODEL_DIR)
 #     inputs = input_fn(request_body, "application/json")
-#     quantiles, preds = predict_fn(inputs, model)
-#     output = output_fn(preds, "application/json")
+#     prediction = predict_fn(inputs, model)
+#     output = output_fn(prediction, "application/json")
 
 #     print("\n=== 📈 OUTPUT ===")
 #     print(output)
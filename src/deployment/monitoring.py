@@ -0,0 +1,509 @@
+import os
+import json
+import time
+import queue
+import socket
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import cloudwatch
+from storage import ObjectStore
+
+# -----------------------------------------------------------------------------
+# Streaming forecast-quality and data-drift monitoring.
+#
+# Monitoring is opt-in (MONITORING=1). The request path reduces each batch to
+# what the monitor needs (per-series input moments, a sampled sketch of the
+# input values, the forecast, and its quantiles when it can be matched with
+# actuals) and drops that into a bounded queue, so the full context never
+# crosses the process boundary. A background thread folds it into
+# constant-memory statistics:
+#   - per series and for the model: running count / mean / variance / min /
+#     max and missing rate (Chan merge), and rolling forecast error (EWMA of
+#     MAE, RMSE, WQL) once actuals arrive
+#   - for the model inputs and forecasts: a log-bucket sketch of the values
+#     (quantiles, and PSI drift of the current flush window against a frozen
+#     reference sketch)
+#
+# Every monitored forecast gets a forecast id, returned to the caller; actuals
+# must name it, and are scored against the forecast stored under
+# (series_id, forecast_id) for up to MONITOR_FORECAST_TTL_SECONDS.
+#
+# serve.py runs one monitor process per container (start_process) and every
+# worker feeds it through a multiprocessing queue (connect), so forecasts and
+# actuals meet whichever worker served them. Summaries are flushed to a local
+# directory or S3 and published as CloudWatch EMF metrics; a small snapshot
+# file lets any worker answer {"mode": "monitoring"} requests.
+# -----------------------------------------------------------------------------
+MONITORING               = os.getenv("MONITORING", "0") == "1"
+MONITOR_SINK_URI         = os.getenv("MONITOR_SINK_URI", "file:///tmp/chronos-monitoring")
+MONITOR_FLUSH_SECONDS    = float(os.getenv("MONITOR_FLUSH_SECONDS", "60"))
+MONITOR_MAX_SERIES       = int(os.getenv("MONITOR_MAX_SERIES", "10000"))
+MONITOR_BACKLOG          = int(os.getenv("MONITOR_BACKLOG", "256"))
+MONITOR_REFERENCE        = int(os.getenv("MONITOR_REFERENCE_VALUES", "100000"))
+MONITOR_SKETCH_VALUES    = int(os.getenv("MONITOR_SKETCH_VALUES", "4096"))  # input values sketched per request
+MONITOR_ERROR_ALPHA      = float(os.getenv("MONITOR_ERROR_ALPHA", "0.05"))
+MONITOR_FORECAST_TTL     = float(os.getenv("MONITOR_FORECAST_TTL_SECONDS", str(2 * 24 * 3600)))
+MONITOR_MAX_FORECASTS    = int(os.getenv("MONITOR_MAX_FORECASTS", "50000"))  # stored (series, forecast) pairs
+MONITOR_SNAPSHOT_PATH    = os.getenv("MONITOR_SNAPSHOT_PATH", "/tmp/chronos-monitoring/latest.json")
+MONITOR_SNAPSHOT_SECONDS = float(os.getenv("MONITOR_SNAPSHOT_SECONDS", "5"))
+
+SKETCH_GAMMA = 1.02
+SKETCH_MIN = 1e-6  # magnitudes below this share the zero bucket
+_LOG_GAMMA = np.log(SKETCH_GAMMA)
+_KEY_OFFSET = int(np.ceil(np.log(SKETCH_MIN) / _LOG_GAMMA)) - 1
+
+_monitor = None
+_snapshot_path = MONITOR_SNAPSHOT_PATH
+
+
+def log(msg: str):
+    print(f"[Monitor] {time.strftime('%Y-%m-%d %H:%M:%S')} | {msg}", flush=True)
+
+
+# -----------------------------------------------------------------------------
+# Sketches and running statistics
+# -----------------------------------------------------------------------------
+def sketch_keys(values: np.ndarray) -> np.ndarray:
+    """Signed log-bucket index of each value; bucket k covers (gamma^(k-1), gamma^k]."""
+    magnitude = np.abs(values)
+    keys = np.ceil(np.log(np.maximum(magnitude, SKETCH_MIN)) / _LOG_GAMMA).astype(np.int64) - _KEY_OFFSET
+    keys[magnitude < SKETCH_MIN] = 0
+    return np.sign(values).astype(np.int64) * keys
+
+
+def bucket_value(key: int) -> float:
+    """Representative value of a bucket, within (gamma - 1) / 2 relative error."""
+    if not key:
+        return 0.0
+    return float(np.sign(key) * 2 * SKETCH_GAMMA ** (abs(key) + _KEY_OFFSET) / (1 + SKETCH_GAMMA))
+
+
+def sketch_quantiles(sketch: dict, levels: tuple) -> list:
+    if not sketch:
+        return [None] * len(levels)
+    keys = np.array(sorted(sketch))
+    cumulative = np.cumsum([sketch[k] for k in keys])
+    ranks = np.searchsorted(cumulative, np.asarray(levels) * cumulative[-1])
+    return [round(bucket_value(int(keys[min(r, len(keys) - 1)])), 4) for r in ranks]
+
+
+def psi(reference: dict, current: dict, eps: float = 1e-4):
+    """Population stability index between two sketches (None if either is empty)."""
+    if not reference or not current:
+        return None
+    keys = sorted(set(reference) | set(current))
+    p = np.array([reference.get(k, 0) for k in keys], dtype=np.float64)
+    q = np.array([current.get(k, 0) for k in keys], dtype=np.float64)
+    p, q = np.maximum(p / p.sum(), eps), np.maximum(q / q.sum(), eps)
+    return round(float(np.sum((q - p) * np.log(q / p))), 4)
+
+
+class StreamStats:
+    """Constant-memory summary of one stream of values."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max", "missing", "reference", "window",
+                 "errors", "abs_error", "sq_error", "wql")
+
+    def __init__(self):
+        self.count, self.mean, self.m2, self.missing = 0, 0.0, 0.0, 0
+        self.min, self.max = np.inf, -np.inf
+        self.reference, self.window = {}, {}
+        self.errors, self.abs_error, self.sq_error, self.wql = 0, None, None, None
+
+    def merge(self, count: int, mean: float, m2: float, lo: float, hi: float, missing: int):
+        """Chan et al. parallel update with the moments of a new block of values."""
+        self.missing += missing
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min, self.max = min(self.min, lo), max(self.max, hi)
+
+    def add_keys(self, keys: np.ndarray, counts: np.ndarray):
+        # Values feed the reference sketch until it is full, the window afterwards.
+        target = self.reference if sum(self.reference.values()) < MONITOR_REFERENCE else self.window
+        for k, c in zip(keys.tolist(), counts.tolist()):
+            target[k] = target.get(k, 0) + c
+
+    def add_error(self, abs_error: float, sq_error: float, wql: float):
+        self.errors += 1
+        self.abs_error, self.sq_error = ewma(self.abs_error, abs_error), ewma(self.sq_error, sq_error)
+        if wql is not None:
+            self.wql = ewma(self.wql, wql)
+
+    def summary(self) -> dict:
+        seen = self.count + self.missing
+        p05, p50, p95 = sketch_quantiles(self.window or self.reference, (0.05, 0.5, 0.95))
+        out = {
+            "count": self.count,
+            "mean": round(self.mean, 4),
+            "std": round(float(np.sqrt(self.m2 / self.count)), 4) if self.count else None,
+            "min": round(float(self.min), 4) if self.count else None,
+            "max": round(float(self.max), 4) if self.count else None,
+            "missing_rate": round(self.missing / seen, 4) if seen else None,
+            "p05": p05, "p50": p50, "p95": p95,
+            "psi": psi(self.reference, self.window),
+        }
+        if self.errors:
+            out["error"] = {
+                "n": self.errors,
+                "mae": round(self.abs_error, 4),
+                "rmse": round(float(np.sqrt(self.sq_error)), 4),
+                "wql": None if self.wql is None else round(self.wql, 4),
+            }
+        return out
+
+
+def ewma(old, new: float, alpha: float = MONITOR_ERROR_ALPHA) -> float:
+    return new if old is None else old + alpha * (new - old)
+
+
+def block_moments(values: np.ndarray, valid: np.ndarray) -> tuple:
+    """Per-row (count, mean, m2, min, max, missing) of a (B, T) block, vectorised."""
+    observed = valid & ~np.isnan(values)
+    count = observed.sum(axis=1)
+    safe = np.where(observed, values, 0.0).astype(np.float64)
+    mean = safe.sum(axis=1) / np.maximum(count, 1)
+    m2 = (np.where(observed, values - mean[:, None], 0.0) ** 2).sum(axis=1)
+    lo = np.where(observed, values, np.inf).min(axis=1)
+    hi = np.where(observed, values, -np.inf).max(axis=1)
+    return count, mean, m2, lo, hi, valid.sum(axis=1) - count
+
+
+def input_summary(series: np.ndarray, lengths, rng=np.random.default_rng()) -> tuple:
+    """(count, mean, m2, min, max, missing, sketch keys, key counts) of a packed (B, T) batch.
+
+    Only each request's own history counts, not the bucket padding. The sketch
+    covers a uniform sample of at most MONITOR_SKETCH_VALUES observed values.
+    """
+    width = series.shape[1]
+    lengths = np.full(len(series), width) if lengths is None else np.minimum(lengths, width)
+    valid = np.arange(width)[None, :] >= (width - lengths)[:, None]
+    moments = block_moments(series, valid)
+    values = series[valid & ~np.isnan(series)]
+    if len(values) > MONITOR_SKETCH_VALUES:
+        values = values[rng.integers(0, len(values), MONITOR_SKETCH_VALUES)]
+    return (*moments, *np.unique(sketch_keys(values), return_counts=True))
+
+
+# -----------------------------------------------------------------------------
+# Monitor
+# -----------------------------------------------------------------------------
+class MonitorClient:
+    """Request-path handle: enqueues observations for a monitor, never blocks."""
+
+    def __init__(self, inbox):
+        self._queue = inbox
+        self.dropped = 0
+
+    def _put(self, item):
+        try:
+            if self.dropped:
+                # Drops are reported with the next item that fits.
+                self._queue.put_nowait(("dropped", self.dropped))
+                self.dropped = 0
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def observe(self, forecast_id, ids, series: np.ndarray, lengths, mean: np.ndarray, quantiles: np.ndarray,
+                levels: list):
+        # Quantiles are only kept to score actuals, which need a forecast id.
+        self._put(("forecast", forecast_id, ids, input_summary(series, lengths), mean,
+                   quantiles if forecast_id is not None else None, levels))
+
+    def observe_actuals(self, forecast_id: str, ids: list, actuals: list):
+        self._put(("actuals", forecast_id, ids, actuals))
+
+
+class Monitor(MonitorClient):
+    """Folds observations into StreamStats on a background thread and flushes summaries."""
+
+    def __init__(self, sink_uri: str = MONITOR_SINK_URI, flush_seconds: float = MONITOR_FLUSH_SECONDS,
+                 store: ObjectStore = None, max_series: int = MONITOR_MAX_SERIES, backlog: int = MONITOR_BACKLOG,
+                 inbox=None, forecast_ttl: float = MONITOR_FORECAST_TTL, max_forecasts: int = MONITOR_MAX_FORECASTS,
+                 snapshot_path: str = None, publish: bool = False):
+        super().__init__(inbox if inbox is not None else queue.Queue(maxsize=backlog))
+        self.sink = sink_uri.rstrip("/")
+        self.flush_seconds = flush_seconds
+        self.store = store or ObjectStore()
+        self.max_series = max_series
+        self.forecast_ttl, self.max_forecasts = forecast_ttl, max_forecasts
+        self.snapshot_path, self.publish = snapshot_path, publish
+        self.model = {"input": StreamStats(), "forecast": StreamStats(), "error": StreamStats()}
+        self.series = {}
+        # (series_id, forecast_id) -> (expiry, mean, quantiles, levels), oldest first.
+        self.forecasts = OrderedDict()
+        self.counters = {"requests": 0, "dropped": 0, "actuals": 0, "unmatched_actuals": 0,
+                         "expired_forecasts": 0, "untracked_series": 0}
+        self._published = dict(self.counters)
+        self.prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # --- background thread -----------------------------------------------------
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=10)
+            self._thread = None
+            self.flush()
+
+    def _run(self):
+        next_flush = time.monotonic() + self.flush_seconds
+        next_snapshot = time.monotonic() + MONITOR_SNAPSHOT_SECONDS
+        while True:
+            wake = min(next_flush, next_snapshot) if self.snapshot_path else next_flush
+            try:
+                item = self._queue.get(timeout=max(wake - time.monotonic(), 0.01))
+            except queue.Empty:
+                item = ()
+            if item is None:
+                return
+            try:
+                if item and item[0] == "forecast":
+                    self._fold_forecast(*item[1:])
+                elif item and item[0] == "actuals":
+                    self._fold_actuals(*item[1:])
+                elif item:
+                    self.counters["dropped"] += item[1]
+                if time.monotonic() >= next_flush:
+                    self.flush()
+                    next_flush = time.monotonic() + self.flush_seconds
+                if self.snapshot_path and time.monotonic() >= next_snapshot:
+                    self.snapshot()
+                    next_snapshot = time.monotonic() + MONITOR_SNAPSHOT_SECONDS
+            except Exception as e:  # monitoring must never take the server down
+                log(f"⚠️ Monitoring update failed: {e}")
+
+    def _stats_for(self, series_id):
+        stats = self.series.get(series_id)
+        if stats is None and len(self.series) < self.max_series:
+            stats = self.series[series_id] = StreamStats()
+        if stats is None:
+            self.counters["untracked_series"] += 1
+        return stats
+
+    def _expire(self, now: float):
+        """Drops forecasts past their TTL, then the oldest ones beyond the size bound."""
+        while self.forecasts:
+            key, (expiry, *_) = next(iter(self.forecasts.items()))
+            if expiry > now and len(self.forecasts) <= self.max_forecasts:
+                return
+            del self.forecasts[key]
+            self.counters["expired_forecasts"] += 1
+
+    def _fold_forecast(self, forecast_id, ids, inputs: tuple, mean, quantiles, levels):
+        count, mu, m2, lo, hi, missing, keys, key_counts = inputs
+
+        with self._lock:
+            self.counters["requests"] += 1
+            model = self.model["input"]
+            for i in range(len(count)):
+                model.merge(int(count[i]), float(mu[i]), float(m2[i]), float(lo[i]), float(hi[i]), int(missing[i]))
+            model.add_keys(keys, key_counts)
+
+            f_count, f_mu, f_m2, f_lo, f_hi, _ = block_moments(mean, np.ones(mean.shape, dtype=bool))
+            forecast = self.model["forecast"]
+            for i in range(len(mean)):
+                forecast.merge(int(f_count[i]), float(f_mu[i]), float(f_m2[i]), float(f_lo[i]), float(f_hi[i]), 0)
+            forecast.add_keys(*np.unique(sketch_keys(mean.ravel()), return_counts=True))
+
+            if ids is None:
+                return
+            for i, series_id in enumerate(ids):
+                stats = self._stats_for(series_id)
+                if stats is not None:
+                    stats.merge(int(count[i]), float(mu[i]), float(m2[i]), float(lo[i]), float(hi[i]),
+                                int(missing[i]))
+
+            if forecast_id is None:
+                return
+            now = time.monotonic()
+            levels = np.asarray(levels, dtype=np.float32)
+            for i, series_id in enumerate(ids):
+                # Copies, so the stored forecast does not pin the whole batch in memory.
+                self.forecasts[(series_id, forecast_id)] = (now + self.forecast_ttl, mean[i].copy(),
+                                                            quantiles[i].copy(), levels)
+            self._expire(now)
+
+    def _fold_actuals(self, forecast_id, ids, actuals):
+        with self._lock:
+            self._expire(time.monotonic())
+            for series_id, values in zip(ids, actuals):
+                stored = self.forecasts.pop((series_id, forecast_id), None)
+                if stored is None:
+                    self.counters["unmatched_actuals"] += 1
+                    continue
+                _, mean, quantiles, levels = stored
+                y = np.asarray(values, dtype=np.float32)[:len(mean)]
+                observed = ~np.isnan(y)
+                if not observed.any():
+                    continue
+                y, q = y[observed], quantiles[:len(observed)][observed]
+                err = mean[:len(observed)][observed] - y
+                diff = y[:, None] - q
+                pinball = np.maximum(levels * diff, (levels - 1) * diff).sum()
+                scale = np.abs(y).sum()
+                wql = float(2 * pinball / len(levels) / scale) if scale > 0 else None
+
+                abs_error, sq_error = float(np.abs(err).mean()), float((err ** 2).mean())
+                stats = self.series.get(series_id)
+                if stats is not None:
+                    stats.add_error(abs_error, sq_error, wql)
+                self.model["error"].add_error(abs_error, sq_error, wql)
+                self.counters["actuals"] += 1
+
+    # --- summaries -------------------------------------------------------------
+    def summary(self, include_series: bool = True) -> dict:
+        with self._lock:
+            out = {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "monitor": self.prefix,
+                **self.counters,
+                "tracked_series": len(self.series),
+                "stored_forecasts": len(self.forecasts),
+                "model": {
+                    "input": self.model["input"].summary(),
+                    "forecast": self.model["forecast"].summary(),
+                    "error": self.model["error"].summary().get("error"),
+                },
+            }
+            if include_series:
+                out["series"] = {str(k): v.summary() for k, v in self.series.items()}
+            return out
+
+    def interval_metrics(self, summary: dict) -> dict:
+        """Counter deltas since the previous call plus drift and error gauges, for CloudWatch."""
+        deltas = {k: v - self._published[k] for k, v in self.counters.items()}
+        self._published = dict(self.counters)
+        error = summary["model"]["error"] or {}
+        return {
+            **deltas,
+            "input_psi": summary["model"]["input"]["psi"],
+            "forecast_psi": summary["model"]["forecast"]["psi"],
+            "error_mae": error.get("mae"),
+            "error_rmse": error.get("rmse"),
+            "error_wql": error.get("wql"),
+        }
+
+    def snapshot(self):
+        """Writes the model-level summary where workers read it for {"mode": "monitoring"}."""
+        try:
+            self.store.write(self.snapshot_path, json.dumps(self.summary(include_series=False)).encode())
+        except Exception as e:
+            log(f"⚠️ Could not write monitoring snapshot to {self.snapshot_path}: {e}")
+
+    def flush(self):
+        """Writes the summary to the sink, publishes its metrics and starts a new drift window."""
+        summary = self.summary()
+        if self.publish:
+            cloudwatch.publish(self.interval_metrics(summary), Source="monitoring")
+        if self.snapshot_path:
+            self.snapshot()
+        uri = f"{self.sink}/{self.prefix}/summary-{summary['timestamp']}.json"
+        try:
+            self.store.write(uri, json.dumps(summary).encode())
+        except Exception as e:
+            log(f"⚠️ Could not flush monitoring summary to {uri}: {e}")
+            return
+        with self._lock:
+            for stats in [self.model["input"], self.model["forecast"], *self.series.values()]:
+                stats.window = {}
+
+
+# -----------------------------------------------------------------------------
+# Process-wide instance
+# -----------------------------------------------------------------------------
+def start(**kwargs) -> Monitor:
+    """Runs a monitor on a thread of this process (single-process use and benchmarks)."""
+    global _monitor
+    if _monitor is None:
+        _monitor = Monitor(**kwargs)
+        _monitor.start()
+        log(f"Monitoring enabled | sink: {_monitor.sink} | flush every {_monitor.flush_seconds:.0f}s")
+    return _monitor
+
+
+def stop():
+    global _monitor
+    if isinstance(_monitor, Monitor):
+        _monitor.stop()
+    _monitor = None
+
+
+def run_monitor(inbox, snapshot_path: str):
+    """Entry point of the monitor process; returns once stop_process sends None."""
+    monitor = Monitor(inbox=inbox, snapshot_path=snapshot_path, publish=cloudwatch.METRICS_INTERVAL > 0)
+    log(f"Monitor process {os.getpid()} | sink: {monitor.sink} | flush every {monitor.flush_seconds:.0f}s")
+    monitor.start()
+    monitor._thread.join()
+    monitor.flush()
+
+
+def start_process(ctx, snapshot_path: str = MONITOR_SNAPSHOT_PATH) -> tuple:
+    """Starts the container's monitor process; returns (process, inbox) for connect()."""
+    inbox = ctx.Queue(maxsize=MONITOR_BACKLOG)
+    process = ctx.Process(target=run_monitor, args=(inbox, snapshot_path), name="monitor", daemon=True)
+    process.start()
+    return process, inbox
+
+
+def stop_process(process, inbox, timeout: float = 10):
+    """Asks the monitor process to flush and exit."""
+    try:
+        inbox.put(None, timeout=timeout)
+    except queue.Full:
+        pass
+    process.join(timeout)
+    if process.is_alive():
+        process.terminate()
+
+
+def connect(inbox, snapshot_path: str = MONITOR_SNAPSHOT_PATH):
+    """Feeds this (worker) process's observations to the monitor process."""
+    global _monitor, _snapshot_path
+    _monitor, _snapshot_path = MonitorClient(inbox), snapshot_path
+
+
+def enabled() -> bool:
+    return _monitor is not None
+
+
+def observe(forecast_id, ids, series, lengths, mean, quantiles, levels):
+    """No-op unless start() or connect() was called in this process."""
+    if _monitor is not None:
+        _monitor.observe(forecast_id, ids, series, lengths, mean, quantiles, levels)
+
+
+def observe_actuals(forecast_id: str, ids: list, actuals: list) -> bool:
+    if _monitor is None:
+        return False
+    _monitor.observe_actuals(forecast_id, ids, actuals)
+    return True
+
+
+def summary():
+    """Model-level summary, or None when monitoring is not running.
+
+    Workers read the monitor process's latest snapshot, at most
+    MONITOR_SNAPSHOT_SECONDS old ({} until the first one is written).
+    """
+    if _monitor is None:
+        return None
+    if isinstance(_monitor, Monitor):
+        return _monitor.summary(include_series=False)
+    try:
+        return json.loads(ObjectStore().read(_snapshot_path))
+    except FileNotFoundError:
+        return {}
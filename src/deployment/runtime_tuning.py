@@ -0,0 +1,185 @@
+import os
+import glob
+import math
+import time
+import ctypes
+from dataclasses import dataclass, asdict
+
+# -----------------------------------------------------------------------------
+# CPU runtime tuning for the inference workers.
+#
+# PyTorch sizes its thread pools from the host's core count, which ignores the
+# container's cgroup CPU quota and the fact that several workers share the
+# machine. This module works out how many cores a worker really has and
+# configures torch, OpenMP, the allocator and oneDNN accordingly.
+# -----------------------------------------------------------------------------
+M_ARENA_MAX = -8  # glibc mallopt() parameter
+
+_applied = None
+_torch_configured = False
+
+
+@dataclass
+class TuningProfile:
+    visible_cpus: int
+    quota_cpus: float
+    effective_cpus: int
+    workers: int
+    worker_index: int
+    intra_op_threads: int
+    inter_op_threads: int
+    malloc_arenas: int
+    numa_node: int
+    cpu_affinity: list
+
+
+def log(msg: str):
+    print(f"[Tuning] {time.strftime('%Y-%m-%d %H:%M:%S')} | {msg}", flush=True)
+
+
+def visible_cpus() -> list:
+    """CPUs this process may run on (respects taskset / cpusets)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cgroup_cpu_quota() -> float:
+    """CPU quota from cgroup v2 (cpu.max) or v1 (cfs_quota/cfs_period); inf if unlimited."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        return math.inf if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        return math.inf if quota <= 0 else quota / period
+    except (OSError, ValueError):
+        return math.inf
+
+
+def parse_cpulist(text: str) -> list:
+    """Parses a kernel cpulist such as '0-3,8-11'."""
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        cpus.extend(range(int(lo), int(hi or lo) + 1))
+    return cpus
+
+
+def numa_nodes() -> list:
+    """CPU lists per NUMA node, or an empty list if the topology is not exposed."""
+    nodes = []
+    for path in sorted(glob.glob("/sys/devices/system/node/node[0-9]*/cpulist")):
+        with open(path) as f:
+            nodes.append(parse_cpulist(f.read()))
+    return nodes
+
+
+def select_profile(workers: int = 1, worker_index: int = 0, cpus: list = None,
+                   quota: float = None, nodes: list = None) -> TuningProfile:
+    """Chooses thread counts and placement for one worker.
+
+    `cpus`, `quota` and `nodes` default to what the host reports; they can be
+    passed explicitly to simulate other machine sizes.
+    """
+    cpus = visible_cpus() if cpus is None else cpus
+    quota = cgroup_cpu_quota() if quota is None else quota
+    nodes = numa_nodes() if nodes is None else nodes
+    workers = max(1, workers)
+
+    effective = max(1, min(len(cpus), int(quota) if quota != math.inf else len(cpus)))
+
+    # Spread workers over NUMA nodes so each one allocates from local memory.
+    node, affinity = -1, cpus
+    usable_nodes = [[c for c in n if c in cpus] for n in nodes]
+    usable_nodes = [n for n in usable_nodes if n]
+    if len(usable_nodes) > 1 and workers > 1:
+        node = worker_index % len(usable_nodes)
+        affinity = usable_nodes[node]
+
+    # A single forward pass parallelises inside ops, so give each worker an
+    # equal share of the cores for intra-op work and keep inter-op at 1.
+    intra = max(1, effective // workers)
+    if node >= 0:
+        intra = min(intra, len(affinity))
+
+    return TuningProfile(
+        visible_cpus=len(cpus),
+        quota_cpus=quota,
+        effective_cpus=effective,
+        workers=workers,
+        worker_index=worker_index,
+        intra_op_threads=intra,
+        inter_op_threads=1,
+        malloc_arenas=max(2, intra),
+        numa_node=node,
+        cpu_affinity=affinity,
+    )
+
+
+def apply_profile(workers: int = None, worker_index: int = 0, profile: TuningProfile = None,
+                  configure_torch: bool = True) -> TuningProfile:
+    """Selects and applies a profile once per process; later calls return it unchanged.
+
+    The environment, CPU affinity and allocator settings are cheap and are
+    applied on the first call. torch is only imported and configured when
+    `configure_torch` is set, so a server can tune its process before binding
+    and leave the torch import to the model load.
+    """
+    global _applied
+    if _applied is None:
+        if profile is None:
+            workers = workers or int(os.getenv("SAGEMAKER_MODEL_SERVER_WORKERS", "1"))
+            profile = select_profile(workers, worker_index)
+        apply_process_settings(profile)
+        _applied = profile
+    if configure_torch:
+        apply_torch_settings(_applied)
+    return _applied
+
+
+def apply_process_settings(profile: TuningProfile):
+    # OpenMP / MKL / oneDNN read these when their runtimes initialise, so set
+    # them before torch runs its first op.
+    os.environ.setdefault("OMP_NUM_THREADS", str(profile.intra_op_threads))
+    os.environ.setdefault("MKL_NUM_THREADS", str(profile.intra_op_threads))
+    os.environ.setdefault("KMP_BLOCKTIME", "1")
+    os.environ.setdefault("ONEDNN_PRIMITIVE_CACHE_CAPACITY", "1024")
+
+    # Affinity applies to the calling thread and the threads it starts later,
+    # so this must run on the main thread before any pool is created.
+    if profile.numa_node >= 0 and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, profile.cpu_affinity)
+
+    try:
+        ctypes.CDLL("libc.so.6").mallopt(M_ARENA_MAX, profile.malloc_arenas)
+    except (OSError, AttributeError):
+        pass
+
+    summary = {k: v for k, v in asdict(profile).items() if k != "cpu_affinity"}
+    log(f"Applied runtime profile: {summary}")
+
+
+def apply_torch_settings(profile: TuningProfile):
+    global _torch_configured
+    if _torch_configured:
+        return
+    import torch
+
+    torch.set_num_threads(profile.intra_op_threads)
+    try:
+        torch.set_num_interop_threads(profile.inter_op_threads)
+    except RuntimeError:
+        # Only settable before any inter-op work has started.
+        pass
+    if torch.backends.mkldnn.is_available():
+        torch.backends.mkldnn.enabled = True
+    log(f"torch threads: intra-op {profile.intra_op_threads}, inter-op {profile.inter_op_threads}")
+    _torch_configured = True
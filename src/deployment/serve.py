@@ -0,0 +1,186 @@
+import os
+import sys
+import time
+import asyncio
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+# -----------------------------------------------------------------------------
+# Async HTTP server implementing the SageMaker container contract:
+#   GET  /ping         -> 200 once the model is loaded (503 while it loads)
+#   POST /invocations  -> input_fn / predict_fn / output_fn from inference.py; besides
+#                         forecasts it takes {"mode": "actuals"} and {"mode": "monitoring"}
+#                         requests for the monitor (monitoring.py)
+#   GET  /metrics      -> admission queue depth and queue-time percentiles (local use;
+#                         on SageMaker they are published to CloudWatch, cloudwatch.py)
+#
+# Several worker processes share the port (SO_REUSEPORT). Each worker binds
+# first and loads the model (importing torch) in the background, runs the
+# forward pass in a small thread pool so the event loop keeps accepting
+# connections, tunes torch for its share of the cores (runtime_tuning.py), and
+# answers 429 once its queue is full instead of letting latency grow unbounded.
+# All workers feed one monitor process, so actuals find their forecast
+# whichever worker served it.
+# Queued requests are ordered by priority and deadline (admission.py); those
+# that expire while waiting get a 504 without ever reaching the model.
+#
+# Payloads too large for real-time calls go through SageMaker Async Inference
+# (launch_endpoint.py with ASYNC_OUTPUT_PATH): SageMaker queues the requests,
+# reads each input from S3, calls /invocations and writes the result to the
+# endpoint's output path. With ASYNC_INFERENCE=1 the batch limit is lifted and
+# the forward pass runs in chunks of ASYNC_BATCH_SIZE series.
+# -----------------------------------------------------------------------------
+MODEL_DIR         = os.getenv("MODEL_DIR", "/opt/ml/model")
+PORT              = int(os.getenv("SAGEMAKER_BIND_TO_PORT", os.getenv("SERVER_PORT", "8080")))
+WORKERS           = int(os.getenv("SAGEMAKER_MODEL_SERVER_WORKERS", "1"))
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "1"))
+MAX_QUEUE_DEPTH   = int(os.getenv("MAX_QUEUE_DEPTH", "32"))
+ASYNC_INFERENCE   = os.getenv("ASYNC_INFERENCE", "0") == "1"
+ASYNC_BATCH_SIZE  = int(os.getenv("ASYNC_BATCH_SIZE", "256"))
+# SageMaker caps real-time payloads at 6 MB and async ones at 1 GB.
+MAX_PAYLOAD_MB    = int(os.getenv("MAX_PAYLOAD_MB", "1024" if ASYNC_INFERENCE else "6"))
+
+# Filled in by the background model load ("model"), after the app is frozen.
+STATE_KEY = web.AppKey("state", dict)
+ADMISSION_KEY = web.AppKey("admission", object)
+LOADER_KEY = web.AppKey("loader", asyncio.Task)
+PUBLISHER_KEY = web.AppKey("publisher", asyncio.Task)
+
+
+def log(msg: str):
+    print(f"[Server:{os.getpid()}] {time.strftime('%Y-%m-%d %H:%M:%S')} | {msg}", flush=True)
+
+
+def create_app(model_dir: str = MODEL_DIR, inference_threads: int = INFERENCE_THREADS,
+               max_queue_depth: int = MAX_QUEUE_DEPTH) -> web.Application:
+    """Builds the aiohttp app for one worker process."""
+    import inference
+    import admission
+    import cloudwatch
+
+    app = web.Application(client_max_size=MAX_PAYLOAD_MB * 1024 ** 2)
+    state = app[STATE_KEY] = {}
+    executor = ThreadPoolExecutor(max_workers=inference_threads, thread_name_prefix="inference")
+    app[ADMISSION_KEY] = admission.AdmissionController(executor, inference_threads, max_queue_depth)
+
+    def handle(body: bytes, content_type: str, accept: str):
+        # Async payloads are split into chunks, so the per-request batch limit does not apply.
+        data = inference.input_fn(body, content_type, max_batch_size=0 if ASYNC_INFERENCE else inference.MAX_BATCH_SIZE)
+        data["batch_size"] = ASYNC_BATCH_SIZE if ASYNC_INFERENCE else None
+        prediction = inference.predict_fn(data, state["model"])
+        return inference.output_fn(prediction, accept)
+
+    async def load_model():
+        start = time.time()
+        try:
+            model = await asyncio.get_running_loop().run_in_executor(executor, inference.model_fn, model_dir)
+        except Exception as e:
+            # Without a model /ping never turns healthy; exit so the container is restarted.
+            log(f"❌ Model load failed: {e!r}")
+            os._exit(1)
+        state["model"] = model
+        log(f"Model ready after {time.time() - start:.1f}s")
+
+    async def publish_metrics():
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(cloudwatch.METRICS_INTERVAL)
+            metrics = app[ADMISSION_KEY].interval_metrics()
+            await loop.run_in_executor(None, lambda: cloudwatch.publish(metrics, Source="admission"))
+
+    async def start(app):
+        # on_startup runs before the port is bound, so the load must not be awaited here.
+        await app[ADMISSION_KEY].start()
+        app[LOADER_KEY] = asyncio.create_task(load_model())
+        if cloudwatch.METRICS_INTERVAL > 0:
+            app[PUBLISHER_KEY] = asyncio.create_task(publish_metrics())
+
+    async def shutdown(app):
+        app[LOADER_KEY].cancel()
+        if PUBLISHER_KEY in app:
+            app[PUBLISHER_KEY].cancel()
+        await app[ADMISSION_KEY].stop()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def ping(request):
+        if "model" not in state:
+            return web.Response(status=503, text="Model not loaded")
+        return web.Response(text="")
+
+    async def invocations(request):
+        if "model" not in state:
+            return web.Response(status=503, text="Model not loaded")
+        body = await request.read()
+        try:
+            priority, deadline_ms = admission.parse_request_hints(request.headers, len(body))
+            result = await app[ADMISSION_KEY].submit(
+                handle, body, request.content_type, request.headers.get("Accept", "application/json"),
+                priority=priority, deadline_ms=deadline_ms,
+            )
+            return web.Response(body=result, content_type="application/json")
+        except admission.QueueFullError:
+            return web.Response(status=429, text="Too many requests, retry later")
+        except admission.DeadlineExceededError as e:
+            return web.Response(status=504, text=str(e))
+        except (ValueError, KeyError, TypeError) as e:
+            return web.Response(status=400, text=str(e))
+
+    async def metrics(request):
+        return web.json_response(app[ADMISSION_KEY].metrics())
+
+    app.on_startup.append(start)
+    app.on_cleanup.append(shutdown)
+    app.router.add_get("/ping", ping)
+    app.router.add_post("/invocations", invocations)
+    app.router.add_get("/metrics", metrics)
+    return app
+
+
+def run_worker(workers: int, worker_index: int = 0, monitor_inbox=None):
+    """Entry point of a worker process."""
+    import monitoring
+    import runtime_tuning
+
+    # Environment, affinity and allocator only; torch is configured by model_fn.
+    profile = runtime_tuning.apply_profile(workers, worker_index, configure_torch=False)
+    if monitor_inbox is not None:
+        monitoring.connect(monitor_inbox)
+    log(f"Worker {worker_index} started | intra-op threads: {profile.intra_op_threads}")
+    web.run_app(create_app(), port=PORT, reuse_port=workers > 1, print=None, access_log=None)
+
+
+def main():
+    log(f"Starting {WORKERS} worker(s) on port {PORT} | max queue depth: {MAX_QUEUE_DEPTH}"
+        f"{f' | async inference, chunks of {ASYNC_BATCH_SIZE}' if ASYNC_INFERENCE else ''}")
+    import monitoring
+
+    ctx = mp.get_context("spawn")
+    monitor, inbox = monitoring.start_process(ctx) if monitoring.MONITORING else (None, None)
+    try:
+        if WORKERS == 1:
+            run_worker(1, 0, inbox)
+            return
+        procs = [ctx.Process(target=run_worker, args=(WORKERS, i, inbox), daemon=True) for i in range(WORKERS)]
+        for p in procs:
+            p.start()
+
+        # Exit as soon as any worker dies so SageMaker restarts the container.
+        try:
+            while all(p.is_alive() for p in procs):
+                time.sleep(1)
+        except KeyboardInterrupt:
+            return
+        finally:
+            for p in procs:
+                p.terminate()
+        sys.exit(1)
+    finally:
+        if monitor is not None:
+            monitoring.stop_process(monitor, inbox)
+
+
+if __name__ == "__main__":
+    # SageMaker starts hosting containers as `docker run <image> serve`.
+    main()
@@ -0,0 +1,55 @@
+import os
+import uuid
+from urllib.parse import urlparse
+
+# -----------------------------------------------------------------------------
+# Byte storage by URI for the monitoring summaries: s3://bucket/key,
+# file:///path or a plain path.
+# -----------------------------------------------------------------------------
+
+
+class ObjectStore:
+    """Reads and writes bytes by URI: s3://bucket/key, file:///path or a plain path."""
+
+    def __init__(self, s3_client=None):
+        self._s3 = s3_client
+
+    @property
+    def s3(self):
+        if self._s3 is None:
+            import boto3
+            self._s3 = boto3.client("s3")
+        return self._s3
+
+    def read(self, uri: str) -> bytes:
+        parsed = urlparse(uri)
+        if parsed.scheme == "s3":
+            return self.s3.get_object(Bucket=parsed.netloc, Key=parsed.path.lstrip("/"))["Body"].read()
+        with open(parsed.path if parsed.scheme == "file" else uri, "rb") as f:
+            return f.read()
+
+    def write(self, uri: str, data: bytes):
+        parsed = urlparse(uri)
+        if parsed.scheme == "s3":
+            self.s3.put_object(Bucket=parsed.netloc, Key=parsed.path.lstrip("/"), Body=data)
+            return
+        path = parsed.path if parsed.scheme == "file" else uri
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial file.
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def exists(self, uri: str) -> bool:
+        """Checks for an object without reading it (HEAD on S3)."""
+        parsed = urlparse(uri)
+        if parsed.scheme != "s3":
+            return os.path.exists(parsed.path if parsed.scheme == "file" else uri)
+        try:
+            self.s3.head_object(Bucket=parsed.netloc, Key=parsed.path.lstrip("/"))
+            return True
+        except Exception as e:
+            if getattr(e, "response", {}).get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return False
+            raise
@@ -0,0 +1,86 @@
+import os
+import json
+
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# Distilled student model (see src/training/distillation.py).
+#
+# A model directory holding student.json + student.npz is served instead of
+# Chronos by the same handlers: the forward pass is two matrix products in
+# numpy, so neither torch nor the Chronos weights are loaded. The features,
+# forward pass and output scaling defined here are the ones distillation.py
+# trains with; the training image copies this file next to it.
+# -----------------------------------------------------------------------------
+STUDENT_WEIGHTS = "student.npz"
+STUDENT_CONFIG = "student.json"
+
+
+def is_student(model_dir: str) -> bool:
+    return os.path.exists(os.path.join(model_dir, STUDENT_CONFIG))
+
+
+def student_features(series: np.ndarray, context_length: int) -> tuple:
+    """(B, T) histories -> (B, 2L) standardised values and observed mask, plus loc and scale.
+
+    Histories shorter than `context_length` are left-padded as missing.
+    """
+    x = np.asarray(series, dtype=np.float32)[:, -context_length:]
+    if x.shape[1] < context_length:
+        x = np.pad(x, ((0, 0), (context_length - x.shape[1], 0)), constant_values=np.nan)
+    observed = ~np.isnan(x)
+    count = np.maximum(observed.sum(axis=1, keepdims=True), 1)
+    loc = np.where(observed, x, 0).sum(axis=1, keepdims=True) / count
+    scale = np.sqrt((np.where(observed, x - loc, 0) ** 2).sum(axis=1, keepdims=True) / count)
+    scale = np.where(scale > 1e-6, scale, 1.0).astype(np.float32)
+    z = np.where(observed, (x - loc) / scale, 0).astype(np.float32)
+    return np.concatenate([z, observed.astype(np.float32)], axis=1), loc.astype(np.float32), scale
+
+
+def forward(params: dict, features: np.ndarray) -> np.ndarray:
+    """out = X @ W + b (+ relu(X @ W1 + b1) @ W2 with a hidden layer), in the scaled space."""
+    out = features @ params["W"] + params["b"]
+    if "W1" in params:
+        out += np.maximum(features @ params["W1"] + params["b1"], 0) @ params["W2"]
+    return out
+
+
+def to_forecast(out: np.ndarray, loc: np.ndarray, scale: np.ndarray, pred_len: int, n_levels: int) -> np.ndarray:
+    """Scaled (B, H*Q) outputs -> (B, H, Q) quantiles, sorted so they never cross."""
+    q = np.sort(out.reshape(len(out), pred_len, n_levels), axis=2)
+    return q * scale[:, :, None] + loc[:, :, None]
+
+
+def interpolate_levels(quantiles: np.ndarray, trained: np.ndarray, levels: list) -> np.ndarray:
+    """Linear interpolation of (B, H, Q) quantiles to other levels, clamped at the outermost ones."""
+    levels = np.clip(np.asarray(levels, dtype=np.float32), trained[0], trained[-1])
+    upper = np.clip(np.searchsorted(trained, levels), 1, len(trained) - 1)
+    lower = upper - 1
+    weight = (levels - trained[lower]) / (trained[upper] - trained[lower])
+    return quantiles[..., lower] * (1 - weight) + quantiles[..., upper] * weight
+
+
+class StudentModel:
+    """Direct multi-horizon quantile model loaded from a model directory."""
+
+    def __init__(self, model_dir: str):
+        with open(os.path.join(model_dir, STUDENT_CONFIG)) as f:
+            config = json.load(f)
+        with np.load(os.path.join(model_dir, STUDENT_WEIGHTS)) as weights:
+            self.params = {k: weights[k].astype(np.float32) for k in weights.files}
+        self.context_length = config["context_length"]
+        self.prediction_length = config["prediction_length"]
+        self.quantile_levels = np.asarray(config["quantile_levels"], dtype=np.float32)
+
+    def predict_quantiles(self, series: np.ndarray, prediction_length: int, quantile_levels: list) -> tuple:
+        """Returns (B, H, Q) quantiles and the (B, H) median as the mean, like Chronos-Bolt."""
+        if prediction_length > self.prediction_length:
+            raise ValueError(
+                f"prediction_length {prediction_length} exceeds the student's horizon of {self.prediction_length}"
+            )
+        features, loc, scale = student_features(series, self.context_length)
+        q = to_forecast(forward(self.params, features), loc, scale, self.prediction_length,
+                        len(self.quantile_levels))[:, :prediction_length]
+        quantiles = interpolate_levels(q, self.quantile_levels, quantile_levels)
+        mean = interpolate_levels(q, self.quantile_levels, [0.5])[..., 0]
+        return quantiles.astype(np.float32), mean.astype(np.float32)
@@ -0,0 +1,76 @@
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "deployment")))
+
+import inference
+
+# -----------------------------------------------------------------------------
+# Context policy benchmark.
+#
+# Replays requests with random history lengths through input_fn + predict_fn,
+# once with the policy disabled (raw lengths) and once with truncation and
+# bucket padding, and compares the latency distributions.
+# -----------------------------------------------------------------------------
+
+
+def make_requests(n: int, min_len: int, max_len: int, batch_size: int, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    requests = []
+    for length in rng.integers(min_len, max_len, size=n):
+        series = rng.normal(100, 10, size=(batch_size, length)).round(3).tolist()
+        requests.append(json.dumps({"series": series, "prediction_length": 24}))
+    return requests
+
+
+def run(model, requests: list, max_context: int, buckets: tuple) -> np.ndarray:
+    inference.MAX_CONTEXT_LENGTH = max_context
+    inference.CONTEXT_BUCKETS = buckets
+
+    latencies = []
+    for body in requests:
+        start = time.perf_counter()
+        data = inference.input_fn(body, "application/json")
+        inference.predict_fn(data, model)
+        latencies.append(time.perf_counter() - start)
+    return np.asarray(latencies) * 1000
+
+
+def summary(name: str, latencies: np.ndarray):
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+    print(f"{name:<10}{latencies.mean():>9.1f}{latencies.std():>9.1f}{p50:>9.1f}{p90:>9.1f}{p99:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency variance with and without the context policy.")
+    parser.add_argument("--model", default="models/chronos-bolt-tiny")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--min-length", type=int, default=32)
+    parser.add_argument("--max-length", type=int, default=4096)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = inference.model_fn(args.model)
+    max_context, buckets = inference.MAX_CONTEXT_LENGTH, inference.CONTEXT_BUCKETS
+    requests = make_requests(args.requests, args.min_length, args.max_length, args.batch_size, args.seed)
+
+    # Warm up both code paths so one-off allocations don't skew the first run.
+    run(model, requests[:5], 0, ())
+    run(model, requests[:5], max_context, buckets)
+
+    raw = run(model, requests, 0, ())
+    bucketed = run(model, requests, max_context, buckets)
+
+    print(f"\n{'policy':<10}{'mean':>9}{'std':>9}{'p50':>9}{'p90':>9}{'p99':>9}   (ms)")
+    summary("raw", raw)
+    summary("bucketed", bucketed)
+    print(f"\nmax context: {max_context} | buckets: {buckets}")
+
+
+if __name__ == "__main__":
+    main()
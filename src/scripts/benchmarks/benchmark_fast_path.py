@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "deployment")))
+
+import fast_path
+import inference
+
+# -----------------------------------------------------------------------------
+# Compiled fast path benchmark.
+#
+# Measures eager latency for every (batch, context) bucket, then enables the
+# torch.compile fast path on the same model and measures again, reporting the
+# speedup per bucket and the one-off compile time.
+# -----------------------------------------------------------------------------
+
+
+def time_shape(model, batch: int, length: int, pred_len: int, repeats: int) -> float:
+    """Median latency (ms) of forecast_batch for one shape."""
+    rng = np.random.default_rng(0)
+    series = rng.normal(100, 10, size=(batch, length)).astype(np.float32)
+    forecast = lambda: inference.forecast_batch(model, series, None, pred_len, inference.DEFAULT_QUANTILES)
+    forecast()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        forecast()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-bucket speedup of the torch.compile fast path.")
+    parser.add_argument("--model", default="models/chronos-bolt-tiny")
+    parser.add_argument("--batch-buckets", default=",".join(map(str, fast_path.BATCH_BUCKETS)))
+    parser.add_argument("--context-buckets", default="128,512,2048")
+    parser.add_argument("--prediction-length", type=int, default=24)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    batch_buckets = tuple(int(b) for b in args.batch_buckets.split(","))
+    context_buckets = tuple(int(c) for c in args.context_buckets.split(","))
+    shapes = [(b, c) for b in batch_buckets for c in context_buckets]
+
+    fast_path.FAST_PATH = False
+    model = inference.model_fn(args.model)
+    eager = {s: time_shape(model, *s, args.prediction_length, args.repeats) for s in shapes}
+
+    compile_times = fast_path.enable(model, context_buckets, batch_buckets, args.prediction_length)
+    fast_path.FAST_PATH = True
+    compiled = {s: time_shape(model, *s, args.prediction_length, args.repeats) for s in shapes}
+
+    print(f"\n{'batch':>6}{'context':>9}{'eager ms':>11}{'compiled ms':>13}{'speedup':>9}{'compile s':>11}")
+    for s in shapes:
+        print(f"{s[0]:>6}{s[1]:>9}{eager[s]:>11.2f}{compiled[s]:>13.2f}{eager[s] / compiled[s]:>8.2f}x"
+              f"{compile_times[s]:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
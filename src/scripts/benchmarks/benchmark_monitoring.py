@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing as mp
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "deployment")))
+
+import inference
+import monitoring
+
+# -----------------------------------------------------------------------------
+# Monitoring overhead benchmark.
+#
+# Replays the same requests through input_fn + predict_fn with monitoring off
+# and on (feeding a monitor process, as serve.py does), and reports the latency
+# overhead on the request path together with the background cost of folding
+# one request into the statistics.
+# -----------------------------------------------------------------------------
+
+
+def make_requests(n: int, batch_size: int, length: int, seed: int) -> list:
+    rng = np.random.default_rng(seed)
+    ids = [f"turbine-{i}" for i in range(batch_size)]
+    return [
+        json.dumps({
+            "series": rng.normal(100, 10, size=(batch_size, length)).round(3).tolist(),
+            "series_ids": ids,
+            "prediction_length": 24,
+        })
+        for _ in range(n)
+    ]
+
+
+def run(model, requests: list) -> np.ndarray:
+    latencies = []
+    for body in requests:
+        start = time.perf_counter()
+        inference.predict_fn(inference.input_fn(body, "application/json"), model)
+        latencies.append(time.perf_counter() - start)
+    return np.asarray(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request-path overhead of the streaming monitor.")
+    parser.add_argument("--model", default="models/chronos-bolt-tiny")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--length", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    model = inference.model_fn(args.model)
+    requests = make_requests(args.requests, args.batch_size, args.length, args.seed)
+    run(model, requests[:5])
+
+    baseline = run(model, requests)
+    process, inbox = monitoring.start_process(mp.get_context("spawn"))
+    monitoring.connect(inbox)
+    run(model, requests[:5])
+    monitored = run(model, requests)
+    dropped = monitoring._monitor.dropped
+    monitoring.stop_process(process, inbox)
+
+    # Background cost: fold one request directly.
+    monitor = monitoring.Monitor(sink_uri="file:///tmp/chronos-monitoring-benchmark")
+    data = inference.input_fn(requests[0], "application/json")
+    mean = np.zeros((args.batch_size, 24), dtype=np.float32)
+    quantiles = np.zeros((args.batch_size, 24, len(data["quantile_levels"])), dtype=np.float32)
+    start = time.perf_counter()
+    for i in range(50):
+        inputs = monitoring.input_summary(data["series"], data["lengths"])
+    summary_ms = (time.perf_counter() - start) / 50 * 1000
+    start = time.perf_counter()
+    for i in range(50):
+        monitor._fold_forecast(f"bench-{i}", data["series_ids"], inputs, mean, quantiles, data["quantile_levels"])
+    fold_ms = (time.perf_counter() - start) / 50 * 1000
+
+    print(f"\n{'monitoring':<12}{'mean':>9}{'p50':>9}{'p99':>9}   (ms)")
+    for name, lat in (("off", baseline), ("on", monitored)):
+        print(f"{name:<12}{lat.mean():>9.2f}{np.percentile(lat, 50):>9.2f}{np.percentile(lat, 99):>9.2f}")
+    overhead = (np.median(monitored) - np.median(baseline)) / np.median(baseline) * 100
+    print(f"\nRequest-path overhead (p50): {overhead:+.2f}% (input summary {summary_ms:.2f} ms) | "
+          f"background fold: {fold_ms:.2f} ms/request "
+          f"({fold_ms / np.median(baseline) * 100:.2f}% of p50) | dropped: {dropped}")
+
+
+if __name__ == "__main__":
+    main()
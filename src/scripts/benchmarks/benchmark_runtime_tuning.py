@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing as mp
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "deployment")))
+
+import runtime_tuning
+
+# -----------------------------------------------------------------------------
+# Runtime tuning benchmark.
+#
+# Simulates machines with fewer cores by restricting the CPU affinity of the
+# worker processes, then compares aggregate throughput with PyTorch defaults
+# against the profile chosen by runtime_tuning.select_profile().
+# -----------------------------------------------------------------------------
+
+
+def build_workload(model_dir: str, batch_size: int, context_length: int):
+    """Returns a zero-argument callable running one forward pass."""
+    import torch
+
+    if model_dir:
+        from chronos import ChronosBoltPipeline
+
+        pipe = ChronosBoltPipeline.from_pretrained(model_dir, device_map="cpu")
+        context = torch.randn(batch_size, context_length)
+        return lambda: pipe.predict_quantiles(context, prediction_length=24)
+
+    # Synthetic stand-in roughly the size of chronos-bolt-tiny's encoder.
+    layer = torch.nn.TransformerEncoderLayer(d_model=256, nhead=4, dim_feedforward=1024, batch_first=True)
+    model = torch.nn.TransformerEncoder(layer, num_layers=4).eval()
+    tokens = torch.randn(batch_size, context_length // 16, 256)
+    return lambda: model(tokens)
+
+
+def worker(mode, cpus, workers, index, args, barrier, results):
+    os.sched_setaffinity(0, cpus)
+    if mode == "tuned":
+        profile = runtime_tuning.select_profile(workers, index, cpus=cpus, quota=float("inf"), nodes=[])
+        runtime_tuning.apply_profile(profile=profile)
+
+    import torch
+
+    run = build_workload(args.model, args.batch_size, args.context_length)
+    with torch.inference_mode():
+        run()  # warm-up
+        barrier.wait()
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            run()
+    results.put((time.perf_counter() - start, torch.get_num_threads()))
+
+
+def measure(mode: str, cores: int, workers: int, args) -> tuple:
+    ctx = mp.get_context("spawn")
+    cpus = runtime_tuning.visible_cpus()[:cores]
+    barrier, results = ctx.Barrier(workers), ctx.Queue()
+    procs = [
+        ctx.Process(target=worker, args=(mode, cpus, workers, i, args, barrier, results))
+        for i in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    timings = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    wall = max(t for t, _ in timings)
+    return workers * args.iterations / wall, timings[0][1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare default torch threading with the tuned profile.")
+    parser.add_argument("--cores", default="2,4,8", help="Comma-separated simulated core counts")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--context-length", type=int, default=512)
+    parser.add_argument("--model", default=None, help="Chronos model directory (synthetic workload if omitted)")
+    args = parser.parse_args()
+
+    available = len(runtime_tuning.visible_cpus())
+    print(f"🖥️  Visible CPUs: {available} | workers: {args.workers}\n")
+    print(f"{'cores':>6}{'default it/s':>15}{'threads':>9}{'tuned it/s':>13}{'threads':>9}{'speedup':>9}")
+
+    for cores in (int(c) for c in args.cores.split(",")):
+        if cores > available:
+            print(f"{cores:>6}  skipped (only {available} CPUs visible)")
+            continue
+        default_rate, default_threads = measure("default", cores, args.workers, args)
+        tuned_rate, tuned_threads = measure("tuned", cores, args.workers, args)
+        print(f"{cores:>6}{default_rate:>15.2f}{default_threads:>9}{tuned_rate:>13.2f}{tuned_threads:>9}"
+              f"{tuned_rate / default_rate:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+import urllib.request
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "client")))
+
+from chronos_client import ChronosClient, HttpTransport, RetryPolicy, InferenceError, percentiles, timed
+
+# -----------------------------------------------------------------------------
+# Serving benchmark: closed-loop concurrency sweep against one or more servers.
+#
+# Typical use compares the default handler server (baseline) with serve.py
+# (docker compose up, port 8080):
+#   python src/scripts/benchmarks/benchmark_serving.py \
+#       --start-baseline models/chronos-bolt-tiny --target serve=http://localhost:8080
+#
+# --start-baseline runs the same handlers (src/deployment/inference.py) in the
+# stock SageMaker PyTorch inference container, i.e. Multi Model Server with the
+# SageMaker inference toolkit, on --baseline-port. It is the equivalent of
+#   docker run --rm -p 8081:8080 -e SAGEMAKER_PROGRAM=inference.py \
+#       -v $PWD/models/chronos-bolt-tiny:/opt/ml/model \
+#       -v $PWD/src/deployment:/opt/ml/model/code:ro $BASELINE_IMAGE serve
+# The image lives in the AWS DLC registry, so log in first:
+#   aws ecr get-login-password --region eu-west-1 | docker login --username AWS \
+#       --password-stdin 763104351884.dkr.ecr.eu-west-1.amazonaws.com
+# The toolkit installs code/requirements.txt when the container starts.
+# -----------------------------------------------------------------------------
+DEFAULT_PAYLOAD = {"series": [float(i % 24) for i in range(512)], "prediction_length": 24}
+BASELINE_IMAGE = os.getenv(
+    "BASELINE_IMAGE",
+    "763104351884.dkr.ecr.eu-west-1.amazonaws.com/pytorch-inference:2.3.0-cpu-py311-ubuntu20.04-sagemaker",
+)
+DEPLOYMENT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "deployment"))
+
+
+def start_baseline(model_dir: str, image: str, port: int, workers: int, timeout: float = 600) -> str:
+    """Starts the stock SageMaker container on `port` and waits for /ping; returns the container id."""
+    container = subprocess.run(
+        [
+            "docker", "run", "--rm", "-d", "-p", f"{port}:8080",
+            "-e", "SAGEMAKER_PROGRAM=inference.py",
+            "-e", f"SAGEMAKER_MODEL_SERVER_WORKERS={workers}",
+            "-v", f"{os.path.abspath(model_dir)}:/opt/ml/model",
+            "-v", f"{DEPLOYMENT_DIR}:/opt/ml/model/code:ro",
+            image, "serve",
+        ],
+        check=True, capture_output=True, text=True,
+    ).stdout.strip()
+
+    print(f"⏳ Waiting for the baseline container {container[:12]} on port {port}...")
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/ping", timeout=2) as resp:
+                if resp.status == 200:
+                    return container
+        except OSError:
+            pass
+        time.sleep(2)
+    stop_baseline(container)
+    raise TimeoutError(f"Baseline container did not answer /ping within {timeout:.0f}s")
+
+
+def stop_baseline(container: str):
+    subprocess.run(["docker", "stop", container], check=False, capture_output=True)
+
+
+async def sweep_level(url: str, payload: dict, concurrency: int, requests_per_client: int) -> dict:
+    """Runs `concurrency` clients back to back and returns throughput and latency."""
+    # No retries: a 429 from backpressure should show up as a rejected request.
+    retry = RetryPolicy(max_attempts=1)
+    async with ChronosClient(HttpTransport(url, pool_size=concurrency), retry=retry) as client:
+        async def worker():
+            return [await timed(client.invoke(payload)) for _ in range(requests_per_client)]
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = [r for batch in await asyncio.gather(*(worker() for _ in range(concurrency))) for r in batch]
+        elapsed = loop.time() - start
+
+    ok = [t for r, t in results if not isinstance(r, Exception)]
+    rejected = sum(1 for r, _ in results if isinstance(r, InferenceError) and r.status == 429)
+    return {
+        "concurrency": concurrency,
+        "rps": round(len(ok) / elapsed, 2),
+        "rejected": rejected,
+        "failed": len(results) - len(ok) - rejected,
+        **{k: round(v, 1) for k, v in percentiles(ok).items()},
+    }
+
+
+async def run(targets: dict, payload: dict, levels: list, requests_per_client: int) -> dict:
+    report = {}
+    for name, url in targets.items():
+        report[name] = [await sweep_level(url, payload, c, requests_per_client) for c in levels]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark inference servers under increasing concurrency.")
+    parser.add_argument("--target", action="append", default=[], help="name=url, may be repeated")
+    parser.add_argument("--start-baseline", metavar="MODEL_DIR", default=None,
+                        help="Start the stock SageMaker container with this model as target 'baseline'")
+    parser.add_argument("--baseline-image", default=BASELINE_IMAGE)
+    parser.add_argument("--baseline-port", type=int, default=8081)
+    parser.add_argument("--baseline-workers", type=int, default=2,
+                        help="Model server workers in the baseline (match SAGEMAKER_MODEL_SERVER_WORKERS)")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests-per-client", type=int, default=20)
+    parser.add_argument("--payload", default=None, help="JSON file with the request payload")
+    args = parser.parse_args()
+    if not args.target and not args.start_baseline:
+        parser.error("give at least one --target or --start-baseline")
+
+    targets = dict(t.split("=", 1) for t in args.target)
+    levels = [int(c) for c in args.concurrency.split(",")]
+    payload = DEFAULT_PAYLOAD
+    if args.payload:
+        with open(args.payload) as f:
+            payload = json.load(f)
+
+    container = None
+    if args.start_baseline:
+        container = start_baseline(args.start_baseline, args.baseline_image, args.baseline_port, args.baseline_workers)
+        targets = {"baseline": f"http://localhost:{args.baseline_port}", **targets}
+    try:
+        report = asyncio.run(run(targets, payload, levels, args.requests_per_client))
+    finally:
+        if container:
+            stop_baseline(container)
+
+    print(f"\n{'target':<12}{'conc':>6}{'rps':>10}{'p50':>9}{'p99':>9}{'429':>6}{'err':>6}")
+    for name, rows in report.items():
+        for r in rows:
+            print(f"{name:<12}{r['concurrency']:>6}{r['rps']:>10}{r.get('p50', '-'):>9}"
+                  f"{r.get('p99', '-'):>9}{r['rejected']:>6}{r['failed']:>6}")
+
+
+if __name__ == "__main__":
+    main()
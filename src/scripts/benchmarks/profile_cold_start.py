@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import argparse
+import subprocess
+import urllib.error
+import urllib.request
+
+# -----------------------------------------------------------------------------
+# Cold-start profiling for the deployment image.
+#
+# Reports image size, container start → /ping ready, time to first
+# prediction, and the slowest imports of inference.py (python -X importtime)
+# measured inside the container.
+# -----------------------------------------------------------------------------
+SAMPLE_INPUT = os.path.join(os.path.dirname(__file__), "..", "..", "deployment", "sample_input.json")
+
+
+def image_size_mb(image: str) -> float:
+    out = subprocess.run(
+        ["docker", "image", "inspect", "--format", "{{.Size}}", image],
+        check=True, capture_output=True, text=True,
+    )
+    return int(out.stdout.strip()) / 1024 ** 2
+
+
+def wait_for(url: str, timeout: float, data: bytes = None) -> float:
+    """Polls `url` until it answers 200 and returns the elapsed seconds."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                if resp.status == 200:
+                    return time.perf_counter() - start
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.05)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+
+def import_profile(container: str, top: int) -> list:
+    """Top `top` imports by cumulative time (ms) when importing the handlers."""
+    out = subprocess.run(
+        ["docker", "exec", container, "python", "-X", "importtime", "-c",
+         "import inference, torch, chronos"],
+        check=True, capture_output=True, text=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:   <self us> | <cumulative us> | <indented module name>"
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        # Indentation marks nested imports; keep only top-level ones so time isn't counted twice.
+        if name.startswith("  "):
+            continue
+        rows.append((name.strip(), int(cumulative_us) / 1000))
+    return sorted(rows, key=lambda r: r[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile cold start of the deployment image.")
+    parser.add_argument("--image", default="chronos-sagemaker:latest")
+    parser.add_argument("--model-dir", default=os.path.abspath("models/chronos-bolt-tiny"))
+    parser.add_argument("--port", type=int, default=8085)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", default=None, help="Optional JSON report path")
+    args = parser.parse_args()
+
+    with open(SAMPLE_INPUT, "rb") as f:
+        payload = f.read()
+
+    report = {"image": args.image, "image_size_mb": round(image_size_mb(args.image), 1)}
+    base = f"http://localhost:{args.port}"
+
+    start = time.perf_counter()
+    container = subprocess.run(
+        ["docker", "run", "-d", "--rm", "-p", f"{args.port}:8080",
+         "-v", f"{args.model_dir}:/opt/ml/model:ro", args.image, "serve"],
+        check=True, capture_output=True, text=True,
+    ).stdout.strip()
+    try:
+        wait_for(f"{base}/ping", args.timeout)
+        report["start_to_ping_ready_s"] = round(time.perf_counter() - start, 2)
+
+        first = time.perf_counter()
+        wait_for(f"{base}/invocations", args.timeout, data=payload)
+        report["first_prediction_s"] = round(time.perf_counter() - first, 3)
+        report["start_to_first_prediction_s"] = round(time.perf_counter() - start, 2)
+
+        report["slowest_imports_ms"] = dict(import_profile(container, args.top))
+    finally:
+        subprocess.run(["docker", "stop", container], capture_output=True)
+
+    print("\n⏱️  Cold start report")
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
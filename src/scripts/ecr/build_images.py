@@ -0,0 +1,217 @@
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# -----------------------------------------------------------------------------
+# Build orchestrator for the training and deployment images.
+#
+# Both images are built concurrently with BuildKit (docker buildx), importing
+# and exporting their layer cache from the registry. Each image is also tagged
+# with the content hash of what goes into it (the Dockerfile and the context
+# files it COPYs); when that tag already exists in the registry, nothing the
+# image is built from changed and the build + push is skipped.
+#
+# Works against ECR (default) or any registry, e.g. a local one for testing:
+#   docker run -d -p 5000:5000 registry:2
+#   python src/scripts/ecr/build_images.py --registry localhost:5000
+# -----------------------------------------------------------------------------
+IMAGES = {
+    "training": {
+        "repo_env": "ECR_TRAINING_REPO_NAME",
+        "repo": "chronos-training",
+        "dockerfile": "./src/training/dockerfile",
+        "context": "./src",
+    },
+    "deployment": {
+        "repo_env": "ECR_DEPLOYMENT_REPO_NAME",
+        "repo": "chronos-deployment",
+        "dockerfile": "./src/deployment/dockerfile",
+        "context": "./src/deployment",
+    },
+}
+BUILDER_NAME = "chronos-builder"
+PLATFORM = "linux/amd64"
+IGNORED = {"__pycache__", ".pytest_cache", ".ipynb_checkpoints"}
+
+
+def log(image: str, msg: str):
+    print(f"[{image}] {time.strftime('%H:%M:%S')} | {msg}", flush=True)
+
+
+def copied_files(context: str, dockerfile: str) -> list:
+    """Context files the Dockerfile COPYs or ADDs; copies from other stages are left out."""
+    root = Path(context)
+    files = set()
+    # Join continuation lines so multi-line COPY instructions parse as one.
+    for line in re.sub(r"\\\n", " ", Path(dockerfile).read_text()).splitlines():
+        words = line.split()
+        if len(words) < 3 or words[0].upper() not in ("COPY", "ADD"):
+            continue
+        if any(w.startswith("--from") for w in words[1:]):
+            continue
+        sources = [w for w in words[1:] if not w.startswith("--")][:-1]
+        for source in sources:
+            if "://" in source:
+                continue
+            pattern = source.lstrip("/").rstrip("/")
+            for path in [root] if pattern in ("", ".") else root.glob(pattern):
+                if path.is_dir():
+                    files.update(p for p in path.rglob("*") if p.is_file())
+                elif path.is_file():
+                    files.add(path)
+    return sorted(files)
+
+
+def content_hash(context: str, dockerfile: str, platform: str = PLATFORM) -> str:
+    """sha256 over the Dockerfile, the target platform and the context files it copies."""
+    digest = hashlib.sha256()
+    digest.update(platform.encode())
+    digest.update(Path(dockerfile).read_bytes())
+    root = Path(context)
+    for path in copied_files(context, dockerfile):
+        relative = path.relative_to(root)
+        if IGNORED & set(relative.parts) or path.suffix in (".pyc", ".pyo"):
+            continue
+        digest.update(relative.as_posix().encode() + b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def tag_exists(ref: str) -> bool:
+    """True when `ref` resolves in its registry (uses the docker login credentials)."""
+    result = subprocess.run(["docker", "buildx", "imagetools", "inspect", ref],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return result.returncode == 0
+
+
+def ensure_builder():
+    """Creates a docker-container buildx builder (required for registry cache export)."""
+    exists = subprocess.run(["docker", "buildx", "inspect", BUILDER_NAME],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+    if not exists:
+        print(f"🧰 Creating buildx builder '{BUILDER_NAME}'")
+        # Host networking lets the builder reach a registry on localhost.
+        subprocess.run(["docker", "buildx", "create", "--name", BUILDER_NAME, "--driver", "docker-container",
+                        "--driver-opt", "network=host"], check=True)
+
+
+def run_streaming(image: str, cmd: list):
+    """Runs `cmd`, prefixing its output with the image name so parallel builds stay readable."""
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    for line in proc.stdout:
+        print(f"[{image}] {line.rstrip()}", flush=True)
+    if proc.wait() != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+
+def build_image(image: str, spec: dict, repository: str, image_tag: str, force: bool = False) -> dict:
+    """Builds and pushes one image unless its content hash is already in the registry."""
+    start = time.perf_counter()
+    digest = content_hash(spec["context"], spec["dockerfile"])
+    hash_ref = f"{repository}:ctx-{digest[:16]}"
+    target_ref = f"{repository}:{image_tag}"
+
+    if not force and tag_exists(hash_ref):
+        # Just move the human-readable tag onto the existing manifest.
+        subprocess.run(["docker", "buildx", "imagetools", "create", "-t", target_ref, hash_ref],
+                       check=True, stdout=subprocess.DEVNULL)
+        log(image, f"⏭️ Context unchanged ({hash_ref}), skipped build and push")
+        return {"image": image, "ref": target_ref, "skipped": True, "seconds": time.perf_counter() - start}
+
+    log(image, f"🏗️ Building {target_ref} ({PLATFORM})")
+    cache_ref = f"{repository}:buildcache"
+    run_streaming(image, [
+        "docker", "buildx", "build",
+        "--builder", BUILDER_NAME,
+        "--platform", PLATFORM,
+        "--provenance=false",
+        "--cache-from", f"type=registry,ref={cache_ref}",
+        "--cache-to", f"type=registry,ref={cache_ref},mode=max,image-manifest=true,oci-mediatypes=true",
+        # SageMaker needs Docker v2 manifests for the image itself.
+        "--output", "type=image,push=true,oci-mediatypes=false",
+        "-t", target_ref,
+        "-t", hash_ref,
+        "-f", spec["dockerfile"],
+        spec["context"],
+    ])
+    log(image, f"🚀 Pushed {target_ref}")
+    return {"image": image, "ref": target_ref, "skipped": False, "seconds": time.perf_counter() - start}
+
+
+def load_timings(path: str) -> dict:
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def ecr_registry(profile: str, region: str, repos: list) -> str:
+    """Ensures the ECR repositories exist, logs Docker in and returns the registry host."""
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from push_deployment_image import get_aws_clients, get_account_id, ensure_ecr_repository, docker_login
+
+    ecr_client, sts_client = get_aws_clients(profile, region)
+    account_id = get_account_id(sts_client)
+    for repo in repos:
+        ensure_ecr_repository(ecr_client, repo)
+    docker_login(account_id, region, profile)
+    return f"{account_id}.dkr.ecr.{region}.amazonaws.com"
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Build and push the Chronos images concurrently.")
+    parser.add_argument("--images", nargs="+", choices=list(IMAGES), default=list(IMAGES))
+    parser.add_argument("--registry", help="Registry host (default: the account's ECR registry)")
+    parser.add_argument("--tag", default=os.getenv("IMAGE_TAG", "latest"))
+    parser.add_argument("--force", action="store_true", help="Build even if the content hash exists")
+    parser.add_argument("--timings", default=os.getenv("BUILD_TIMINGS_PATH", ".image_build_times.json"),
+                        help="Where the last build duration per image is kept")
+    args = parser.parse_args()
+
+    repos = {image: os.getenv(IMAGES[image]["repo_env"], IMAGES[image]["repo"]) for image in args.images}
+    registry = args.registry or ecr_registry(
+        os.getenv("AWS_PROFILE"), os.getenv("AWS_REGION", "eu-west-1"), list(repos.values())
+    )
+    ensure_builder()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(args.images)) as pool:
+        futures = [
+            pool.submit(build_image, image, IMAGES[image], f"{registry}/{repos[image]}", args.tag, args.force)
+            for image in args.images
+        ]
+        results = [f.result() for f in futures]
+    wall = time.perf_counter() - start
+
+    # Time saved = what a full build took last time minus what the skip cost.
+    timings = load_timings(args.timings)
+    saved = 0.0
+    print(f"\n{'image':<12}{'status':<10}{'seconds':>9}{'saved':>9}   ref")
+    for r in results:
+        previous = timings.get(r["image"], 0.0)
+        image_saved = max(previous - r["seconds"], 0.0) if r["skipped"] else 0.0
+        saved += image_saved
+        if not r["skipped"]:
+            timings[r["image"]] = r["seconds"]
+        status = "skipped" if r["skipped"] else "built"
+        print(f"{r['image']:<12}{status:<10}{r['seconds']:>9.1f}{image_saved:>9.1f}   {r['ref']}")
+
+    with open(args.timings, "w") as f:
+        json.dump(timings, f, indent=2)
+
+    sequential = sum(r["seconds"] for r in results)
+    print(f"\n⏱️ Wall time {wall:.1f}s (sequential would be ~{sequential:.1f}s) | "
+          f"time saved by content-hash skips: {saved:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,7 @@ def load_env_variables():
         "REPO_NAME": os.getenv("ECR_TRAINING_REPO_NAME", "chronos-training"),
         "IMAGE_TAG": os.getenv("IMAGE_TAG", "latest"),
         "DOCKERFILE_PATH": "./src/training/dockerfile",
-        "DOCKER_CONTEXT": "./src/training"
+        "DOCKER_CONTEXT": "./src"
     }
 
 
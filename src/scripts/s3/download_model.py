@@ -1,14 +1,19 @@
 import os
+import sys
 import boto3
 from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "training")))
+from model_registry import ModelRegistry
+
 # -----------------------------------------------------------------------------
 # Load environment variables
 # -----------------------------------------------------------------------------
 load_dotenv()
 DEFAULT_BUCKET = os.getenv("AWS_S3_BUCKET", "")
 AWS_PROFILE = os.getenv("AWS_PROFILE", "default")
+REGISTRY_PREFIX = os.getenv("MODEL_REGISTRY_PREFIX", "registry")
 
 # Default local path to store downloaded models
 LOCAL_MODELS_DIR = Path("./models")
@@ -24,16 +29,15 @@ def list_models_in_s3(bucket: str, prefix: str = "models/", profile: str = None)
 
     print(f"🔍 Listing models from s3://{bucket}/{prefix} ...")
 
-    response = s3.list_objects_v2(Bucket=bucket, Prefix=prefix)
-    if "Contents" not in response:
-        print("⚠️ No models found in this bucket/prefix.")
-        return []
-
+    # list_objects_v2 returns at most 1000 keys per call.
     models = [
         obj["Key"]
-        for obj in response["Contents"]
+        for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix)
+        for obj in page.get("Contents", [])
         if obj["Key"].endswith(".tar.gz")
     ]
+    if not models:
+        print("⚠️ No models found in this bucket/prefix.")
     return models
 
 
@@ -51,6 +55,57 @@ def download_from_s3(bucket: str, key: str, dest_dir: Path, profile: str = None)
     return dest_path
 
 
+def choose(options: list, prompt: str):
+    """Print a numbered list and return the selected entry, or None."""
+    for i, option in enumerate(options, 1):
+        print(f"  {i}. {option}")
+    choice = input(f"\n{prompt}: ").strip()
+    return options[int(choice) - 1] if choice.isdigit() and 1 <= int(choice) <= len(options) else None
+
+
+def browse_registry(bucket: str, profile: str = None):
+    """Pick a registered model and version; download it or move its "production" alias."""
+    session = boto3.Session(profile_name=profile)
+    registry = ModelRegistry(f"s3://{bucket}/{REGISTRY_PREFIX}", session.client("s3"))
+
+    names = registry.list_models()
+    if not names:
+        print(f"⚠️ No models registered under s3://{bucket}/{REGISTRY_PREFIX}/")
+        return
+    print("\nRegistered models:\n")
+    name = choose(names, "Enter the number of the model")
+    if name is None:
+        print("⚠️ No valid selection made.")
+        return
+
+    aliases = registry.list_aliases(name)
+    tags = {}
+    for alias, version in aliases.items():
+        tags.setdefault(version, []).append(alias)
+    versions = registry.list_versions(name)
+    print(f"\nVersions of {name} (oldest first):\n")
+    labels = [
+        f"{v['version']}  {v['registered']:%Y-%m-%d %H:%M}  {' '.join(f'[{a}]' for a in tags.get(v['version'], []))}"
+        for v in versions
+    ]
+    label = choose(labels, "Enter the number of the version")
+    if label is None:
+        print("⚠️ No valid selection made.")
+        return
+    version = versions[labels.index(label)]["version"]
+
+    action = input("[d]ownload it, or [p]romote it to 'production' (also used for rollback)? [d]: ").strip().lower()
+    if action.startswith("p"):
+        previous = aliases.get("production")
+        registry.set_alias(name, "production", version)
+        print(f"✅ production: {previous} → {version}")
+        return
+
+    # Pulling into the same folder again only transfers the files that changed.
+    registry.pull(name, version, LOCAL_MODELS_DIR / name)
+    print(f"🗂️  Files saved in: {(LOCAL_MODELS_DIR / name).resolve()}")
+
+
 # -----------------------------------------------------------------------------
 # Main CLI logic
 # -----------------------------------------------------------------------------
@@ -64,6 +119,11 @@ def main():
         print("❌ No bucket provided and no AWS_S3_BUCKET in .env.")
         return
 
+    source = input("Browse [a]rchives (.tar.gz) or the model [r]egistry? [a]: ").strip().lower()
+    if source.startswith("r"):
+        browse_registry(bucket=bucket, profile=AWS_PROFILE)
+        return
+
     # Step 2: List models available
     models = list_models_in_s3(bucket=bucket, prefix="models/", profile=AWS_PROFILE)
     if not models:
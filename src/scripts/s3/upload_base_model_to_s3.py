@@ -1,11 +1,16 @@
 import os
+import sys
 import tarfile
 import boto3
 from dotenv import load_dotenv
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "training")))
+from model_registry import ModelRegistry
+
 load_dotenv()
 DEFAULT_BUCKET = os.getenv("AWS_S3_BUCKET", "")
 AWS_PROFILE = os.getenv("AWS_PROFILE", "default")
+REGISTRY_PREFIX = os.getenv("MODEL_REGISTRY_PREFIX", "registry")
 
 MODELS_DIR = "./models"
 
@@ -26,6 +31,12 @@ def upload_to_s3(file_path: str, bucket: str, s3_key: str, profile: str):
     s3.upload_file(file_path, bucket, s3_key)
     print("✅ Upload complete!")
 
+def register_model(folder_path: str, bucket: str, profile: str):
+    """Register a folder as a new registry version; only new or changed files are uploaded."""
+    session = boto3.Session(profile_name=profile)
+    registry = ModelRegistry(f"s3://{bucket}/{REGISTRY_PREFIX}", session.client("s3"))
+    return registry.push(os.path.basename(folder_path), folder_path)
+
 def main():
     print("📦 Chronos Model Uploader")
     print("==========================\n")
@@ -57,9 +68,16 @@ def main():
         print("❌ No bucket provided and no AWS_S3_BUCKET in .env.")
         return
 
+    mode = input("Upload as [t]ar.gz archive or to the model [r]egistry? [t]: ").strip().lower() or "t"
+
     for folder in selected_folders:
         folder_path = os.path.join(MODELS_DIR, folder)
-        
+
+        if mode.startswith("r"):
+            manifest = register_model(folder_path, bucket, AWS_PROFILE)
+            print(f"✅ Use BASE_MODEL_PATH=registry:{folder}@{manifest['version']} to train from it")
+            continue
+
         archive_path = os.path.join(MODELS_DIR, f"{folder}.tar.gz")
 
         print(f"\n🗜️ Compressing '{folder}'...")
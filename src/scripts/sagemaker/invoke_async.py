@@ -0,0 +1,99 @@
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+
+import boto3
+from botocore.exceptions import ClientError
+from dotenv import load_dotenv
+
+# -----------------------------------------------------------------------------
+# Submit a large payload to an async endpoint (launch_endpoint.py with
+# ASYNC_OUTPUT_PATH) and wait for its result.
+#
+# The payload is uploaded under ASYNC_INPUT_PATH; SageMaker queues the request,
+# reads the input, runs the container's /invocations and writes the result to
+# the endpoint's output path. Queue state is kept by SageMaker, so requests
+# survive container restarts. Scope the endpoint role's S3 access to the
+# ASYNC_INPUT_PATH and ASYNC_OUTPUT_PATH prefixes.
+#   python src/scripts/sagemaker/invoke_async.py payload.json --wait
+# -----------------------------------------------------------------------------
+load_dotenv()
+
+aws_profile     = os.getenv("AWS_PROFILE")
+endpoint_name   = os.getenv("AWS_SAGEMAKER_ENDPOINT_NAME")
+async_input     = os.getenv("ASYNC_INPUT_PATH")  # s3://bucket/prefix for request payloads
+timeout_s       = int(os.getenv("ASYNC_INVOCATION_TIMEOUT", "3600"))
+
+
+def split_uri(uri: str) -> tuple:
+    assert uri.startswith("s3://"), f"Invalid S3 URI: {uri}"
+    bucket, _, key = uri[len("s3://"):].partition("/")
+    return bucket, key
+
+
+def s3_object(s3, uri: str):
+    """Body of an S3 object, or None while it does not exist."""
+    bucket, key = split_uri(uri)
+    try:
+        return s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+            return None
+        raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one request on an async SageMaker endpoint.")
+    parser.add_argument("payload", help="JSON request body (same format as real-time requests)")
+    parser.add_argument("--wait", action="store_true", help="Poll until the result or failure is written")
+    parser.add_argument("--output", default=None, help="Where to save the result (default: print a summary)")
+    args = parser.parse_args()
+
+    missing = [k for k, v in {"AWS_SAGEMAKER_ENDPOINT_NAME": endpoint_name, "ASYNC_INPUT_PATH": async_input}.items()
+               if not v]
+    if missing:
+        raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+
+    session = boto3.Session(profile_name=aws_profile)
+    s3, runtime = session.client("s3"), session.client("sagemaker-runtime")
+
+    input_uri = f"{async_input.rstrip('/')}/{uuid.uuid4().hex}.json"
+    bucket, key = split_uri(input_uri)
+    print(f"⬆️  Uploading {args.payload} → {input_uri}")
+    s3.upload_file(args.payload, bucket, key)
+
+    response = runtime.invoke_endpoint_async(
+        EndpointName                = endpoint_name,
+        InputLocation               = input_uri,
+        ContentType                 = "application/json",
+        Accept                      = "application/json",
+        InvocationTimeoutSeconds    = timeout_s,
+    )
+    output_uri, failure_uri = response["OutputLocation"], response.get("FailureLocation")
+    print(f"🕒 Queued {response['InferenceId']}\n   output:  {output_uri}\n   failure: {failure_uri}")
+    if not args.wait:
+        return
+
+    while True:
+        result = s3_object(s3, output_uri)
+        if result is not None:
+            break
+        failure = s3_object(s3, failure_uri) if failure_uri else None
+        if failure is not None:
+            sys.exit(f"❌ Request failed: {failure.decode(errors='replace')[:1000]}")
+        time.sleep(5)
+
+    if args.output:
+        with open(args.output, "wb") as f:
+            f.write(result)
+        print(f"✅ Result saved to {args.output}")
+    else:
+        forecast = json.loads(result)["forecast"]
+        print(f"✅ Result with keys {sorted(forecast)} ({len(result):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 import os
+import sys
+import json
 import boto3
 import sagemaker
 
 from sagemaker.model import Model
+from sagemaker.async_inference import AsyncInferenceConfig
 from dotenv import load_dotenv
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "training")))
+from model_registry import ModelRegistry
+
 # ------------------------------------------------------
 # Load environment variables
 # ------------------------------------------------------
@@ -18,6 +24,21 @@ s3_model_path     = os.getenv("PRODUCTION_MODEL_PATH")  # S3 path to model.tar.g
 endpoint_name     = os.getenv("AWS_SAGEMAKER_ENDPOINT_NAME")
 instance_type     = os.getenv("AWS_SAGEMAKER_INSTANCE_TYPE", "ml.m5.large")
 instance_count    = int(os.getenv("AWS_SAGEMAKER_INSTANCE_COUNT", "1"))
+capacity_plan     = os.getenv("CAPACITY_PLAN_PATH")  # JSON from plan_capacity.py (optional)
+
+# Model registry (optional, replaces PRODUCTION_MODEL_PATH): deploy the version
+# MODEL_ALIAS points at. download_model.py moves "production"; a rollback is
+# moving it back and relaunching, which reuses the version's archive.
+registry_uri      = os.getenv("MODEL_REGISTRY_URI")
+model_name        = os.getenv("MODEL_NAME", "chronos-finetuned")
+model_alias       = os.getenv("MODEL_ALIAS", "production")
+
+# Async inference (optional): SageMaker queues requests whose payloads sit in
+# S3 (see invoke_async.py) and writes each result under ASYNC_OUTPUT_PATH.
+async_output_path = os.getenv("ASYNC_OUTPUT_PATH")
+async_failure_path = os.getenv("ASYNC_FAILURE_PATH")
+async_concurrency = int(os.getenv("ASYNC_MAX_CONCURRENCY", "4"))  # per instance, below MAX_QUEUE_DEPTH
+async_timeout_s   = int(os.getenv("ASYNC_INVOCATION_TIMEOUT", "3600"))  # as sent by invoke_async.py
 
 # Optional environment vars for the model
 model_env_vars = {
@@ -25,7 +46,16 @@ model_env_vars = {
     "HF_TASK": os.getenv("HF_TASK", "time-series-forecasting"),
     "MODEL_CACHE_DIR": os.getenv("MODEL_CACHE_DIR", "/opt/ml/model"),
     "SAGEMAKER_REGION": os.getenv("AWS_REGION", "eu-west-1"),
+    # Dimension of the metrics the container publishes (cloudwatch.py).
+    "ENDPOINT_NAME": endpoint_name or "",
 }
+if async_output_path:
+    # No batch limit (chunked instead), and queued requests may wait up to the invocation timeout.
+    model_env_vars.update({
+        "ASYNC_INFERENCE": "1",
+        "ASYNC_BATCH_SIZE": os.getenv("ASYNC_BATCH_SIZE", "256"),
+        "DEFAULT_DEADLINE_MS": str(async_timeout_s * 1000),
+    })
 
 # Validate required ones
 missing = [
@@ -33,24 +63,43 @@ missing = [
         "AWS_PROFILE": aws_profile,
         "AWS_SAGEMAKER_ROLE_ARN": role_arn,
         "AWS_ECR_DEPLOYMENT_IMAGE_URI": ecr_image_uri,
-        "AWS_S3_MODEL_PATH": s3_model_path,
+        "PRODUCTION_MODEL_PATH or MODEL_REGISTRY_URI": s3_model_path or registry_uri,
         "AWS_SAGEMAKER_ENDPOINT_NAME": endpoint_name,
     }.items() if v is None
 ]
 if missing:
     raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
 
+# A capacity plan sets the instance type/count and an autoscaling policy
+autoscaling = None
+if capacity_plan:
+    with open(capacity_plan) as f:
+        plan = json.load(f)
+    instance_type  = plan["instance_type"]
+    instance_count = plan["instance_count"]
+    autoscaling    = plan["autoscaling"]
+
 # ------------------------------------------------------
 # SageMaker setup
 # ------------------------------------------------------
 boto_session = boto3.Session(profile_name=aws_profile)
 sagemaker_session = sagemaker.Session(boto_session=boto_session)
 
+if registry_uri:
+    registry = ModelRegistry(registry_uri, boto_session.client("s3"))
+    version = registry.resolve(model_name, model_alias)
+    if version is None:
+        raise ValueError(f"Alias '{model_alias}' of model '{model_name}' not found in {registry_uri}")
+    print(f"🗂️  {model_name}@{model_alias} → {version}")
+    s3_model_path = registry.archive(model_name, version)
+
 print("🚀 Starting endpoint deployment...")
 print(f"Model artifact: {s3_model_path}")
 print(f"Image URI:      {ecr_image_uri}")
 print(f"Endpoint:       {endpoint_name}")
 print(f"Role:           {role_arn}")
+print(f"Instances:      {instance_count} x {instance_type}")
+print(f"Async output:   {async_output_path or '- (real-time endpoint)'}")
 
 # ------------------------------------------------------
 # Create SageMaker model and deploy
@@ -63,18 +112,59 @@ model = Model(
     env                 = model_env_vars,
 )
 
+async_config = None
+if async_output_path:
+    async_config = AsyncInferenceConfig(
+        output_path                         = async_output_path,
+        failure_path                        = async_failure_path,
+        max_concurrent_invocations_per_instance = async_concurrency,
+    )
+
 predictor = model.deploy(
     initial_instance_count  = instance_count,
     instance_type           = instance_type,
     endpoint_name           = endpoint_name,
+    async_inference_config  = async_config,
     log                     = True,
 )
 
+# ------------------------------------------------------
+# Target-tracking autoscaling on invocations per instance
+# ------------------------------------------------------
+if autoscaling:
+    scaling = boto_session.client("application-autoscaling")
+    resource_id = f"endpoint/{endpoint_name}/variant/AllTraffic"
+
+    scaling.register_scalable_target(
+        ServiceNamespace    = "sagemaker",
+        ResourceId          = resource_id,
+        ScalableDimension   = "sagemaker:variant:DesiredInstanceCount",
+        MinCapacity         = autoscaling["min_capacity"],
+        MaxCapacity         = autoscaling["max_capacity"],
+    )
+    scaling.put_scaling_policy(
+        PolicyName          = f"{endpoint_name}-invocations-target-tracking",
+        ServiceNamespace    = "sagemaker",
+        ResourceId          = resource_id,
+        ScalableDimension   = "sagemaker:variant:DesiredInstanceCount",
+        PolicyType          = "TargetTrackingScaling",
+        TargetTrackingScalingPolicyConfiguration = {
+            "TargetValue": autoscaling["target_value"],
+            "PredefinedMetricSpecification": {"PredefinedMetricType": autoscaling["metric"]},
+            "ScaleInCooldown": autoscaling["scale_in_cooldown"],
+            "ScaleOutCooldown": autoscaling["scale_out_cooldown"],
+        },
+    )
+    print(f"📈 Autoscaling: {autoscaling['min_capacity']}-{autoscaling['max_capacity']} instances, "
+          f"target {autoscaling['target_value']} invocations/instance/min")
+
 # ------------------------------------------------------
 # Summary
 # ------------------------------------------------------
 print("\n✅ Deployment succeeded!")
 print(f"Endpoint name: {endpoint_name}")
+if async_output_path:
+    print(f"Submit requests with: python src/scripts/sagemaker/invoke_async.py payload.json --wait")
 print(f"Invoke example:\n")
 print(f"boto3.client('sagemaker-runtime').invoke_endpoint(")
 print(f"    EndpointName='{endpoint_name}',")
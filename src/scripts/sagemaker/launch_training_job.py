@@ -2,6 +2,7 @@ import os
 import boto3
 import sagemaker
 
+from sagemaker.inputs import TrainingInput
 from dotenv import load_dotenv
 
 
@@ -18,6 +19,19 @@ TRAINING_DATA_PATH  = os.getenv("TRAINING_DATA_PATH")
 TUNNED_MODEL_PATH   = os.getenv("TUNNED_MODEL_PATH")
 AWS_PROFILE         = ""
 TRAINING_LIMIT_TIME = os.getenv("TRAINING_LIMIT_TIME", "3600")
+TRAINING_INPUT_MODE = os.getenv("TRAINING_INPUT_MODE", "FastFile")  # File | FastFile | Pipe
+CONTINUED_TRAINING  = os.getenv("CONTINUED_TRAINING", "0")  # 1 = train on new data since the last artifact
+REPLAY_RATIO        = os.getenv("REPLAY_RATIO", "0.5")
+CONTEXT_LENGTH      = os.getenv("CONTEXT_LENGTH", "512")
+FINE_TUNE_STEPS     = os.getenv("FINE_TUNE_STEPS", "1000")
+FINE_TUNE_LR        = os.getenv("FINE_TUNE_LR", "1e-5")
+KNOWN_COVARIATES    = os.getenv("KNOWN_COVARIATES", "")  # comma-separated, e.g. WindSpeed,WindDirection
+PAST_COVARIATES     = os.getenv("PAST_COVARIATES", "")   # comma-separated, e.g. AmbientTemperature
+MODEL_REGISTRY_URI  = os.getenv("MODEL_REGISTRY_URI", "")  # e.g. s3://<bucket>/registry
+MODEL_NAME          = os.getenv("MODEL_NAME", "chronos-finetuned")
+TRAINING_MODE       = os.getenv("TRAINING_MODE", "finetune")  # finetune | distill (train a student from TUNNED_MODEL_PATH)
+STUDENT_MODEL_PATH  = os.getenv("STUDENT_MODEL_PATH", "")
+ITEM_COLUMN         = os.getenv("ITEM_COLUMN", "")  # distill: site column; empty = one series per file
 
 ECR_URI             = os.getenv("AWS_ECR_TRAINING_IMAGE_URI")
 ROLE                = os.getenv("AWS_SAGEMAKER_ROLE_ARN")
@@ -40,6 +54,12 @@ print(f"""System Variables:
       - TUNNED_MODEL_PATH:   {TUNNED_MODEL_PATH}
       - AWS_PROFILE:         {AWS_PROFILE}
       - TRAINING_LIMIT_TIME: {TRAINING_LIMIT_TIME} seconds
+      - TRAINING_INPUT_MODE: {TRAINING_INPUT_MODE}
+      - TRAINING_MODE:       {TRAINING_MODE}
+      - CONTINUED_TRAINING:  {CONTINUED_TRAINING}
+      - FINE_TUNE:           {FINE_TUNE_STEPS} steps (lr {FINE_TUNE_LR}), context {CONTEXT_LENGTH}
+      - COVARIATES:          known [{KNOWN_COVARIATES}], past [{PAST_COVARIATES}]
+      - MODEL_REGISTRY_URI:  {MODEL_REGISTRY_URI or "(disabled)"}
       - ECR_URI:             {ECR_URI}
       - ROLE:                {ROLE}
       """)
@@ -50,14 +70,37 @@ estimator = sagemaker.estimator.Estimator(
     instance_count      = 1,
     instance_type       = "ml.m5.large",
     base_job_name       = "chronos-training-job",
+    input_mode          = TRAINING_INPUT_MODE,
     environment         = {
         "TRAINING_DATA_PATH": TRAINING_DATA_PATH,
         "TRAINING_LIMIT_TIME": TRAINING_LIMIT_TIME,
         "BASE_MODEL_PATH": BASE_MODEL_PATH,
         "TUNNED_MODEL_PATH": TUNNED_MODEL_PATH,
         "AWS_PROFILE": AWS_PROFILE,
+        "CONTINUED_TRAINING": CONTINUED_TRAINING,
+        "REPLAY_RATIO": REPLAY_RATIO,
+        "CONTEXT_LENGTH": CONTEXT_LENGTH,
+        "FINE_TUNE_STEPS": FINE_TUNE_STEPS,
+        "FINE_TUNE_LR": FINE_TUNE_LR,
+        "KNOWN_COVARIATES": KNOWN_COVARIATES,
+        "PAST_COVARIATES": PAST_COVARIATES,
+        "MODEL_REGISTRY_URI": MODEL_REGISTRY_URI,
+        "MODEL_NAME": MODEL_NAME,
+        "STUDENT_MODEL_PATH": STUDENT_MODEL_PATH,
+        "ITEM_COLUMN": ITEM_COLUMN,
     },
+    container_entry_point = ["python", "distill_entrypoint.py"] if TRAINING_MODE == "distill" else None,
     sagemaker_session   = session,
 )
 
-estimator.fit()
+# The entrypoint reads from /opt/ml/input/data/<channel>; with FastFile or Pipe
+# the job starts without waiting for the dataset to be copied to the instance.
+channels = {
+    "training": TrainingInput(s3_data=TRAINING_DATA_PATH, input_mode=TRAINING_INPUT_MODE),
+}
+
+# The student is distilled from the fine-tuned model, so the base model is not needed.
+if BASE_MODEL_PATH.startswith("s3://") and TRAINING_MODE != "distill":
+    channels["model"] = TrainingInput(s3_data=BASE_MODEL_PATH, input_mode=TRAINING_INPUT_MODE)
+
+estimator.fit(inputs=channels)
@@ -0,0 +1,245 @@
+import os
+import sys
+import json
+import time
+import math
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEPLOYMENT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "deployment"))
+sys.path.append(DEPLOYMENT_DIR)
+
+# -----------------------------------------------------------------------------
+# Endpoint capacity planner.
+#
+# 1. Sweep: for each simulated CPU count (CPU affinity, as in
+#    benchmark_runtime_tuning.py) the inference handlers run under a closed-loop
+#    load at increasing concurrency, recording throughput and p99 latency.
+# 2. Fit: throughput vs concurrency follows the Universal Scalability Law
+#    X(N) = lam*N / (1 + sigma*(N-1) + kappa*N*(N-1)); peak throughput vs CPU
+#    count is fitted as a power law so unmeasured instance sizes can be sized.
+# 3. Plan: the cheapest instance type/count that serves the peak load within
+#    the latency SLO, and a target-tracking policy for launch_endpoint.py.
+# -----------------------------------------------------------------------------
+
+# vCPUs and approximate on-demand $/hour (eu-west-1); override with --prices.
+INSTANCE_TYPES = {
+    "ml.c5.large":    (2, 0.119),
+    "ml.c5.xlarge":   (4, 0.238),
+    "ml.c5.2xlarge":  (8, 0.476),
+    "ml.c5.4xlarge":  (16, 0.952),
+    "ml.m5.large":    (2, 0.128),
+    "ml.m5.xlarge":   (4, 0.256),
+    "ml.m5.2xlarge":  (8, 0.512),
+    "ml.m5.4xlarge":  (16, 1.024),
+}
+
+
+# -----------------------------------------------------------------------------
+# Load sweep
+# -----------------------------------------------------------------------------
+def make_payload(batch_size: int, context_length: int, prediction_length: int) -> bytes:
+    rng = np.random.default_rng(0)
+    series = rng.normal(100, 10, size=(batch_size, context_length)).round(3).tolist()
+    return json.dumps({"series": series, "prediction_length": prediction_length}).encode()
+
+
+def sweep_worker(cpus: list, model_dir: str, body: bytes, levels: list, duration: float, results):
+    """Runs in a process pinned to `cpus`: closed-loop load at each concurrency level."""
+    os.sched_setaffinity(0, cpus)
+    import runtime_tuning
+    runtime_tuning.apply_profile(profile=runtime_tuning.select_profile(1, 0, cpus=cpus, quota=float("inf"), nodes=[]))
+    import inference
+
+    model = inference.model_fn(model_dir)
+
+    def handle():
+        data = inference.input_fn(body, "application/json")
+        return inference.output_fn(inference.predict_fn(data, model), "application/json")
+
+    handle()  # warm-up
+
+    def client(stop_at: float) -> list:
+        latencies = []
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            handle()
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    points = []
+    for concurrency in levels:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            runs = list(pool.map(client, [start + duration] * concurrency))
+        elapsed = time.perf_counter() - start
+        latencies = np.concatenate([np.asarray(r) for r in runs]) * 1000
+        points.append({
+            "concurrency": concurrency,
+            "throughput": len(latencies) / elapsed,
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+        })
+    results.put(points)
+
+
+def run_sweep(cores: int, model_dir: str, body: bytes, levels: list, duration: float) -> list:
+    import runtime_tuning
+
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    cpus = runtime_tuning.visible_cpus()[:cores]
+    proc = ctx.Process(target=sweep_worker, args=(cpus, model_dir, body, levels, duration, results))
+    proc.start()
+    points = results.get()
+    proc.join()
+    return points
+
+
+# -----------------------------------------------------------------------------
+# Model fitting
+# -----------------------------------------------------------------------------
+def fit_usl(concurrency: np.ndarray, throughput: np.ndarray) -> tuple:
+    """Least-squares USL fit; returns (lam, sigma, kappa).
+
+    N / X(N) = (1 + sigma*(N-1) + kappa*N*(N-1)) / lam is linear in the
+    unknowns, so the fit is a single lstsq.
+    """
+    n = np.asarray(concurrency, dtype=np.float64)
+    design = np.stack([np.ones_like(n), n - 1, n * (n - 1)], axis=1)
+    a, b, c = np.linalg.lstsq(design, n / np.asarray(throughput, dtype=np.float64), rcond=None)[0]
+    lam = 1 / a
+    return lam, max(b * lam, 0.0), max(c * lam, 0.0)
+
+
+def usl_throughput(n, lam: float, sigma: float, kappa: float):
+    n = np.asarray(n, dtype=np.float64)
+    return lam * n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+
+
+def capacity_at_slo(lam: float, sigma: float, kappa: float, tail_ratio: float, slo_ms: float,
+                    max_concurrency: int = 256) -> float:
+    """Highest throughput whose predicted p99 (Little's law latency x tail ratio) meets the SLO."""
+    n = np.arange(1, max_concurrency + 1)
+    x = usl_throughput(n, lam, sigma, kappa)
+    p99_ms = n / x * 1000 * tail_ratio
+    ok = p99_ms <= slo_ms
+    return float(x[ok].max()) if ok.any() else 0.0
+
+
+def fit_core_scaling(cores: list, capacity: list) -> tuple:
+    """Power-law fit capacity = a * cores**b (log-log lstsq); one point gives linear scaling."""
+    if len(cores) == 1:
+        return capacity[0] / cores[0], 1.0
+    b, log_a = np.polyfit(np.log(cores), np.log(capacity), 1)
+    return float(np.exp(log_a)), float(b)
+
+
+# -----------------------------------------------------------------------------
+# Recommendation
+# -----------------------------------------------------------------------------
+def recommend(a: float, b: float, peak_rps: float, base_rps: float, target_utilization: float,
+              instance_types: dict = INSTANCE_TYPES) -> dict:
+    """Cheapest instance type/count for `peak_rps` plus a target-tracking policy."""
+    options = []
+    for name, (vcpus, price) in instance_types.items():
+        per_instance = a * vcpus ** b
+        if per_instance <= 0:
+            continue
+        count = max(1, math.ceil(peak_rps / (per_instance * target_utilization)))
+        options.append({"instance_type": name, "vcpus": vcpus, "rps_per_instance": per_instance,
+                        "instance_count": count, "hourly_cost": count * price})
+    options.sort(key=lambda o: (o["hourly_cost"], o["instance_count"]))
+    best = options[0]
+
+    per_instance = best["rps_per_instance"]
+    return {
+        "instance_type": best["instance_type"],
+        "instance_count": best["instance_count"],
+        "hourly_cost": round(best["hourly_cost"], 3),
+        "autoscaling": {
+            # SageMakerVariantInvocationsPerInstance is counted per minute.
+            "metric": "SageMakerVariantInvocationsPerInstance",
+            "target_value": round(per_instance * target_utilization * 60, 1),
+            "min_capacity": max(1, math.ceil(base_rps / (per_instance * target_utilization))),
+            "max_capacity": max(best["instance_count"], math.ceil(1.5 * peak_rps / (per_instance * target_utilization))),
+            "scale_in_cooldown": 300,
+            "scale_out_cooldown": 60,
+        },
+        "alternatives": options[1:4],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit a throughput/latency model and size the endpoint.")
+    parser.add_argument("--model", default="models/chronos-bolt-tiny")
+    parser.add_argument("--cores", default="1,2,4", help="Comma-separated simulated CPU counts")
+    parser.add_argument("--concurrency", default="1,2,4,8,16")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per load level")
+    parser.add_argument("--batch-size", type=int, default=1, help="Series per request")
+    parser.add_argument("--context-length", type=int, default=512)
+    parser.add_argument("--prediction-length", type=int, default=24)
+    parser.add_argument("--peak-rps", type=float, required=True, help="Expected peak requests/second")
+    parser.add_argument("--base-rps", type=float, default=None, help="Typical off-peak requests/second")
+    parser.add_argument("--latency-slo-ms", type=float, default=500.0, help="p99 latency target")
+    parser.add_argument("--target-utilization", type=float, default=0.7)
+    parser.add_argument("--prices", help="JSON file {instance_type: [vcpus, hourly_price]}")
+    parser.add_argument("--output", default="capacity_plan.json")
+    args = parser.parse_args()
+
+    import runtime_tuning
+
+    available = len(runtime_tuning.visible_cpus())
+    cores = [c for c in (int(c) for c in args.cores.split(",")) if c <= available]
+    levels = [int(c) for c in args.concurrency.split(",")]
+    body = make_payload(args.batch_size, args.context_length, args.prediction_length)
+    print(f"🖥️  Visible CPUs: {available} | sweeping cores {cores} x concurrency {levels}\n")
+
+    fits = {}
+    print(f"{'cores':>6}{'conc':>6}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}")
+    for c in cores:
+        points = run_sweep(c, args.model, body, levels, args.duration)
+        for p in points:
+            print(f"{c:>6}{p['concurrency']:>6}{p['throughput']:>9.1f}{p['p50_ms']:>9.1f}{p['p99_ms']:>9.1f}")
+
+        lam, sigma, kappa = fit_usl([p["concurrency"] for p in points], [p["throughput"] for p in points])
+        tail_ratio = float(np.median([p["p99_ms"] / p["p50_ms"] for p in points]))
+        fits[c] = {
+            "lam": lam, "sigma": sigma, "kappa": kappa, "tail_ratio": tail_ratio,
+            "capacity_rps": capacity_at_slo(lam, sigma, kappa, tail_ratio, args.latency_slo_ms),
+            "points": points,
+        }
+        print(f"       USL: lam={lam:.2f} sigma={sigma:.3f} kappa={kappa:.4f} | "
+              f"capacity at p99 <= {args.latency_slo_ms:.0f} ms: {fits[c]['capacity_rps']:.1f} req/s\n")
+
+    measured = [c for c in cores if fits[c]["capacity_rps"] > 0]
+    if not measured:
+        sys.exit(f"❌ No configuration meets the {args.latency_slo_ms} ms p99 target.")
+    a, b = fit_core_scaling(measured, [fits[c]["capacity_rps"] for c in measured])
+    print(f"📈 Capacity ≈ {a:.2f} * vCPUs^{b:.2f} req/s")
+
+    instance_types = INSTANCE_TYPES
+    if args.prices:
+        with open(args.prices) as f:
+            instance_types = {k: tuple(v) for k, v in json.load(f).items()}
+
+    base_rps = args.base_rps if args.base_rps is not None else args.peak_rps / 4
+    plan = recommend(a, b, args.peak_rps, base_rps, args.target_utilization, instance_types)
+    plan["inputs"] = {k: v for k, v in vars(args).items() if k not in ("model", "prices", "output")}
+    plan["model"] = {"core_scaling": {"a": a, "b": b}, "per_core_count": fits}
+
+    with open(args.output, "w") as f:
+        json.dump(plan, f, indent=2)
+
+    policy = plan["autoscaling"]
+    print(f"\n✅ Recommendation: {plan['instance_count']} x {plan['instance_type']} (~${plan['hourly_cost']}/h)")
+    print(f"   Target tracking: {policy['target_value']} invocations/instance/min, "
+          f"{policy['min_capacity']}-{policy['max_capacity']} instances")
+    print(f"📝 Plan written to {args.output} (apply with CAPACITY_PLAN_PATH in launch_endpoint.py)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "deployment")))
+
+import covariates as covariate_model
+import inference
+import runtime_tuning
+
+# -----------------------------------------------------------------------------
+# Offline fleet scoring.
+#
+# Loads a long-format CSV/Parquet (timestamp, item, target; without an item
+# column the whole file is one series, like the turbine CSV), packs the last
+# `context_length` observations of every series into one float32 array in
+# shared memory, and scores it with a pool of processes that each load the
+# model once. Workers receive only (start, stop) row ranges and write their
+# forecasts into a shared output array; the parent streams finished ranges to
+# disk as they complete.
+#
+# A model trained with covariates (covariates.py) ships its regressor. The
+# input must then carry those columns, and the last `prediction_length` rows
+# of every item are its horizon: known covariate values only, no target (past
+# covariates may be empty there). The workers remove and add back the
+# covariate effect as the serving handler does.
+# -----------------------------------------------------------------------------
+
+# Per-process state, set by init_worker.
+_worker = {}
+
+
+def log(msg: str):
+    print(f"[Scoring] {time.strftime('%Y-%m-%d %H:%M:%S')} | {msg}", flush=True)
+
+
+# -----------------------------------------------------------------------------
+# Input packing
+# -----------------------------------------------------------------------------
+def read_table(path: str, columns: list) -> pd.DataFrame:
+    """Reads only `columns` from a Parquet or CSV file."""
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def pack_context(df: pd.DataFrame, item_column: str, timestamp_column: str, target: str,
+                 context_length: int) -> tuple:
+    """Packs each item's last `context_length` values into a NaN left-padded (N, L) array.
+
+    Vectorised scatter: no Python loop over items. Returns (items, last timestamps, array).
+    """
+    df = df.sort_values([item_column, timestamp_column], kind="stable")
+    codes, items = pd.factorize(df[item_column], sort=False)
+    counts = np.bincount(codes)
+
+    # Position of every row counted from the end of its series (0 = latest).
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    from_end = counts[codes] - 1 - (np.arange(len(codes)) - starts[codes])
+    keep = from_end < context_length
+
+    packed = np.full((len(items), context_length), np.nan, dtype=np.float32)
+    packed[codes[keep], context_length - 1 - from_end[keep]] = df[target].to_numpy(np.float32)[keep]
+
+    last_timestamps = pd.to_datetime(df[timestamp_column].to_numpy()[starts + counts - 1])
+    return np.asarray(items), last_timestamps, packed
+
+
+def split_horizon(df: pd.DataFrame, item_column: str, timestamp_column: str, pred_len: int) -> tuple:
+    """Splits off the last `pred_len` rows of every item; returns (history, sorted df)."""
+    df = df.sort_values([item_column, timestamp_column], kind="stable")
+    from_end = df.groupby(item_column, sort=False).cumcount(ascending=False).to_numpy()
+    history = df[from_end >= pred_len]
+    short = df[item_column].nunique() - history[item_column].nunique()
+    if short:
+        raise ValueError(f"{short} item(s) have no rows before their {pred_len}-step covariate horizon")
+    return history, df
+
+
+def pack_covariates(df: pd.DataFrame, item_column: str, timestamp_column: str, names: list,
+                    length: int) -> np.ndarray:
+    """Packs each item's last `length` covariate rows into (N, C, length), gaps filled along time."""
+    packed = []
+    for name in names:
+        values = pack_context(df, item_column, timestamp_column, name, length)[2]
+        values = pd.DataFrame(values).ffill(axis=1).bfill(axis=1).to_numpy(np.float32)
+        if np.isnan(values).any():
+            raise ValueError(f"Covariate '{name}' has no values for some item")
+        packed.append(values)
+    return np.stack(packed, axis=1)
+
+
+def infer_step(df: pd.DataFrame, item_column: str, timestamp_column: str):
+    """Fixed sampling interval of the first item, or None when it cannot be inferred."""
+    first = df[df[item_column] == df[item_column].iloc[0]]
+    timestamps = pd.to_datetime(first[timestamp_column]).sort_values()
+    try:
+        return pd.Timedelta(pd.tseries.frequencies.to_offset(pd.infer_freq(timestamps.iloc[-100:])))
+    except (TypeError, ValueError):
+        return None
+
+
+# -----------------------------------------------------------------------------
+# Worker processes
+# -----------------------------------------------------------------------------
+def attach(name: str, shape: tuple) -> tuple:
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+
+
+def init_worker(model_dir: str, counter, workers: int, inputs: tuple, outputs: tuple, pred_len: int,
+                quantile_levels: list, loaded, covariate_inputs: tuple = None):
+    """Pins this process to its share of the cores and loads the model once.
+
+    Waits on the `loaded` barrier with the parent, which starts timing once
+    every worker has its model.
+    """
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    runtime_tuning.apply_profile(workers, index)
+
+    in_shm, series = attach(*inputs)
+    out_shm, forecast = attach(*outputs)
+    cov_shm, covariates = attach(*covariate_inputs) if covariate_inputs else (None, None)
+    _worker.update(
+        shms=(in_shm, out_shm, cov_shm), series=series, forecast=forecast, covariates=covariates, pred_len=pred_len,
+        quantile_levels=quantile_levels, model=inference.model_fn(model_dir),
+    )
+    loaded.wait()
+
+
+def score_range(bounds: tuple) -> tuple:
+    """Forecasts rows [start, stop) in place; only the bounds cross the process boundary."""
+    start, stop = bounds
+    covariates = None if _worker["covariates"] is None else _worker["covariates"][start:stop]
+    arrays = inference.forecast_batch(
+        _worker["model"], _worker["series"][start:stop], covariates, _worker["pred_len"], _worker["quantile_levels"]
+    )
+    _worker["forecast"][start:stop, :, :-1] = arrays["quantiles"]
+    _worker["forecast"][start:stop, :, -1] = arrays["mean"]
+    return bounds
+
+
+# -----------------------------------------------------------------------------
+# Output
+# -----------------------------------------------------------------------------
+class ResultWriter:
+    """Appends long-format forecast rows to a Parquet or CSV file."""
+
+    def __init__(self, path: str, items: np.ndarray, last_timestamps, step, quantile_levels: list, pred_len: int):
+        self.path, self.items, self.last, self.step = path, items, last_timestamps, step
+        self.columns = [f"q{q:g}" for q in quantile_levels] + ["mean"]
+        self.steps = np.arange(1, pred_len + 1)
+        self.parquet = None
+        self.header = True
+
+    def write(self, forecast: np.ndarray, start: int, stop: int):
+        block = forecast[start:stop]
+        df = pd.DataFrame(block.reshape(-1, block.shape[2]), columns=self.columns)
+        df.insert(0, "item_id", np.repeat(self.items[start:stop], len(self.steps)))
+        df.insert(1, "step", np.tile(self.steps, stop - start))
+        if self.step is not None:
+            last = pd.DatetimeIndex(np.repeat(self.last[start:stop].to_numpy(), len(self.steps)))
+            df.insert(2, "timestamp", last + df["step"].to_numpy() * self.step)
+
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.parquet is None:
+                self.parquet = pq.ParquetWriter(self.path, table.schema)
+            self.parquet.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self.header else "a", header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        if self.parquet is not None:
+            self.parquet.close()
+
+
+# -----------------------------------------------------------------------------
+# Scoring run
+# -----------------------------------------------------------------------------
+def score(model_dir: str, series: np.ndarray, pred_len: int, quantile_levels: list, workers: int,
+          chunk_size: int, writer: ResultWriter = None, load_timeout: float = 900,
+          covariates: np.ndarray = None) -> float:
+    """Scores `series` with `workers` processes; returns the scoring time in seconds (model load excluded).
+
+    `covariates` (N, C, context + horizon) is required by models trained with known covariates.
+    """
+    n = len(series)
+    in_shm = shared_memory.SharedMemory(create=True, size=series.nbytes)
+    out_shape = (n, pred_len, len(quantile_levels) + 1)
+    out_shm = shared_memory.SharedMemory(create=True, size=int(np.prod(out_shape)) * 4)
+    shms, covariate_inputs = [in_shm, out_shm], None
+    try:
+        np.ndarray(series.shape, dtype=np.float32, buffer=in_shm.buf)[:] = series
+        forecast = np.ndarray(out_shape, dtype=np.float32, buffer=out_shm.buf)
+        if covariates is not None:
+            shms.append(shared_memory.SharedMemory(create=True, size=covariates.nbytes))
+            np.ndarray(covariates.shape, dtype=np.float32, buffer=shms[-1].buf)[:] = covariates
+            covariate_inputs = (shms[-1].name, covariates.shape)
+
+        ctx = mp.get_context("spawn")
+        loaded = ctx.Barrier(workers + 1)
+        initargs = (model_dir, ctx.Value("i", 0), workers, (in_shm.name, series.shape),
+                    (out_shm.name, out_shape), pred_len, quantile_levels, loaded, covariate_inputs)
+        with ctx.Pool(workers, initializer=init_worker, initargs=initargs) as pool:
+            # Returns once every worker has loaded its model (BrokenBarrierError on timeout).
+            loaded.wait(timeout=load_timeout)
+
+            start = time.perf_counter()
+            ranges = [(i, min(i + chunk_size, n)) for i in range(0, n, chunk_size)]
+            for lo, hi in pool.imap_unordered(score_range, ranges):
+                if writer is not None:
+                    writer.write(forecast, lo, hi)
+            elapsed = time.perf_counter() - start
+        return elapsed
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline fleet scoring with a shared-memory process pool.")
+    parser.add_argument("--input", required=True, help="Long-format .csv or .parquet")
+    parser.add_argument("--output", required=True, help="Destination .csv or .parquet")
+    parser.add_argument("--model", default="models/chronos-bolt-tiny")
+    parser.add_argument("--target", default="ActivePower")
+    parser.add_argument("--item-column", default=None,
+                        help="Series id column; without it the whole file is a single series")
+    parser.add_argument("--timestamp-column", default="Unnamed: 0")
+    parser.add_argument("--context-length", type=int, default=512)
+    parser.add_argument("--prediction-length", type=int, default=24)
+    parser.add_argument("--quantiles", default=",".join(map(str, inference.DEFAULT_QUANTILES)))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=256, help="Series per task")
+    parser.add_argument("--scaling", action="store_true", help="Also time 1, 2, 4, ... workers")
+    args = parser.parse_args()
+
+    quantile_levels = [float(q) for q in args.quantiles.split(",")]
+    regressor = covariate_model.load_regressor(args.model)
+    covariate_names = regressor.columns if regressor is not None else []
+    columns = [args.timestamp_column, args.target] + ([args.item_column] if args.item_column else [])
+
+    start = time.perf_counter()
+    try:
+        df = read_table(args.input, columns + covariate_names)
+    except (ValueError, KeyError) as e:
+        if covariate_names:
+            sys.exit(f"❌ {args.model} was trained with covariates {covariate_names}; {args.input} must have "
+                     f"the columns {columns + covariate_names}, with covariate values over each item's last "
+                     f"{args.prediction_length} rows: {e}")
+        sys.exit(f"❌ {args.input} does not have the columns {columns}: {e}")
+    item_column = args.item_column
+    if item_column is None:
+        item_column = "item_id"
+        df[item_column] = args.target
+
+    covariates, history = None, df
+    if covariate_names:
+        try:
+            history, df = split_horizon(df, item_column, args.timestamp_column, args.prediction_length)
+            covariates = pack_covariates(regressor.lag_frame(df, item_column), item_column, args.timestamp_column,
+                                         covariate_names, args.context_length + args.prediction_length)
+        except ValueError as e:
+            sys.exit(f"❌ {e}")
+        log(f"Covariates {covariate_names} over the last {args.prediction_length} rows of each item")
+    items, last_timestamps, series = pack_context(
+        history, item_column, args.timestamp_column, args.target, args.context_length
+    )
+    step = infer_step(df, item_column, args.timestamp_column)
+    del df, history
+    log(f"Packed {len(items)} series x {args.context_length} steps in {time.perf_counter() - start:.1f}s "
+        f"| interval: {step}")
+
+    counts = [args.workers]
+    if args.scaling:
+        counts = sorted({min(2 ** i, args.workers) for i in range(args.workers.bit_length() + 1)} | {args.workers})
+
+    results = {}
+    for workers in counts:
+        writer = None
+        if workers == args.workers:
+            writer = ResultWriter(args.output, items, last_timestamps, step, quantile_levels,
+                                  args.prediction_length)
+        try:
+            results[workers] = score(args.model, series, args.prediction_length, quantile_levels,
+                                     workers, args.chunk_size, writer, covariates=covariates)
+        finally:
+            if writer is not None:
+                writer.close()
+        log(f"{workers} worker(s): {len(items) / results[workers]:.1f} series/sec")
+
+    print(f"\n{'workers':>8}{'seconds':>10}{'series/s':>11}{'speedup':>9}")
+    base = results[counts[0]]
+    for workers in counts:
+        print(f"{workers:>8}{results[workers]:>10.2f}{len(items) / results[workers]:>11.1f}"
+              f"{base / results[workers]:>8.2f}x")
+    print(f"\n✅ Forecasts written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import shutil
+import tarfile
+import tempfile
+from pathlib import Path
+
+# -----------------------------------------------------------------------------
+# Model artifacts produced by fine-tuning.
+#
+# AutoGluon keeps the predictor under its own directory tree and only writes
+# tuned Chronos weights when the model is fitted with "fine_tune": True, to
+# models/<model>/W0/fine-tuned-ckpt. The artifact we ship is that checkpoint
+# flattened to the archive root, next to the covariate regressor and training
+# state, so the serving handlers, the evaluation script, distillation and the
+# next continued run all load it directly with ChronosBoltPipeline.
+# -----------------------------------------------------------------------------
+FINE_TUNED_CKPT = "fine-tuned-ckpt"
+WEIGHT_FILES    = ("config.json", "model.safetensors")
+
+
+def is_chronos_dir(path) -> bool:
+    return all((Path(path) / f).exists() for f in WEIGHT_FILES)
+
+
+def find_chronos_model(root: str):
+    """Directory under `root` holding Chronos weights and config, or None.
+
+    A fine-tuned checkpoint wins over any other weights in the tree.
+    """
+    candidates = [Path(root), *sorted(p for p in Path(root).rglob("*") if p.is_dir())]
+    for p in candidates:
+        if p.name == FINE_TUNED_CKPT and is_chronos_dir(p):
+            return str(p)
+    for p in candidates:
+        if is_chronos_dir(p):
+            return str(p)
+    return None
+
+
+def extract_archive(tar_path: str, prefix: str = "chronos_model_") -> str:
+    """Extract a .tar.gz into a new temporary directory and return it."""
+    extract_dir = tempfile.mkdtemp(prefix=prefix)
+    # Stream mode ("r|gz") reads the archive front to back, so it also works on Pipe FIFOs.
+    with tarfile.open(tar_path, "r|gz") as tar:
+        tar.extractall(path=extract_dir)
+    return extract_dir
+
+
+def export_serving_model(predictor_dir: str, artifact_dir: str) -> str:
+    """Copy the fine-tuned checkpoint of a fitted predictor to the root of `artifact_dir`."""
+    checkpoints = sorted(p for p in Path(predictor_dir).rglob(FINE_TUNED_CKPT) if is_chronos_dir(p))
+    if not checkpoints:
+        raise FileNotFoundError(
+            f"No {FINE_TUNED_CKPT} under {predictor_dir}; the Chronos model must be fitted with fine_tune=True."
+        )
+    os.makedirs(artifact_dir, exist_ok=True)
+    for file in checkpoints[0].iterdir():
+        if file.is_file():
+            shutil.copy2(file, os.path.join(artifact_dir, file.name))
+    return artifact_dir
+
+
+def compress(folder_path: str, archive_path: str) -> str:
+    """Pack the files of `folder_path` at the root of a .tar.gz archive."""
+    with tarfile.open(archive_path, "w:gz") as tar:
+        for file in sorted(os.listdir(folder_path)):
+            tar.add(os.path.join(folder_path, file), arcname=file)
+    return archive_path
@@ -0,0 +1,289 @@
+import os
+import sys
+import json
+import time
+import boto3
+import tempfile
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from datetime import datetime, timezone
+
+import distillation
+from artifacts import find_chronos_model, extract_archive, compress
+from model_registry import ModelRegistry, cache_dir
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "deployment")))
+from covariates import load_regressor
+
+# -----------------------------------------------------------------------------
+# Knowledge distillation: fine-tuned Chronos (teacher) -> small student.
+#
+# Sliding windows over the history of every series (one per site, told apart
+# by ITEM_COLUMN or by file) are forecast by the teacher in large batches; a
+# compact student (distillation.py) is fitted to the teacher's quantiles and
+# evaluated on the most recent windows of each series, which it never saw,
+# against both the teacher and the actual values. The student is packed
+# as a model.tar.gz the deployment image serves with the same handlers.
+# A teacher tuned on covariate residuals passes its regressor on: the student
+# learns the same residual and ships the same covariate_regressor.json.
+#
+# Runs in the training image:
+#   TRAINING_MODE=distill python src/scripts/sagemaker/launch_training_job.py
+# -----------------------------------------------------------------------------
+try :
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    print("python-dotenv not installed, proceeding without loading .env file")
+
+# -----------------------------------------------------------------------------
+# Configuration
+# -----------------------------------------------------------------------------
+TEACHER_MODEL_PATH     = os.getenv("TEACHER_MODEL_PATH", os.getenv("TUNNED_MODEL_PATH"))
+TRAINING_DATA_PATH     = os.getenv("TRAINING_DATA_PATH")
+STUDENT_MODEL_PATH     = os.getenv("STUDENT_MODEL_PATH")
+AWS_PROFILE            = os.getenv("AWS_PROFILE")
+
+PREDICTION_LENGTH      = int(os.getenv("PREDICTION_LENGTH", "24"))
+TEACHER_CONTEXT_LENGTH = int(os.getenv("TEACHER_CONTEXT_LENGTH", "512"))
+STUDENT_CONTEXT_LENGTH = int(os.getenv("STUDENT_CONTEXT_LENGTH", "128"))
+STUDENT_HIDDEN         = int(os.getenv("STUDENT_HIDDEN", "256"))  # 0 = linear quantile model
+STUDENT_EPOCHS         = int(os.getenv("STUDENT_EPOCHS", "20"))
+WINDOW_STRIDE          = int(os.getenv("WINDOW_STRIDE", "6"))
+DISTILL_BATCH_SIZE     = int(os.getenv("DISTILL_BATCH_SIZE", "1024"))
+HOLDOUT_FRACTION       = float(os.getenv("HOLDOUT_FRACTION", "0.1"))
+QUANTILE_LEVELS        = [float(q) for q in os.getenv("QUANTILE_LEVELS", "0.1,0.2,0.3,0.4,0.5,0.6,0.7,0.8,0.9").split(",")]
+ITEM_COLUMN            = os.getenv("ITEM_COLUMN")  # site/turbine id; without it each CSV file is one series
+
+MODEL_REGISTRY_URI     = os.getenv("MODEL_REGISTRY_URI")
+STUDENT_MODEL_NAME     = os.getenv("STUDENT_MODEL_NAME", "chronos-student")
+
+# SageMaker training channel, as in train_entrypoint.py.
+TRAINING_DIR           = os.getenv("SM_CHANNEL_TRAINING", "/opt/ml/input/data/training")
+if os.path.isdir(TRAINING_DIR):
+    TRAINING_DATA_PATH = TRAINING_DIR
+
+if not TEACHER_MODEL_PATH or not TRAINING_DATA_PATH or not STUDENT_MODEL_PATH:
+    missing = [
+        k for k, v in {
+            "TEACHER_MODEL_PATH": TEACHER_MODEL_PATH,
+            "TRAINING_DATA_PATH": TRAINING_DATA_PATH,
+            "STUDENT_MODEL_PATH": STUDENT_MODEL_PATH,
+        }.items() if not v
+    ]
+    raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+
+print(f"""System Variables:
+      - TEACHER_MODEL_PATH:  {TEACHER_MODEL_PATH}
+      - TRAINING_DATA_PATH:  {TRAINING_DATA_PATH}
+      - STUDENT_MODEL_PATH:  {STUDENT_MODEL_PATH}
+      - CONTEXT (T/S):       {TEACHER_CONTEXT_LENGTH} / {STUDENT_CONTEXT_LENGTH}
+      - STUDENT_HIDDEN:      {STUDENT_HIDDEN} ({STUDENT_EPOCHS} epochs)
+      - WINDOW_STRIDE:       {WINDOW_STRIDE}
+      - ITEM_COLUMN:         {ITEM_COLUMN or "(one series per file)"}
+      - DISTILL_BATCH_SIZE:  {DISTILL_BATCH_SIZE}
+      - MODEL_REGISTRY_URI:  {MODEL_REGISTRY_URI} (model {STUDENT_MODEL_NAME})
+      """)
+
+# -----------------------------------------------------------------------------
+# Helper functions
+# -----------------------------------------------------------------------------
+def create_boto3_session(profile=None):
+    """Create a boto3 session compatible with SageMaker and local environments."""
+    if os.getenv("SM_TRAINING_ENV"):
+        return boto3.Session()
+    return boto3.Session(profile_name=profile) if profile else boto3.Session()
+
+
+def download_from_s3(s3_uri: str, session) -> str:
+    """Download file from S3 and return local path."""
+    assert s3_uri.startswith("s3://"), f"Invalid S3 URI: {s3_uri}"
+    bucket, key = s3_uri.replace("s3://", "").split("/", 1)
+    local_path = os.path.join(tempfile.gettempdir(), os.path.basename(key))
+    print(f"⬇️  Downloading {s3_uri} → {local_path}")
+    session.client("s3").download_file(bucket, key, local_path)
+    return local_path
+
+
+def resolve_teacher(path: str, session) -> str:
+    """Local Chronos directory for an s3:// archive, a registry:<name>[@ref] or a local path."""
+    if path.startswith("registry:"):
+        name, _, ref = path[len("registry:"):].partition("@")
+        path = cache_dir(name)
+        ModelRegistry(MODEL_REGISTRY_URI, session.client("s3")).pull(name, ref or "latest", path)
+    else:
+        if path.startswith("s3://"):
+            path = download_from_s3(path, session)
+        if path.endswith(".tar.gz"):
+            path = extract_archive(path, prefix="chronos_teacher_")
+    model_dir = find_chronos_model(path)
+    if model_dir is None:
+        sys.exit(f"❌ No valid Chronos model found in {path}; the teacher must be a fine-tuned artifact.")
+    return model_dir
+
+
+def load_teacher(model_dir: str):
+    """Chronos-Bolt pipeline from chronos-forecasting, or AutoGluon's bundled copy."""
+    try:
+        from chronos import ChronosBoltPipeline
+    except ImportError:
+        from autogluon.timeseries.models.chronos.pipeline import ChronosBoltPipeline
+    return ChronosBoltPipeline.from_pretrained(model_dir, device_map="cpu")
+
+
+def read_series(path: str, regressor=None) -> dict:
+    """{series id: ActivePower values in time order} from a CSV file or a directory of CSVs.
+
+    Series are told apart by ITEM_COLUMN, or by file when it is not set. With
+    a covariate regressor, the values are the residual the teacher was tuned on.
+    """
+    covariates = regressor.columns if regressor is not None else []
+    columns = ["Unnamed: 0", "ActivePower"] + covariates + ([ITEM_COLUMN] if ITEM_COLUMN else [])
+    paths = sorted(str(p) for p in Path(path).rglob("*.csv")) if os.path.isdir(path) else [path]
+    frames = []
+    for p in paths:
+        frame = pd.read_csv(p, usecols=columns)
+        if not ITEM_COLUMN:
+            frame["item_id"] = os.path.relpath(p, path) if os.path.isdir(path) else os.path.basename(p)
+        frames.append(frame)
+    item_column = ITEM_COLUMN or "item_id"
+    df = pd.concat(frames, ignore_index=True)
+    df["timestamp"] = pd.to_datetime(df["Unnamed: 0"]).dt.tz_localize(None)
+    df = df.sort_values([item_column, "timestamp"])
+    if regressor is not None:
+        df[covariates] = df.groupby(item_column)[covariates].transform(lambda c: c.ffill().bfill())
+        df = regressor.lag_frame(df, item_column)
+        df["ActivePower"] = df["ActivePower"] - regressor.predict(df[covariates].to_numpy())
+    return {item: group["ActivePower"].to_numpy(np.float32) for item, group in df.groupby(item_column, sort=False)}
+
+
+def teacher_forecast(teacher, contexts: np.ndarray, pred_len: int, levels: list, batch_size: int) -> tuple:
+    """(W, H, Q) teacher quantiles in batches of `batch_size`; returns them and series/sec."""
+    import torch
+
+    out = np.empty((len(contexts), pred_len, len(levels)), dtype=np.float32)
+    start = time.perf_counter()
+    with torch.inference_mode():
+        for i in range(0, len(contexts), batch_size):
+            batch = torch.from_numpy(np.ascontiguousarray(contexts[i:i + batch_size]))
+            quantiles, _ = teacher.predict_quantiles(batch, prediction_length=pred_len, quantile_levels=levels)
+            out[i:i + batch_size] = quantiles.numpy()
+            distillation.log(f"Teacher: {min(i + batch_size, len(contexts))}/{len(contexts)} windows")
+    return out, len(contexts) / (time.perf_counter() - start)
+
+
+def student_throughput(params: dict, contexts: np.ndarray, batch_size: int, repeats: int = 3) -> float:
+    """Best-of-`repeats` series/sec of the student forward pass, at the same batch size as the teacher."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for i in range(0, len(contexts), batch_size):
+            distillation.predict(params, contexts[i:i + batch_size], STUDENT_CONTEXT_LENGTH,
+                                 PREDICTION_LENGTH, len(QUANTILE_LEVELS))
+        best = min(best, time.perf_counter() - start)
+    return len(contexts) / best
+
+
+def upload_to_s3(local_path: str, s3_uri: str, session):
+    """Upload local file to a specific S3 URI."""
+    assert s3_uri.startswith("s3://"), f"Invalid S3 URI: {s3_uri}"
+    bucket, key = s3_uri.replace("s3://", "").split("/", 1)
+    print(f"⬆️  Uploading {local_path} → {s3_uri}")
+    session.client("s3").upload_file(local_path, bucket, key)
+    print("✅ Upload complete!")
+
+
+# -----------------------------------------------------------------------------
+# Step 1: Teacher and training windows
+# -----------------------------------------------------------------------------
+session = create_boto3_session(AWS_PROFILE)
+teacher_dir = resolve_teacher(TEACHER_MODEL_PATH, session)
+teacher = load_teacher(teacher_dir)
+regressor = load_regressor(teacher_dir)
+
+data_path = TRAINING_DATA_PATH
+if data_path.startswith("s3://"):
+    data_path = download_from_s3(data_path, session)
+series_by_item = read_series(data_path, regressor)
+
+# One student serves every site, so it learns from all of them; windows never
+# cross from one series into the next, and each series holds out its own most
+# recent windows.
+try:
+    train_windows, holdout_windows = distillation.split_windows(
+        series_by_item, TEACHER_CONTEXT_LENGTH, PREDICTION_LENGTH, WINDOW_STRIDE, HOLDOUT_FRACTION,
+    )
+except ValueError as e:
+    sys.exit(f"❌ {e}; lower HOLDOUT_FRACTION or the context length, or add data.")
+if len(train_windows) + len(holdout_windows) < 10:
+    sys.exit(f"❌ Only {len(train_windows) + len(holdout_windows)} windows of "
+             f"{TEACHER_CONTEXT_LENGTH + PREDICTION_LENGTH} steps in the data.")
+contexts = np.concatenate([train_windows, holdout_windows])[:, :TEACHER_CONTEXT_LENGTH]
+# Residuals when there is a regressor: the pinball terms are the same as on the
+# raw target, only the WQL normalisation differs.
+actuals = holdout_windows[:, TEACHER_CONTEXT_LENGTH:]
+distillation.log(f"{len(series_by_item)} series, {sum(len(v) for v in series_by_item.values())} steps → "
+                 f"{len(train_windows)} training and {len(holdout_windows)} holdout windows")
+
+# -----------------------------------------------------------------------------
+# Step 2: Teacher targets
+# -----------------------------------------------------------------------------
+teacher_q, teacher_rate = teacher_forecast(teacher, contexts, PREDICTION_LENGTH, QUANTILE_LEVELS, DISTILL_BATCH_SIZE)
+train_q, holdout_q = teacher_q[:len(train_windows)], teacher_q[len(train_windows):]
+del teacher
+
+# -----------------------------------------------------------------------------
+# Step 3: Fit the student
+# -----------------------------------------------------------------------------
+params = distillation.fit_student(
+    contexts[:len(train_windows)], train_q, STUDENT_CONTEXT_LENGTH, STUDENT_HIDDEN, epochs=STUDENT_EPOCHS,
+)
+
+# -----------------------------------------------------------------------------
+# Step 4: Accuracy loss and throughput gain on the holdout windows
+# -----------------------------------------------------------------------------
+holdout_contexts = contexts[len(train_windows):]
+student_q = distillation.predict(params, holdout_contexts, STUDENT_CONTEXT_LENGTH, PREDICTION_LENGTH,
+                                 len(QUANTILE_LEVELS))
+teacher_wql = distillation.weighted_quantile_loss(holdout_q, actuals, QUANTILE_LEVELS)
+student_wql = distillation.weighted_quantile_loss(student_q, actuals, QUANTILE_LEVELS)
+student_rate = student_throughput(params, holdout_contexts, DISTILL_BATCH_SIZE)
+report = {
+    "teacher_wql": teacher_wql,
+    "student_wql": student_wql,
+    "accuracy_loss_pct": 100 * (student_wql - teacher_wql) / teacher_wql,
+    # Disagreement with the teacher itself, level by level, independent of how good the teacher is.
+    "teacher_gap": distillation.teacher_gap(student_q, holdout_q, QUANTILE_LEVELS),
+    "teacher_series_per_sec": teacher_rate,
+    "student_series_per_sec": student_rate,
+    "throughput_gain": student_rate / teacher_rate,
+    "training_windows": len(train_windows),
+    "holdout_windows": len(holdout_windows),
+    "trained_at": datetime.now(timezone.utc).isoformat(),
+}
+
+print(f"""
+📊 Distillation report (holdout, {len(holdout_windows)} windows)
+      - WQL teacher / student: {teacher_wql:.4f} / {student_wql:.4f} ({report['accuracy_loss_pct']:+.1f}%)
+      - Gap to the teacher:    {report['teacher_gap']['mean']:.2%} (mean over levels)
+      - Throughput (series/s): {teacher_rate:,.0f} → {student_rate:,.0f} ({report['throughput_gain']:.0f}x)
+""")
+
+# -----------------------------------------------------------------------------
+# Step 5: Package and upload the student
+# -----------------------------------------------------------------------------
+output_dir = tempfile.mkdtemp(prefix="chronos_student_")
+distillation.save_student(params, output_dir, STUDENT_CONTEXT_LENGTH, PREDICTION_LENGTH, QUANTILE_LEVELS, report)
+if regressor is not None:
+    regressor.save(output_dir)
+
+archive_path = compress(output_dir, os.path.join(tempfile.gettempdir(), "student_model.tar.gz"))
+upload_to_s3(archive_path, STUDENT_MODEL_PATH, session)
+
+if MODEL_REGISTRY_URI:
+    registry = ModelRegistry(MODEL_REGISTRY_URI, session.client("s3"))
+    registry.push(STUDENT_MODEL_NAME, output_dir, metadata=report)
+
+print("🎯 Distillation workflow completed successfully!")
+print(f"📦 Student uploaded to: {STUDENT_MODEL_PATH}")
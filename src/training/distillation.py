@@ -0,0 +1,150 @@
+import os
+import sys
+import json
+import time
+
+import numpy as np
+
+# student.py is shared with the serving image; the training image copies it
+# next to this file, local runs import it from src/deployment.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "deployment")))
+from student import STUDENT_CONFIG, STUDENT_WEIGHTS, student_features, forward, to_forecast
+
+# -----------------------------------------------------------------------------
+# Student model for knowledge distillation (numpy only).
+#
+# The student maps the last `context_length` values of a series (standardised
+# per series, plus an observed mask) directly to all horizon x quantile outputs
+# of the teacher:  out = X @ W + b + relu(X @ W1 + b1) @ W2.
+# The linear part is solved in closed form (ridge); with hidden > 0 an MLP is
+# then trained with Adam on what the linear part leaves unexplained.
+#
+# Features, forward pass and output scaling come from src/deployment/student.py,
+# which serves the saved files, so training and serving cannot drift apart.
+# -----------------------------------------------------------------------------
+
+
+def log(msg: str):
+    print(f"[Distill] {time.strftime('%Y-%m-%d %H:%M:%S')} | {msg}", flush=True)
+
+
+def fit_linear(features: np.ndarray, targets: np.ndarray, ridge: float) -> dict:
+    """Closed-form ridge fit of all outputs at once (the bias is not penalised)."""
+    X = np.concatenate([features, np.ones((len(features), 1), dtype=np.float32)], axis=1).astype(np.float64)
+    penalty = ridge * np.eye(X.shape[1])
+    penalty[-1, -1] = 0
+    solution = np.linalg.solve(X.T @ X + penalty, X.T @ targets.astype(np.float64)).astype(np.float32)
+    return {"W": solution[:-1], "b": solution[-1]}
+
+
+def fit_student(series: np.ndarray, teacher_quantiles: np.ndarray, context_length: int, hidden: int = 256,
+                epochs: int = 20, batch_size: int = 512, learning_rate: float = 1e-3, ridge: float = 1.0,
+                seed: int = 0) -> dict:
+    """Fits a student to the teacher's (B, H, Q) quantiles in the per-series scaled space."""
+    features, loc, scale = student_features(series, context_length)
+    targets = ((teacher_quantiles - loc[:, :, None]) / scale[:, :, None]).reshape(len(series), -1)
+    targets = targets.astype(np.float32)
+
+    params = fit_linear(features, targets, ridge)
+    log(f"Linear student: scaled MSE {np.mean((forward(params, features) - targets) ** 2):.4f}")
+    if not hidden:
+        return params
+
+    rng = np.random.default_rng(seed)
+    params["W1"] = (rng.normal(size=(features.shape[1], hidden)) * np.sqrt(2 / features.shape[1])).astype(np.float32)
+    params["b1"] = np.zeros(hidden, dtype=np.float32)
+    params["W2"] = np.zeros((hidden, targets.shape[1]), dtype=np.float32)
+    trained = ("W1", "b1", "W2", "W", "b")
+    moments = {k: (np.zeros_like(params[k]), np.zeros_like(params[k])) for k in trained}
+    beta1, beta2, step = 0.9, 0.999, 0
+
+    for epoch in range(epochs):
+        order = rng.permutation(len(features))
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            X, y = features[idx], targets[idx]
+            pre = X @ params["W1"] + params["b1"]
+            h = np.maximum(pre, 0)
+            err = (X @ params["W"] + params["b"] + h @ params["W2"] - y) * (2 / y.size)
+            dh = (err @ params["W2"].T) * (pre > 0)
+            grads = {"W2": h.T @ err, "W1": X.T @ dh, "b1": dh.sum(axis=0), "W": X.T @ err, "b": err.sum(axis=0)}
+
+            step += 1
+            for k in trained:
+                m, v = moments[k]
+                m[:] = beta1 * m + (1 - beta1) * grads[k]
+                v[:] = beta2 * v + (1 - beta2) * grads[k] ** 2
+                m_hat, v_hat = m / (1 - beta1 ** step), v / (1 - beta2 ** step)
+                params[k] -= (learning_rate * m_hat / (np.sqrt(v_hat) + 1e-8)).astype(np.float32)
+        mse = np.mean((forward(params, features) - targets) ** 2)
+        log(f"Epoch {epoch + 1}/{epochs}: scaled MSE {mse:.4f}")
+    return params
+
+
+def predict(params: dict, series: np.ndarray, context_length: int, pred_len: int, n_levels: int) -> np.ndarray:
+    features, loc, scale = student_features(series, context_length)
+    return to_forecast(forward(params, features), loc, scale, pred_len, n_levels)
+
+
+def make_windows(values: np.ndarray, context_length: int, pred_len: int, stride: int) -> np.ndarray:
+    """(W, context + horizon) sliding windows, a view with no copy."""
+    window = context_length + pred_len
+    if len(values) < window:
+        return np.empty((0, window), dtype=values.dtype)
+    return np.lib.stride_tricks.sliding_window_view(values, window)[::stride]
+
+
+def split_windows(series_by_item: dict, context_length: int, pred_len: int, stride: int,
+                  holdout_fraction: float) -> tuple:
+    """Training and holdout windows of every series, never crossing from one series into another.
+
+    The most recent windows of each series are held out, and a gap keeps them
+    from sharing any step with its training windows. Raises ValueError naming
+    the series too short to leave a training window.
+    """
+    gap = -(-(context_length + pred_len) // stride)
+    train, holdout, short = [], [], []
+    for item, values in series_by_item.items():
+        windows = make_windows(values, context_length, pred_len, stride)
+        n_holdout = max(1, int(len(windows) * holdout_fraction))
+        n_train = len(windows) - n_holdout - gap
+        if n_train < 1:
+            short.append(f"{item} ({len(windows)} windows)")
+            continue
+        train.append(windows[:n_train])
+        holdout.append(windows[-n_holdout:])
+    if short:
+        raise ValueError(f"No training window clears the holdout gap of {gap} windows for: {', '.join(short)}")
+    return np.concatenate(train), np.concatenate(holdout)
+
+
+def weighted_quantile_loss(quantiles: np.ndarray, actuals: np.ndarray, levels: list) -> float:
+    """Mean pinball loss over all levels, normalised by sum(|actuals|) (AutoGluon's WQL)."""
+    diff = actuals[:, :, None] - quantiles
+    levels = np.asarray(levels, dtype=np.float32)
+    pinball = np.maximum(levels * diff, (levels - 1) * diff)
+    return float(2 * np.nansum(pinball) / len(levels) / np.nansum(np.abs(actuals)))
+
+
+def teacher_gap(student_q: np.ndarray, teacher_q: np.ndarray, levels: list) -> dict:
+    """Mean |student - teacher| at each quantile level, relative to the teacher's mean magnitude."""
+    per_level = np.abs(student_q - teacher_q).mean(axis=(0, 1)) / np.abs(teacher_q).mean()
+    return {"mean": float(per_level.mean()), **{str(q): float(g) for q, g in zip(levels, per_level)}}
+
+
+def save_student(params: dict, output_dir: str, context_length: int, pred_len: int, quantile_levels: list,
+                 report: dict = None):
+    """Writes the weights and config that src/deployment/student.py loads."""
+    os.makedirs(output_dir, exist_ok=True)
+    np.savez(os.path.join(output_dir, STUDENT_WEIGHTS), **params)
+    config = {
+        "context_length": context_length,
+        "prediction_length": pred_len,
+        "quantile_levels": list(quantile_levels),
+        "hidden": int(params["W1"].shape[1]) if "W1" in params else 0,
+    }
+    with open(os.path.join(output_dir, STUDENT_CONFIG), "w") as f:
+        json.dump(config, f, indent=2)
+    if report is not None:
+        with open(os.path.join(output_dir, "distillation_report.json"), "w") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,116 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------------------------------------------------------
+# Incremental data for continued training.
+#
+# A continued run must not re-read the whole history. The training state
+# records the byte size of every input file it consumed; the next run skips
+# unchanged files and parses only the appended tail of files that grew. What
+# the model needs from the past travels in the artifact as a bounded replay
+# buffer (REPLAY_BUFFER_FILE):
+#   - the last `context_length` rows of every item, the context of new rows;
+#   - a uniform sample of older (context + horizon) windows, kept by random
+#     priority so the buffer stays a fixed size however long the history grows.
+# -----------------------------------------------------------------------------
+REPLAY_BUFFER_FILE = "replay_buffer.csv.gz"
+REPLAY_SUFFIX      = "__replay"
+PRIORITY           = "replay_priority"
+
+
+def file_sizes(paths: list) -> dict:
+    """{path: size in bytes} of the regular files among `paths` (Pipe FIFOs are left out)."""
+    return {p: os.path.getsize(p) for p in paths if os.path.isfile(p)}
+
+
+def unread_ranges(paths: list, consumed: dict) -> list:
+    """(path, offset) pairs still to read, given the sizes recorded by the previous run.
+
+    Unchanged files are skipped and files that grew are read from where the
+    previous run stopped. New, rewritten (smaller) and non-regular files are
+    read in full.
+    """
+    ranges = []
+    for path in paths:
+        size, seen = (os.path.getsize(path) if os.path.isfile(path) else None), consumed.get(path)
+        if size is not None and seen is not None and size == seen:
+            continue
+        ranges.append((path, seen if size is not None and seen is not None and size > seen else 0))
+    return ranges
+
+
+def read_csv_range(path: str, offset: int, usecols, chunksize: int):
+    """Yield DataFrame chunks of a CSV, starting at byte `offset` (a row boundary) after the header."""
+    if offset == 0:
+        yield from pd.read_csv(path, usecols=usecols, chunksize=chunksize)
+        return
+    with open(path, "rb") as f:
+        header = pd.read_csv(f, nrows=0).columns.tolist()
+        f.seek(offset)
+        yield from pd.read_csv(f, header=None, names=header, usecols=usecols, chunksize=chunksize)
+
+
+def is_replay(item_ids: pd.Series) -> pd.Series:
+    return item_ids.astype(str).str.contains(REPLAY_SUFFIX, regex=False)
+
+
+def continued_training_frame(buffer: pd.DataFrame, new_rows: pd.DataFrame, window: int,
+                             replay_ratio: float, seed: int = 0) -> pd.DataFrame:
+    """New rows after their buffered context, plus replayed windows of older history.
+
+    Each replayed window has its own item id, so no false continuity is created.
+    """
+    replay = is_replay(buffer["item_id"])
+    recent = pd.concat([buffer[~replay], new_rows], ignore_index=True).sort_values(["item_id", "timestamp"])
+
+    windows = buffer.loc[replay, "item_id"].unique()
+    n_windows = min(len(windows), int(np.ceil(replay_ratio * len(new_rows) / window)))
+    chosen = np.random.default_rng(seed).choice(windows, size=n_windows, replace=False)
+    replayed = buffer[buffer["item_id"].isin(chosen)]
+
+    print(f"🔁 Continued training: {len(new_rows)} new rows, {len(recent) - len(new_rows)} context rows, "
+          f"{n_windows} replay windows of {window}")
+    return pd.concat([recent, replayed], ignore_index=True).drop(columns=PRIORITY, errors="ignore")
+
+
+def update_replay_buffer(buffer, rows: pd.DataFrame, context_length: int, window: int,
+                         max_windows: int, seed: int = 0) -> pd.DataFrame:
+    """Fold `rows` (raw, time-ordered per item) into the buffer of the next artifact.
+
+    Every item keeps its last `context_length` rows. The rows before them are
+    cut into non-overlapping windows that compete with the buffered ones on a
+    random priority; the `max_windows` lowest priorities stay, a uniform sample
+    of all windows offered so far.
+    """
+    rng = np.random.default_rng(seed)
+    if buffer is None:
+        buffer = rows.iloc[:0].assign(**{PRIORITY: pd.Series(dtype=float)})
+    replay = is_replay(buffer["item_id"])
+
+    tails, offered = [], []
+    combined = pd.concat([buffer[~replay].drop(columns=PRIORITY), rows], ignore_index=True)
+    for item, series in combined.sort_values(["item_id", "timestamp"]).groupby("item_id", sort=False):
+        tails.append(series.iloc[-context_length:])
+        history = series.iloc[:-context_length]
+        for start in range(0, len(history) - window + 1, window):
+            name = f"{item}{REPLAY_SUFFIX}{rng.integers(1 << 62):x}"
+            offered.append(history.iloc[start:start + window].assign(item_id=name, **{PRIORITY: rng.random()}))
+
+    pool = pd.concat([buffer[replay], *offered], ignore_index=True)
+    keep = pool.groupby("item_id")[PRIORITY].first().nsmallest(max_windows).index
+    tail = pd.concat(tails, ignore_index=True) if tails else rows.iloc[:0]
+    return pd.concat([tail.assign(**{PRIORITY: np.nan}), pool[pool["item_id"].isin(keep)]], ignore_index=True)
+
+
+def load_replay_buffer(model_dir: str):
+    """The replay buffer shipped with a model, or None for artifacts that predate it."""
+    path = os.path.join(model_dir, REPLAY_BUFFER_FILE)
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, parse_dates=["timestamp"])
+
+
+def save_replay_buffer(buffer: pd.DataFrame, model_dir: str):
+    buffer.to_csv(os.path.join(model_dir, REPLAY_BUFFER_FILE), index=False)
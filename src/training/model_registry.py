@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import hashlib
+import tarfile
+import tempfile
+from pathlib import Path
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+# -----------------------------------------------------------------------------
+# Versioned model registry on S3 with content-addressed storage.
+#
+#   <root>/blobs/sha256/<digest>                  file contents, stored once
+#   <root>/models/<name>/versions/<version>.json  manifest: path -> digest
+#   <root>/models/<name>/refs/<alias>.json        {"version": ...}
+#
+#   <root>/archives/sha256/<digest>.tar.gz       model.tar.gz of a version's files
+#
+# A push only uploads blobs the registry does not already have; a pull only
+# downloads files whose digest differs from the local copy. Aliases such as
+# "latest" or "production" point at a version, so a rollback rewrites one
+# small ref object and moves no model data. SageMaker hosting needs a single
+# model.tar.gz: archive() builds it once per distinct set of files.
+# -----------------------------------------------------------------------------
+LOCAL_MANIFEST = ".registry_manifest.json"
+HASH_CHUNK = 8 * 1024 * 1024
+# Pulls into a stable per-model directory, so repeated pulls only fetch changed
+# files. SageMaker keeps the warm pool cache directory across jobs on a warm pool.
+WARM_POOL_CACHE = "/opt/ml/sagemaker/warmpoolcache"
+REGISTRY_CACHE_DIR = os.getenv("REGISTRY_CACHE_DIR") or (
+    os.path.join(WARM_POOL_CACHE, "registry") if os.path.isdir(WARM_POOL_CACHE)
+    else os.path.join(tempfile.gettempdir(), "chronos-registry-cache")
+)
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file, streamed in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_digest(files: dict) -> str:
+    """Digest of a manifest's file table; equal for versions with identical files."""
+    return hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()
+
+
+def cache_dir(name: str) -> str:
+    """Stable local directory for pulls of `name`."""
+    return os.path.join(REGISTRY_CACHE_DIR, name)
+
+
+def split_s3_uri(uri: str) -> tuple:
+    assert uri.startswith("s3://"), f"Invalid S3 URI: {uri}"
+    bucket, _, prefix = uri[len("s3://"):].partition("/")
+    return bucket, prefix.strip("/")
+
+
+class ModelRegistry:
+    """Pushes, pulls, lists and aliases model versions under an S3 root URI."""
+
+    def __init__(self, root_uri: str, s3_client=None):
+        self.bucket, self.prefix = split_s3_uri(root_uri)
+        self._s3 = s3_client
+
+    @property
+    def s3(self):
+        if self._s3 is None:
+            import boto3
+            self._s3 = boto3.client("s3")
+        return self._s3
+
+    # --- keys ------------------------------------------------------------------
+    def _key(self, *parts: str) -> str:
+        return "/".join(p for p in (self.prefix, *parts) if p)
+
+    def _blob_key(self, digest: str) -> str:
+        return self._key("blobs", "sha256", digest)
+
+    def _manifest_key(self, name: str, version: str) -> str:
+        return self._key("models", name, "versions", f"{version}.json")
+
+    def _ref_key(self, name: str, alias: str) -> str:
+        return self._key("models", name, "refs", f"{alias}.json")
+
+    def _archive_key(self, digest: str) -> str:
+        return self._key("archives", "sha256", f"{digest}.tar.gz")
+
+    def _get_json(self, key: str):
+        try:
+            return json.loads(self.s3.get_object(Bucket=self.bucket, Key=key)["Body"].read())
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return None
+            raise
+
+    def _put_json(self, key: str, data: dict):
+        self.s3.put_object(Bucket=self.bucket, Key=key, Body=json.dumps(data, indent=2).encode(),
+                           ContentType="application/json")
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self.s3.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                return False
+            raise
+
+    # --- versions --------------------------------------------------------------
+    def push(self, name: str, local_dir: str, metadata: dict = None, aliases: tuple = ("latest",)) -> dict:
+        """Registers `local_dir` as a new version of `name`; returns its manifest.
+
+        Only files whose digest is not in the blob store yet are uploaded.
+        """
+        root = Path(local_dir)
+        files, uploaded, skipped = {}, 0, 0
+        for path in sorted(p for p in root.rglob("*") if p.is_file() and p.name != LOCAL_MANIFEST):
+            digest, size = file_digest(str(path)), path.stat().st_size
+            files[path.relative_to(root).as_posix()] = {"sha256": digest, "size": size}
+            if self._exists(self._blob_key(digest)):
+                skipped += size
+            else:
+                self.s3.upload_file(str(path), self.bucket, self._blob_key(digest))
+                uploaded += size
+
+        created = datetime.now(timezone.utc)
+        content = content_digest(files)
+        version = f"{created.strftime('%Y%m%dT%H%M%SZ')}-{content[:8]}"
+        parent = self.resolve(name, "latest")
+        manifest = {
+            "name": name,
+            "version": version,
+            "created_at": created.isoformat(),
+            "parent": parent,
+            "files": files,
+            "metadata": metadata or {},
+        }
+        self._put_json(self._manifest_key(name, version), manifest)
+        for alias in aliases:
+            self.set_alias(name, alias, version)
+
+        print(f"📦 Registered {name}@{version} | uploaded {uploaded / 1e6:.1f} MB, "
+              f"deduplicated {skipped / 1e6:.1f} MB")
+        return manifest
+
+    def manifest(self, name: str, ref: str) -> dict:
+        """Manifest of a version or alias."""
+        version = self.resolve(name, ref)
+        manifest = self._get_json(self._manifest_key(name, version)) if version else None
+        if manifest is None:
+            raise KeyError(f"Unknown version or alias '{ref}' for model '{name}'")
+        return manifest
+
+    def resolve(self, name: str, ref: str):
+        """Version id for an alias (or the version itself); None if unknown."""
+        alias = self._get_json(self._ref_key(name, ref))
+        if alias is not None:
+            return alias["version"]
+        return ref if self._get_json(self._manifest_key(name, ref)) is not None else None
+
+    def set_alias(self, name: str, alias: str, version: str):
+        """Points `alias` at `version`; rolling back is just setting it to an older one."""
+        if self._get_json(self._manifest_key(name, version)) is None:
+            raise KeyError(f"Unknown version '{version}' for model '{name}'")
+        self._put_json(self._ref_key(name, alias), {"version": version, "updated_at": time.time()})
+
+    def pull(self, name: str, ref: str, dest_dir: str) -> dict:
+        """Materialises a version in `dest_dir`, downloading only files that changed."""
+        manifest = self.manifest(name, ref)
+        dest = Path(dest_dir)
+        dest.mkdir(parents=True, exist_ok=True)
+
+        local_path = dest / LOCAL_MANIFEST
+        local = json.loads(local_path.read_text())["files"] if local_path.exists() else {}
+
+        downloaded, reused = 0, 0
+        for relative, entry in manifest["files"].items():
+            target = dest / relative
+            known = local.get(relative)
+            if target.exists() and target.stat().st_size == entry["size"] and (
+                (known and known["sha256"] == entry["sha256"]) or file_digest(str(target)) == entry["sha256"]
+            ):
+                reused += entry["size"]
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # Download next to the target and rename, so a failed pull never leaves a torn file.
+            fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+            os.close(fd)
+            self.s3.download_file(self.bucket, self._blob_key(entry["sha256"]), tmp)
+            os.replace(tmp, target)
+            downloaded += entry["size"]
+
+        # Remove files a previous pull placed here that this version does not have.
+        for relative in set(local) - set(manifest["files"]):
+            (dest / relative).unlink(missing_ok=True)
+
+        local_path.write_text(json.dumps(manifest, indent=2))
+        print(f"⬇️  {name}@{manifest['version']} → {dest} | downloaded {downloaded / 1e6:.1f} MB, "
+              f"reused {reused / 1e6:.1f} MB")
+        return manifest
+
+    def archive(self, name: str, ref: str, local_dir: str = None) -> str:
+        """s3:// URI of a model.tar.gz holding the files of a version or alias.
+
+        Archives are content-addressed, so versions with the same files share
+        one and redeploying (or rolling back to) a version reuses its archive.
+        A missing archive is built from a pull into `local_dir`.
+        """
+        manifest = self.manifest(name, ref)
+        key = self._archive_key(content_digest(manifest["files"]))
+        if not self._exists(key):
+            local_dir = local_dir or cache_dir(name)
+            self.pull(name, manifest["version"], local_dir)
+            fd, tmp = tempfile.mkstemp(suffix=".tar.gz")
+            os.close(fd)
+            try:
+                with tarfile.open(tmp, "w:gz") as tar:
+                    for relative in sorted(manifest["files"]):
+                        tar.add(os.path.join(local_dir, relative), arcname=relative)
+                self.s3.upload_file(tmp, self.bucket, key)
+            finally:
+                os.remove(tmp)
+            print(f"🗜️  Archived {name}@{manifest['version']} → s3://{self.bucket}/{key}")
+        return f"s3://{self.bucket}/{key}"
+
+    # --- listing ---------------------------------------------------------------
+    def _paginate(self, prefix: str, delimiter: str = None):
+        kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+        if delimiter:
+            kwargs["Delimiter"] = delimiter
+        yield from self.s3.get_paginator("list_objects_v2").paginate(**kwargs)
+
+    def list_models(self) -> list:
+        prefix = self._key("models") + "/"
+        return [
+            p["Prefix"][len(prefix):].rstrip("/")
+            for page in self._paginate(prefix, "/")
+            for p in page.get("CommonPrefixes", [])
+        ]
+
+    def list_versions(self, name: str) -> list:
+        """All versions of `name`, oldest first (version ids sort by creation time)."""
+        prefix = self._key("models", name, "versions") + "/"
+        versions = [
+            {"version": obj["Key"][len(prefix):-len(".json")], "registered": obj["LastModified"]}
+            for page in self._paginate(prefix)
+            for obj in page.get("Contents", [])
+            if obj["Key"].endswith(".json")
+        ]
+        return sorted(versions, key=lambda v: v["version"])
+
+    def list_aliases(self, name: str) -> dict:
+        prefix = self._key("models", name, "refs") + "/"
+        return {
+            obj["Key"][len(prefix):-len(".json")]: self._get_json(obj["Key"])["version"]
+            for page in self._paginate(prefix)
+            for obj in page.get("Contents", [])
+        }
@@ -1,13 +1,26 @@
 import os
 import sys
+import json
 import boto3
 import tempfile
-import tarfile
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from datetime import datetime, timezone
+from botocore.exceptions import ClientError
 
 from autogluon.timeseries import TimeSeriesPredictor, TimeSeriesDataFrame
 
+from model_registry import ModelRegistry, cache_dir
+from artifacts import find_chronos_model, extract_archive, export_serving_model, compress
+from incremental import (file_sizes, unread_ranges, read_csv_range, continued_training_frame,
+                         update_replay_buffer, load_replay_buffer, save_replay_buffer)
+
+# covariates.py is shared with the serving image; the training image copies it
+# next to this file, local runs import it from src/deployment.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "deployment")))
+from covariates import CovariateRegressor, lag_frame, load_regressor
+
 # ----------------------------------------------------------------------------- 
 # Load environment
 # ----------------------------------------------------------------------------- 
@@ -26,6 +39,79 @@ TUNNED_MODEL_PATH   = os.getenv("TUNNED_MODEL_PATH")
 AWS_PROFILE         = os.getenv("AWS_PROFILE")
 TRAINING_LIMIT_TIME = int(os.getenv("TRAINING_LIMIT_TIME", "100"))
 
+# AutoGluon only tunes (and writes) Chronos weights with fine_tune enabled;
+# without it the predictor runs the base model zero-shot.
+FINE_TUNE_STEPS     = int(os.getenv("FINE_TUNE_STEPS", "1000"))
+FINE_TUNE_LR        = float(os.getenv("FINE_TUNE_LR", "1e-5"))
+
+# SageMaker input channels (mounted under /opt/ml/input/data/<channel>)
+SM_INPUT_DIR        = os.getenv("SM_INPUT_DIR", "/opt/ml/input")
+TRAINING_CHANNEL    = os.getenv("TRAINING_CHANNEL", "training")
+MODEL_CHANNEL       = os.getenv("MODEL_CHANNEL", "model")
+CSV_CHUNK_SIZE      = int(os.getenv("CSV_CHUNK_SIZE", "100000"))
+
+# Known covariates (opt-in, comma-separated columns, e.g. WindSpeed,WindDirection):
+# values available over the forecast horizon, such as weather forecasts. A
+# regressor on them (covariates.py) ships with the model, Chronos is tuned on
+# what it leaves over, and requests must then send the same covariates.
+KNOWN_COVARIATES    = [c for c in os.getenv("KNOWN_COVARIATES", "").split(",") if c]
+# Past covariates (opt-in, e.g. AmbientTemperature): only observed up to the
+# forecast origin, so the regressor sees them PREDICTION_LENGTH steps late and
+# requests send them over the context only.
+PAST_COVARIATES     = [c for c in os.getenv("PAST_COVARIATES", "").split(",") if c]
+COVARIATES          = KNOWN_COVARIATES + PAST_COVARIATES
+TRAINING_COLUMNS    = ["Unnamed: 0", "ActivePower"] + COVARIATES
+PREDICTION_LENGTH   = 24
+
+# Continued training: start from the previous artifact at TUNNED_MODEL_PATH,
+# read only the input it has not consumed yet and train on rows newer than its
+# high-water mark, plus their trailing context and a replay sample of older
+# windows from the artifact's replay buffer (incremental.py), with a
+# proportionally shorter time limit and step budget.
+CONTINUED_TRAINING  = os.getenv("CONTINUED_TRAINING", "0") == "1"
+CONTEXT_LENGTH      = int(os.getenv("CONTEXT_LENGTH", "512"))
+REPLAY_RATIO        = float(os.getenv("REPLAY_RATIO", "0.5"))  # replayed rows per new row
+REPLAY_BUFFER_ROWS  = int(os.getenv("REPLAY_BUFFER_ROWS", "100000"))
+MIN_LIMIT_TIME      = int(os.getenv("MIN_TRAINING_LIMIT_TIME", "30"))
+MIN_FINE_TUNE_STEPS = int(os.getenv("MIN_FINE_TUNE_STEPS", "50"))
+WINDOW              = CONTEXT_LENGTH + PREDICTION_LENGTH
+
+# Model registry (model_registry.py): when set, every fine-tuned model is also
+# registered as a new version of MODEL_NAME and continued training starts from
+# its "latest" alias. BASE_MODEL_PATH may point into it as registry:<name>[@ref].
+MODEL_REGISTRY_URI  = os.getenv("MODEL_REGISTRY_URI")
+MODEL_NAME          = os.getenv("MODEL_NAME", "chronos-finetuned")
+
+
+def channel_dir(channel: str) -> str:
+    """Return the local directory SageMaker mounts for a given input channel."""
+    return os.getenv(f"SM_CHANNEL_{channel.upper()}", os.path.join(SM_INPUT_DIR, "data", channel))
+
+
+def channel_input_mode(channel: str) -> str:
+    """Read the input mode (File, FastFile or Pipe) configured for a channel."""
+    config_path = os.path.join(SM_INPUT_DIR, "config", "inputdataconfig.json")
+    if not os.path.exists(config_path):
+        return "File"
+    with open(config_path) as f:
+        config = json.load(f)
+    return config.get(channel, {}).get("TrainingInputMode", "File")
+
+
+def channel_available(channel: str) -> bool:
+    """Check whether a channel was attached to the job (directory or Pipe FIFO)."""
+    if channel_input_mode(channel) == "Pipe":
+        return os.path.exists(os.path.join(SM_INPUT_DIR, "data", f"{channel}_0"))
+    return os.path.isdir(channel_dir(channel))
+
+
+# Input channels take precedence; the S3 URI env vars remain as a fallback.
+if channel_available(TRAINING_CHANNEL):
+    TRAINING_DATA_PATH = f"channel:{TRAINING_CHANNEL}"
+
+if channel_available(MODEL_CHANNEL):
+    BASE_MODEL_PATH = f"channel:{MODEL_CHANNEL}"
+
 if not BASE_MODEL_PATH or not TRAINING_DATA_PATH or not TUNNED_MODEL_PATH:
     missing = [
         k for k, v in {
@@ -42,6 +128,13 @@ print(f"""System Variables:
       - TUNNED_MODEL_PATH:   {TUNNED_MODEL_PATH}
       - AWS_PROFILE:         {AWS_PROFILE}
       - TRAINING_LIMIT_TIME: {TRAINING_LIMIT_TIME} seconds
+      - FINE_TUNE:           {FINE_TUNE_STEPS} steps (lr {FINE_TUNE_LR})
+      - KNOWN_COVARIATES:    {KNOWN_COVARIATES}
+      - PAST_COVARIATES:     {PAST_COVARIATES}
+      - TRAINING_CHANNEL:    {TRAINING_CHANNEL} ({channel_input_mode(TRAINING_CHANNEL)})
+      - MODEL_CHANNEL:       {MODEL_CHANNEL} ({channel_input_mode(MODEL_CHANNEL)})
+      - CONTINUED_TRAINING:  {CONTINUED_TRAINING} (replay ratio {REPLAY_RATIO})
+      - MODEL_REGISTRY_URI:  {MODEL_REGISTRY_URI} (model {MODEL_NAME})
       """)
 
 # -----------------------------------------------------------------------------
@@ -65,24 +158,79 @@ def download_from_s3(s3_uri: str, session) -> str:
     return local_path
 
 
+def channel_files(channel: str, suffixes: tuple) -> list:
+    """List the files of a File/FastFile channel, or the FIFO of a Pipe channel."""
+    if channel_input_mode(channel) == "Pipe":
+        return [os.path.join(SM_INPUT_DIR, "data", f"{channel}_0")]
+    files = sorted(
+        str(p) for p in Path(channel_dir(channel)).rglob("*")
+        if p.is_file() and p.name.endswith(suffixes)
+    )
+    if not files:
+        sys.exit(f"❌ No {'/'.join(suffixes)} files found in channel '{channel}'.")
+    return files
+
+
+def read_training_csv(ranges: list) -> pd.DataFrame:
+    """Read (path, byte offset) ranges sequentially in chunks, keeping only the columns we train on.
+
+    Reading front to back in bounded chunks lets FastFile stream the objects on
+    demand and works with Pipe mode FIFOs, which cannot be seeked.
+    """
+    frames = []
+    for path, offset in ranges:
+        print(f"📖 Streaming training data from {path}" + (f" (from byte {offset:,})" if offset else ""))
+        # A callable usecols tolerates absent columns, so they can be reported by name below.
+        for chunk in read_csv_range(path, offset, lambda c: c in TRAINING_COLUMNS, CSV_CHUNK_SIZE):
+            missing = [c for c in TRAINING_COLUMNS if c not in chunk.columns]
+            if missing:
+                sys.exit(f"❌ {path} has no column(s) {missing}; check KNOWN_COVARIATES and PAST_COVARIATES "
+                         f"(currently {COVARIATES or 'empty'}).")
+            frames.append(chunk)
+    if not frames:
+        return pd.DataFrame(columns=TRAINING_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def chronos_model_dir(root: str) -> str:
+    """Return the directory under `root` holding the Chronos weights and config."""
+    model_dir = find_chronos_model(root)
+    if model_dir is None:
+        sys.exit(f"❌ No valid Chronos model found in {root}.")
+    return model_dir
+
+
 def extract_model_from_tar(tar_path: str) -> str:
     """Extract tar.gz and return directory containing model files."""
-    extract_dir = tempfile.mkdtemp(prefix="chronos_model_")
-    with tarfile.open(tar_path, "r:gz") as tar:
-        tar.extractall(path=extract_dir)
-    for p in Path(extract_dir).rglob("*"):
-        if (p / "config.json").exists() and (p / "model.safetensors").exists():
-            return str(p)
-    sys.exit("❌ No valid Chronos model found inside archive.")
+    return chronos_model_dir(extract_archive(tar_path))
+
+
+def pull_from_registry(registry: ModelRegistry, name: str, ref: str) -> str:
+    """Materialise a registry version locally and return its Chronos model directory.
+
+    The cache directory is stable, so files unchanged since the last pull on
+    this host (or warm pool) are not downloaded again.
+    """
+    local_dir = cache_dir(name)
+    registry.pull(name, ref, local_dir)
+    return chronos_model_dir(local_dir)
+
+
+def state_uri(model_uri: str) -> str:
+    """Sidecar object holding the training state of an artifact."""
+    return model_uri[:-len(".tar.gz")] + ".state.json" if model_uri.endswith(".tar.gz") else model_uri + ".state.json"
 
 
-def compress_model(folder_path: str) -> str:
-    """Compress a folder into a temporary .tar.gz archive."""
-    archive_path = os.path.join(tempfile.gettempdir(), "fine_tuned_chronos_model.tar.gz")
-    with tarfile.open(archive_path, "w:gz") as tar:
-        for file in os.listdir(folder_path):
-            tar.add(os.path.join(folder_path, file), arcname=file)
-    return archive_path
+def read_training_state(model_uri: str, session):
+    """Return the state stored next to a previous artifact, or None on the first run."""
+    bucket, key = state_uri(model_uri).replace("s3://", "").split("/", 1)
+    try:
+        body = session.client("s3").get_object(Bucket=bucket, Key=key)["Body"].read()
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+            return None
+        raise
+    return json.loads(body)
 
 
 def upload_to_s3(local_path: str, s3_uri: str, session):
@@ -99,26 +247,105 @@ def upload_to_s3(local_path: str, s3_uri: str, session):
 # Step 1: Prepare model and data
 # -----------------------------------------------------------------------------
 session = create_boto3_session(AWS_PROFILE)
+registry = ModelRegistry(MODEL_REGISTRY_URI, session.client("s3")) if MODEL_REGISTRY_URI else None
 
-base_model_local = (
-    extract_model_from_tar(download_from_s3(BASE_MODEL_PATH, session))
-    if BASE_MODEL_PATH.startswith("s3://")
-    else BASE_MODEL_PATH
-)
+previous_state = None
+if CONTINUED_TRAINING and registry is not None:
+    if registry.resolve(MODEL_NAME, "latest") is not None:
+        previous_state = registry.manifest(MODEL_NAME, "latest")["metadata"] or None
+elif CONTINUED_TRAINING:
+    previous_state = read_training_state(TUNNED_MODEL_PATH, session)
+if CONTINUED_TRAINING and previous_state is None:
+    print("ℹ️  No previous training state found; running a full fine-tune.")
 
-training_data_local = (
-    download_from_s3(TRAINING_DATA_PATH, session)
-    if TRAINING_DATA_PATH.startswith("s3://")
-    else TRAINING_DATA_PATH
-)
+if previous_state is not None and registry is not None:
+    # Continue from the latest registered version instead of the base model.
+    base_model_local = pull_from_registry(registry, MODEL_NAME, "latest")
+elif previous_state is not None:
+    # Continue from the last fine-tuned artifact instead of the base model.
+    base_model_local = extract_model_from_tar(download_from_s3(TUNNED_MODEL_PATH, session))
+elif BASE_MODEL_PATH.startswith("registry:"):
+    name, _, ref = BASE_MODEL_PATH[len("registry:"):].partition("@")
+    if registry is None:
+        sys.exit("❌ BASE_MODEL_PATH points into the registry but MODEL_REGISTRY_URI is not set.")
+    base_model_local = pull_from_registry(registry, name, ref or "latest")
+elif BASE_MODEL_PATH.startswith("channel:"):
+    base_model_local = extract_model_from_tar(channel_files(MODEL_CHANNEL, (".tar.gz",))[0])
+elif BASE_MODEL_PATH.startswith("s3://"):
+    base_model_local = extract_model_from_tar(download_from_s3(BASE_MODEL_PATH, session))
+else:
+    base_model_local = BASE_MODEL_PATH
+
+if TRAINING_DATA_PATH.startswith("channel:"):
+    training_data_local = channel_files(TRAINING_CHANNEL, (".csv",))
+elif TRAINING_DATA_PATH.startswith("s3://"):
+    training_data_local = [download_from_s3(TRAINING_DATA_PATH, session)]
+else:
+    training_data_local = [TRAINING_DATA_PATH]
 
 # -----------------------------------------------------------------------------
 # Step 2: Load training data
 # -----------------------------------------------------------------------------
-df = pd.read_csv(training_data_local)
+# A continued run reads only what the previous one did not consume; older
+# history comes from the replay buffer shipped in the previous artifact.
+# Artifacts that predate the buffer rebuild it from one full read.
+buffer = load_replay_buffer(base_model_local) if previous_state is not None else None
+consumed = previous_state.get("files", {}) if buffer is not None else {}
+df = read_training_csv(unread_ranges(training_data_local, consumed))
 df["item_id"] = "Turbine_1"
 df.rename(columns={"Unnamed: 0": "timestamp"}, inplace=True)
 df["timestamp"] = pd.to_datetime(df["timestamp"]).dt.tz_localize(None)
+df.sort_values(["item_id", "timestamp"], inplace=True)
+
+# Sensor gaps in the covariates are filled within each item; the target keeps
+# its NaNs, which Chronos treats as missing values.
+if COVARIATES:
+    df[COVARIATES] = df.groupby("item_id")[COVARIATES].transform(lambda c: c.ffill().bfill())
+
+max_replay_windows = max(1, REPLAY_BUFFER_ROWS // WINDOW)
+time_limit, fine_tune_steps = TRAINING_LIMIT_TIME, FINE_TUNE_STEPS
+
+if previous_state is None:
+    high_water_mark, total_rows = df["timestamp"].max(), len(df)
+    buffer = update_replay_buffer(None, df, CONTEXT_LENGTH, WINDOW, max_replay_windows)
+else:
+    previous_mark = pd.Timestamp(previous_state["high_water_mark"])
+    if buffer is None:
+        buffer = update_replay_buffer(None, df[df["timestamp"] <= previous_mark], CONTEXT_LENGTH, WINDOW,
+                                      max_replay_windows)
+    new_rows = df[df["timestamp"] > previous_mark]
+    if new_rows.empty:
+        print(f"✅ No data newer than {previous_mark}; the current model is up to date.")
+        sys.exit(0)
+    high_water_mark = new_rows["timestamp"].max()
+    total_rows = previous_state.get("rows_total", 0) + len(new_rows)
+    df = continued_training_frame(buffer, new_rows, WINDOW, REPLAY_RATIO)
+    buffer = update_replay_buffer(buffer, new_rows, CONTEXT_LENGTH, WINDOW, max_replay_windows)
+    # Training cost follows the amount of data actually used.
+    fraction = len(df) / total_rows
+    time_limit = max(MIN_LIMIT_TIME, int(TRAINING_LIMIT_TIME * fraction))
+    fine_tune_steps = max(MIN_FINE_TUNE_STEPS, int(FINE_TUNE_STEPS * fraction))
+    print(f"⏱️  Time limit: {time_limit}s, {fine_tune_steps} steps for {len(df)} of {total_rows} rows")
+
+# Chronos-Bolt is univariate and ignores covariate columns, so the covariate
+# effect is fitted here, removed from the target, and the same regressor is
+# applied by the serving handlers; the TimeSeriesDataFrame carries the residual.
+# A continued run keeps the regressor the previous model was tuned against.
+regressor = None
+if previous_state is not None:
+    regressor = load_regressor(base_model_local)
+    previous = (regressor.names, regressor.past_names) if regressor is not None else ([], [])
+    if previous != (KNOWN_COVARIATES, PAST_COVARIATES):
+        sys.exit(f"❌ The previous model was trained with known/past covariates {previous}, not "
+                 f"{(KNOWN_COVARIATES, PAST_COVARIATES)}; run a full fine-tune to change them.")
+elif COVARIATES:
+    lagged = lag_frame(df, PAST_COVARIATES, PREDICTION_LENGTH, "item_id")
+    regressor = CovariateRegressor.fit(lagged[COVARIATES].to_numpy(), df["ActivePower"].to_numpy(),
+                                       KNOWN_COVARIATES, past_names=PAST_COVARIATES, lag=PREDICTION_LENGTH)
+    print(f"📐 Fitted covariate regressor over {KNOWN_COVARIATES} (known) and {PAST_COVARIATES} (past)")
+if regressor is not None:
+    effect = regressor.predict(regressor.lag_frame(df, "item_id")[COVARIATES].to_numpy())
+    df["ActivePower"] = df["ActivePower"] - effect
 
 ts_df = TimeSeriesDataFrame.from_data_frame(
     df[["timestamp", "ActivePower", "item_id"]],
@@ -133,19 +360,22 @@ output_dir = tempfile.mkdtemp(prefix="chronos_finetuned_")
 print(f"🏗️  Fine-tuning Chronos model → {output_dir}")
 
 predictor = TimeSeriesPredictor(
-    prediction_length   = 24,
-    path                = output_dir,
-    target              = "ActivePower",
-    eval_metric         = "RMSE",
+    prediction_length       = PREDICTION_LENGTH,
+    path                    = output_dir,
+    target                  = "ActivePower",
+    eval_metric             = "RMSE",
 )
 
 predictor.fit(
     train_data      = ts_df,
-    time_limit      = TRAINING_LIMIT_TIME,
+    time_limit      = time_limit,
     hyperparameters = {
         "Chronos": {
             "pretrained_model_name": "chronos_bolt_tiny",
             "model_path": base_model_local,
+            "fine_tune": True,
+            "fine_tune_steps": fine_tune_steps,
+            "fine_tune_lr": FINE_TUNE_LR,
         }
     },
 )
@@ -153,8 +383,33 @@ predictor.fit(
 # -----------------------------------------------------------------------------
 # Step 4: Compress and upload fine-tuned model
 # -----------------------------------------------------------------------------
-archive_path = compress_model(output_dir)
+# The artifact is the tuned checkpoint itself, not the predictor directory.
+artifact_dir = export_serving_model(output_dir, tempfile.mkdtemp(prefix="chronos_artifact_"))
+training_state = {
+    "high_water_mark": high_water_mark.isoformat(),
+    "mode": "continued" if previous_state is not None else "full",
+    "rows_used": len(df),
+    "rows_total": total_rows,
+    "files": {**consumed, **file_sizes(training_data_local)},
+    "time_limit": time_limit,
+    "fine_tune_steps": fine_tune_steps,
+    "trained_at": datetime.now(timezone.utc).isoformat(),
+}
+with open(os.path.join(artifact_dir, "training_state.json"), "w") as f:
+    json.dump(training_state, f, indent=2)
+if regressor is not None:
+    regressor.save(artifact_dir)
+save_replay_buffer(buffer, artifact_dir)
+
+archive_path = compress(artifact_dir, os.path.join(tempfile.gettempdir(), "fine_tuned_chronos_model.tar.gz"))
 upload_to_s3(archive_path, TUNNED_MODEL_PATH, session)
+# The state goes up last so a failed upload never advances the high-water mark.
+upload_to_s3(os.path.join(artifact_dir, "training_state.json"), state_uri(TUNNED_MODEL_PATH), session)
+
+if registry is not None:
+    # Files shared with earlier versions (e.g. an unchanged covariate model) are not re-uploaded.
+    version = registry.push(MODEL_NAME, artifact_dir, metadata=training_state)["version"]
+    print(f"🗂️  Registered {MODEL_NAME}@{version} in {MODEL_REGISTRY_URI}")
 
 print("🎯 Fine-tuning workflow completed successfully!")
-print(f"📦 Model uploaded to: {TUNNED_MODEL_PATH}")
\ No newline at end of file
+print(f"📦 Model uploaded to: {TUNNED_MODEL_PATH}")
@@ -0,0 +1,113 @@
+import os
+import sys
+import json
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'deployment')))
+
+from admission import AdmissionController, DeadlineExceededError, QueueFullError, parse_request_hints
+
+
+# --- Tarea falsa: registra el orden de ejecución ---
+def make_task(order: list, delay: float = 0.02):
+    def task(name):
+        time.sleep(delay)
+        order.append(name)
+        return name
+    return task
+
+
+async def with_controller(scenario, max_queue_depth: int = 16):
+    controller = AdmissionController(ThreadPoolExecutor(max_workers=1), 1, max_queue_depth)
+    await controller.start()
+    try:
+        return await scenario(controller)
+    finally:
+        await controller.stop()
+
+
+def test_interactive_requests_jump_bulk_queue():
+    order = []
+    task = make_task(order)
+
+    async def scenario(controller):
+        first = asyncio.ensure_future(controller.submit(task, "busy", priority="bulk"))
+        await asyncio.sleep(0.005)
+        bulk = [controller.submit(task, f"bulk-{i}", priority="bulk") for i in range(3)]
+        interactive = controller.submit(task, "interactive", priority="interactive")
+        await asyncio.gather(first, *bulk, interactive)
+
+    asyncio.run(with_controller(scenario))
+    assert order[:2] == ["busy", "interactive"]
+
+
+def test_expired_requests_skip_the_model():
+    order = []
+    task = make_task(order, delay=0.1)
+
+    async def scenario(controller):
+        busy = asyncio.ensure_future(controller.submit(task, "busy"))
+        await asyncio.sleep(0.005)
+        with pytest.raises(DeadlineExceededError):
+            await controller.submit(task, "late", deadline_ms=10)
+        await busy
+        return controller.metrics()
+
+    metrics = asyncio.run(with_controller(scenario))
+    assert order == ["busy"]
+    assert metrics["expired"] == 1 and metrics["completed"] == 1
+
+
+def test_full_queue_rejects():
+    async def scenario(controller):
+        busy = asyncio.ensure_future(controller.submit(make_task([], 0.05), "busy"))
+        await asyncio.sleep(0.005)
+        with pytest.raises(QueueFullError):
+            await controller.submit(make_task([]), "rejected")
+        await busy
+
+    asyncio.run(with_controller(scenario, max_queue_depth=1))
+
+
+def test_request_hints():
+    headers = {"X-Amzn-SageMaker-Custom-Attributes": "priority=bulk, deadline_ms=250"}
+    assert parse_request_hints(headers, 10) == ("bulk", 250.0)
+    assert parse_request_hints({}, 10)[0] == "interactive"
+    assert parse_request_hints({}, 10 ** 7)[0] == "bulk"
+
+
+@pytest.mark.parametrize("deadline", ["nan", "inf", "0", "-5", "soon"])
+def test_invalid_deadlines_are_rejected(deadline):
+    with pytest.raises(ValueError, match="deadline_ms"):
+        parse_request_hints({"X-Deadline-Ms": deadline}, 10)
+
+    async def scenario(controller):
+        with pytest.raises(ValueError, match="deadline_ms"):
+            await controller.submit(make_task([]), "x", deadline_ms=float("nan"))
+        return controller.metrics()
+
+    assert asyncio.run(with_controller(scenario))["admitted"] == 0
+
+
+def test_interval_metrics_are_emf_deltas(capsys):
+    import cloudwatch
+
+    async def scenario(controller):
+        await controller.submit(make_task([], 0), "a", deadline_ms=None)
+        first = controller.interval_metrics()
+        await controller.submit(make_task([], 0), "b")
+        return first, controller.interval_metrics()
+
+    first, second = asyncio.run(with_controller(scenario))
+    assert first["completed"] == 1 and second["completed"] == 1 and second["admitted"] == 1
+
+    cloudwatch.publish(second, Source="admission")
+    record = json.loads(capsys.readouterr().out)
+    definition = record["_aws"]["CloudWatchMetrics"][0]
+    assert {"Name": "completed", "Unit": "Count"} in definition["Metrics"]
+    assert {"Name": "interactive_queue_p99_ms", "Unit": "Milliseconds"} in definition["Metrics"]
+    assert set(definition["Dimensions"][0]) == {"Endpoint", "Host", "Source"} and record["Source"] == "admission"
@@ -0,0 +1,95 @@
+import io
+import os
+import sys
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'client')))
+
+from chronos_client import ChronosClient, HttpTransport, SageMakerTransport, RetryPolicy, InferenceError
+from stub_server import create_app, STATE_KEY
+
+
+# --- Levantar el stub server y ejecutar una corutina contra él ---
+def run_against_stub(coro_fn, **app_kwargs):
+    async def runner():
+        server = TestServer(create_app(**app_kwargs))
+        await server.start_server()
+        try:
+            return await coro_fn(str(server.make_url("")), server.app[STATE_KEY])
+        finally:
+            await server.close()
+
+    return asyncio.run(runner())
+
+
+def test_single_request():
+    async def scenario(url, state):
+        async with ChronosClient(HttpTransport(url)) as client:
+            return await client.forecast({"series": [1, 2, 3], "prediction_length": 4})
+
+    result = run_against_stub(scenario)
+    assert result["forecast"]["mean"] == [[3, 3, 3, 3]]
+
+
+def test_coalescing_merges_requests():
+    async def scenario(url, state):
+        async with ChronosClient(HttpTransport(url), coalesce=True, max_batch=8, max_wait=0.05) as client:
+            payloads = [{"series": [i, i + 1], "prediction_length": 2} for i in range(8)]
+            results = await asyncio.gather(*(client.forecast(p) for p in payloads))
+        return results, state["requests"]
+
+    results, requests = run_against_stub(scenario)
+    assert requests == 1
+    assert [r["forecast"]["mean"] for r in results] == [[[i + 1, i + 1]] for i in range(8)]
+
+
+def test_per_series_fields_are_not_coalesced():
+    async def scenario(url, state):
+        async with ChronosClient(HttpTransport(url), coalesce=True, max_batch=8, max_wait=0.05) as client:
+            payloads = [{"series": [i, i + 1], "series_ids": [f"turbine-{i}"]} for i in range(4)]
+            await asyncio.gather(*(client.forecast(p) for p in payloads))
+        return state["requests"]
+
+    assert run_against_stub(scenario) == 4
+
+
+def test_retries_exhausted_on_backpressure():
+    async def scenario(url, state):
+        retry = RetryPolicy(max_attempts=2, base_delay=0.001)
+        async with ChronosClient(HttpTransport(url), retry=retry) as client:
+            try:
+                await asyncio.gather(*(client.forecast({"series": [1.0]}) for _ in range(4)))
+            except InferenceError as e:
+                return e.status
+
+    assert run_against_stub(scenario, latency=0.2, max_inflight=1) == 429
+
+
+# --- Errores de conexión de botocore: se reintentan como los de red ---
+def test_sagemaker_connection_errors_are_retried():
+    from botocore.exceptions import ConnectionClosedError, EndpointConnectionError, ReadTimeoutError
+
+    class FlakyRuntime:
+        def __init__(self):
+            self.errors = [EndpointConnectionError(endpoint_url="https://runtime"),
+                           ReadTimeoutError(endpoint_url="https://runtime"),
+                           ConnectionClosedError(endpoint_url="https://runtime")]
+
+        def invoke_endpoint(self, **kwargs):
+            if self.errors:
+                raise self.errors.pop(0)
+            return {"Body": io.BytesIO(b'{"predictions": []}')}
+
+    transport = SageMakerTransport("chronos")
+    transport._client = FlakyRuntime()
+    client = ChronosClient(transport, retry=RetryPolicy(max_attempts=4, base_delay=0.001))
+    assert asyncio.run(client.invoke({"series": [1.0]})) == {"predictions": []}
+
+    transport._client = FlakyRuntime()
+    client.retry = RetryPolicy(max_attempts=2, base_delay=0.001)
+    with pytest.raises(InferenceError, match="(?i)timeout") as failure:
+        asyncio.run(client.invoke({"series": [1.0]}))
+    assert failure.value.status is None
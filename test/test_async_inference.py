@@ -0,0 +1,38 @@
+import os
+import sys
+import json
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'training')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'deployment')))
+
+import distillation
+import inference
+import student
+
+CONTEXT, HORIZON, LEVELS = 32, 6, [0.1, 0.5, 0.9]
+
+
+# --- Modelo numpy pequeño (estudiante lineal) para no depender de torch ---
+def make_model(tmp_path, rng):
+    series = rng.normal(100, 10, size=(200, CONTEXT)).astype(np.float32)
+    teacher = np.repeat(series[:, -HORIZON:, None], len(LEVELS), axis=2) + np.array([-5, 0, 5], dtype=np.float32)
+    distillation.save_student(distillation.fit_student(series, teacher, CONTEXT, hidden=0), str(tmp_path),
+                              CONTEXT, HORIZON, LEVELS)
+    return student.StudentModel(str(tmp_path))
+
+
+def test_async_payloads_skip_the_batch_limit_and_run_in_chunks(tmp_path):
+    rng = np.random.default_rng(0)
+    model = make_model(tmp_path, rng)
+    body = json.dumps({"series": rng.normal(100, 10, size=(50, CONTEXT)).tolist(),
+                       "prediction_length": HORIZON, "quantile_levels": LEVELS})
+
+    # serve.py with ASYNC_INFERENCE=1: no batch limit, chunks of ASYNC_BATCH_SIZE.
+    data = inference.input_fn(body, "application/json", max_batch_size=0)
+    chunked = inference.predict_fn(dict(data, batch_size=8), model)
+    whole = inference.predict_fn(dict(data, batch_size=None), model)
+
+    assert np.asarray(chunked["quantiles"]).shape == (50, HORIZON, len(LEVELS))
+    np.testing.assert_allclose(chunked["quantiles"], whole["quantiles"], rtol=1e-6)
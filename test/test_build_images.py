@@ -0,0 +1,74 @@
+import os
+import sys
+import shutil
+import subprocess
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'scripts', 'ecr')))
+
+from build_images import content_hash, build_image, ensure_builder
+
+REGISTRY_PORT = 5055
+
+
+# --- Contexto de build mínimo ---
+def make_context(root, message: str = "hola"):
+    (root / "app.txt").write_text(message)
+    (root / "dockerfile").write_text("FROM busybox\nCOPY app.txt /app.txt\n")
+    return {"dockerfile": str(root / "dockerfile"), "context": str(root)}
+
+
+def test_content_hash_ignores_bytecode(tmp_path):
+    spec = make_context(tmp_path)
+    before = content_hash(spec["context"], spec["dockerfile"])
+
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "__pycache__" / "app.cpython-310.pyc").write_bytes(b"\0")
+    assert content_hash(spec["context"], spec["dockerfile"]) == before
+
+    (tmp_path / "app.txt").write_text("adios")
+    assert content_hash(spec["context"], spec["dockerfile"]) != before
+
+
+def test_content_hash_covers_only_copied_files(tmp_path):
+    (tmp_path / "app").mkdir()
+    (tmp_path / "app" / "main.py").write_text("print('hola')")
+    (tmp_path / "other.py").write_text("x = 1")
+    (tmp_path / "notes.md").write_text("notas")
+    (tmp_path / "dockerfile").write_text("FROM busybox AS base\nCOPY --from=base /bin /bin\n"
+                                         "COPY --chown=1000 app \\\n     *.py /code/\n")
+    spec = {"dockerfile": str(tmp_path / "dockerfile"), "context": str(tmp_path)}
+    before = content_hash(spec["context"], spec["dockerfile"])
+
+    (tmp_path / "notes.md").write_text("otras notas")
+    assert content_hash(spec["context"], spec["dockerfile"]) == before
+    for changed in (tmp_path / "app" / "main.py", tmp_path / "other.py"):
+        changed.write_text("print('adios')")
+        assert content_hash(spec["context"], spec["dockerfile"]) != before
+        before = content_hash(spec["context"], spec["dockerfile"])
+
+
+@pytest.fixture
+def local_registry():
+    if shutil.which("docker") is None or subprocess.run(["docker", "info"], capture_output=True).returncode:
+        pytest.skip("docker is not available")
+    name = "chronos-test-registry"
+    subprocess.run(["docker", "run", "-d", "--rm", "--name", name, "-p", f"{REGISTRY_PORT}:5000", "registry:2"],
+                   check=True, capture_output=True)
+    try:
+        yield f"localhost:{REGISTRY_PORT}"
+    finally:
+        subprocess.run(["docker", "rm", "-f", name], capture_output=True)
+
+
+def test_second_build_is_skipped(tmp_path, local_registry):
+    ensure_builder()
+    spec = make_context(tmp_path)
+    repository = f"{local_registry}/chronos-test"
+
+    first = build_image("test", spec, repository, "latest")
+    second = build_image("test", spec, repository, "latest")
+
+    assert not first["skipped"]
+    assert second["skipped"]
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'scripts', 'sagemaker')))
+
+from plan_capacity import fit_usl, usl_throughput, capacity_at_slo, fit_core_scaling, recommend
+
+
+# --- Curva sintética con contención y coherencia conocidas ---
+def test_usl_fit_recovers_parameters():
+    n = np.array([1, 2, 4, 8, 16])
+    x = usl_throughput(n, 20.0, 0.1, 0.01)
+    lam, sigma, kappa = fit_usl(n, x)
+    np.testing.assert_allclose([lam, sigma, kappa], [20.0, 0.1, 0.01], rtol=1e-6)
+
+
+def test_capacity_respects_latency_slo():
+    # Without contention latency is constant (50 ms), so the SLO never binds...
+    assert capacity_at_slo(20.0, 0.0, 0.0, 1.0, 100.0, max_concurrency=8) == 160.0
+    # ...while a tight SLO excludes everything.
+    assert capacity_at_slo(20.0, 0.0, 0.0, 1.0, 10.0) == 0.0
+
+
+def test_recommendation_and_policy():
+    a, b = fit_core_scaling([1, 2, 4], [10.0, 20.0, 40.0])
+    assert np.isclose(a, 10.0) and np.isclose(b, 1.0)
+
+    types = {"small": (2, 0.1), "large": (8, 0.5)}
+    plan = recommend(a, b, peak_rps=100, base_rps=20, target_utilization=0.5, instance_types=types)
+    # small: 20 rps/instance -> 10 instances ($1.0); large: 80 rps -> 3 instances ($1.5)
+    assert (plan["instance_type"], plan["instance_count"]) == ("small", 10)
+    assert plan["autoscaling"]["target_value"] == 600.0
+    assert plan["autoscaling"]["min_capacity"] == 2
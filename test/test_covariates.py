@@ -0,0 +1,91 @@
+import os
+import sys
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'deployment')))
+
+import inference
+from covariates import CovariateRegressor, lag_frame, load_regressor
+
+NAMES = ["WindSpeed", "WindDirection"]
+
+
+# --- Curva de potencia sintética: cúbica entre arranque y nominal ---
+def power_curve(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.uniform(0, 25, n), rng.uniform(0, 360, n)])
+    power = np.clip((X[:, 0] - 3) / 9, 0, 1) ** 3 * 2000
+    return X, power, power + rng.normal(0, 30, n)
+
+
+def test_regressor_follows_the_power_curve_and_round_trips(tmp_path):
+    X, power, observed = power_curve(20000)
+    regressor = CovariateRegressor.fit(X, observed, NAMES)
+    assert np.sqrt(np.mean((regressor.predict(X) - power) ** 2)) < 50
+
+    regressor.save(str(tmp_path))
+    loaded = load_regressor(str(tmp_path))
+    assert loaded.names == NAMES
+    np.testing.assert_allclose(loaded.predict(X[:100]), regressor.predict(X[:100]))
+    assert load_regressor(str(tmp_path / "missing")) is None
+
+
+def test_serving_requires_the_trained_covariates(monkeypatch):
+    X, _, observed = power_curve(2000)
+    monkeypatch.setattr(inference, "COVARIATE_REGRESSOR", CovariateRegressor.fit(X, observed, NAMES))
+    series = [float(v) for v in observed[:8]]
+    covariates = X[:10].T.tolist()  # (n_covariates, context + horizon)
+
+    def parse(**payload):
+        return inference.input_fn(json.dumps({"series": series, "prediction_length": 2, **payload}), "application/json")
+
+    data = parse(covariates=covariates)
+    context, effect = inference.covariate_effect(data["series"], data["covariates"])
+    assert effect.shape == (1, 2)
+    np.testing.assert_allclose(effect[0], inference.COVARIATE_REGRESSOR.predict(X[8:10]), rtol=1e-4)
+
+    for bad, message in [(None, "needs 'covariates'"), (covariates[0], "must have shape"),
+                         (covariates[:1], "must have shape"), (5, "must have shape")]:
+        with pytest.raises(ValueError, match=message):
+            parse(covariates=bad)
+
+    monkeypatch.setattr(inference, "COVARIATE_REGRESSOR", None)
+    with pytest.raises(ValueError, match="without covariates"):
+        parse(covariates=covariates)
+
+
+# --- Covariables pasadas: retrasadas `lag` pasos, igual en entrenamiento y servicio ---
+def test_past_covariates_are_lagged_the_same_way_in_training_and_serving(monkeypatch):
+    rng = np.random.default_rng(0)
+    X, _, observed = power_curve(2000)
+    temperature = rng.normal(15, 5, 2000)
+    lag = 2
+    lagged = lag_frame(pd.DataFrame({"t": temperature}), ["t"], lag)["t"].to_numpy()
+    np.testing.assert_array_equal(lagged[lag:], temperature[:-lag])
+    assert (lagged[:lag] == temperature[0]).all()
+
+    regressor = CovariateRegressor.fit(np.column_stack([X, lagged]), observed, NAMES,
+                                       past_names=["Temperature"], lag=lag)
+    assert regressor.columns == NAMES + ["Temperature"]
+    monkeypatch.setattr(inference, "COVARIATE_REGRESSOR", regressor)
+
+    # Series of 8 steps, horizon 2: the horizon uses the temperatures of steps 6 and 7.
+    payload = {"series": [float(v) for v in observed[:8]], "prediction_length": 2,
+               "covariates": X[:10].T.tolist(), "past_covariates": [temperature[:8].tolist()]}
+    data = inference.input_fn(json.dumps(payload), "application/json")
+    _, effect = inference.covariate_effect(data["series"], data["covariates"])
+    expected = regressor.predict(np.column_stack([X[8:10], temperature[6:8]]))
+    np.testing.assert_allclose(effect[0], expected, rtol=1e-4)
+
+    for bad, message in [({"past_covariates": None}, "needs 'past_covariates'"),
+                         ({"past_covariates": [temperature[:10].tolist()]}, "must have shape")]:
+        with pytest.raises(ValueError, match=message):
+            inference.input_fn(json.dumps({**payload, **bad}), "application/json")
+
+    monkeypatch.setattr(inference, "COVARIATE_REGRESSOR", CovariateRegressor.fit(X, observed, NAMES))
+    with pytest.raises(ValueError, match="no past covariates"):
+        inference.input_fn(json.dumps(payload), "application/json")
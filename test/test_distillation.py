@@ -0,0 +1,89 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'training')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'deployment')))
+
+import distillation
+import inference
+import runtime_tuning
+import student
+
+LEVELS = [0.1, 0.5, 0.9]
+CONTEXT, HORIZON, PERIOD = 48, 12, 24
+
+
+# --- Profesor sintético: naive estacional con cuantiles normales ---
+def make_data(n: int = 600, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(CONTEXT)[None, :] + rng.integers(0, PERIOD, size=(n, 1))
+    level, amplitude = rng.uniform(50, 150, size=(n, 1)), rng.uniform(5, 20, size=(n, 1))
+    series = (level + amplitude * np.sin(2 * np.pi * t / PERIOD) + rng.normal(0, 1, size=t.shape)).astype(np.float32)
+
+    naive = series[:, -PERIOD:][:, np.arange(HORIZON) % PERIOD]
+    z = np.array([-1.2816, 0, 1.2816], dtype=np.float32)
+    teacher = naive[:, :, None] + 0.05 * amplitude[:, :, None] * z
+    return series, teacher.astype(np.float32)
+
+
+def test_student_matches_teacher_and_serves_through_handlers(tmp_path, monkeypatch):
+    series, teacher = make_data()
+    train, holdout = slice(0, 500), slice(500, None)
+
+    params = distillation.fit_student(series[train], teacher[train], CONTEXT, hidden=32, epochs=5)
+    predicted = distillation.predict(params, series[holdout], CONTEXT, HORIZON, len(LEVELS))
+    gap = distillation.teacher_gap(predicted, teacher[holdout], LEVELS)
+    assert gap["mean"] < 0.02 and all(gap[str(q)] < 0.03 for q in LEVELS)
+
+    distillation.save_student(params, str(tmp_path), CONTEXT, HORIZON, LEVELS)
+    # model_fn narrows the context policy to the student's window; restore it afterwards.
+    monkeypatch.setattr(inference, "MAX_CONTEXT_LENGTH", inference.MAX_CONTEXT_LENGTH)
+    # Serving the student must not import (or configure) torch.
+    monkeypatch.setattr(runtime_tuning, "apply_torch_settings", lambda profile: pytest.fail("torch configured"))
+    model = inference.model_fn(str(tmp_path))
+    assert isinstance(model, student.StudentModel)
+
+    # Same features and forward pass when served; other levels are interpolated.
+    arrays = inference.forecast_batch(model, series[holdout], None, HORIZON, [0.1, 0.3, 0.5, 0.9])
+    np.testing.assert_allclose(arrays["quantiles"][..., [0, 2, 3]], predicted, rtol=1e-5, atol=1e-3)
+    np.testing.assert_allclose(arrays["quantiles"][..., 1], predicted[..., :2].mean(axis=2), rtol=1e-5, atol=1e-3)
+    np.testing.assert_allclose(arrays["mean"], predicted[..., 1], rtol=1e-5, atol=1e-3)
+
+
+def test_student_handles_short_and_missing_history(tmp_path):
+    series, teacher = make_data(n=200)
+    params = distillation.fit_student(series, teacher, CONTEXT, hidden=0)
+    distillation.save_student(params, str(tmp_path), CONTEXT, HORIZON, LEVELS)
+    model = student.StudentModel(str(tmp_path))
+
+    short = series[:2, -10:].copy()
+    short[0, 3] = np.nan
+    quantiles, mean = model.predict_quantiles(short, HORIZON // 2, LEVELS)
+    assert quantiles.shape == (2, HORIZON // 2, 3) and np.isfinite(quantiles).all()
+    assert (np.diff(quantiles, axis=2) >= 0).all()
+
+    with pytest.raises(ValueError, match="horizon"):
+        model.predict_quantiles(short, HORIZON + 1, LEVELS)
+
+
+# --- Varios sitios: ventanas por serie y reserva sin solapamiento ---
+def test_windows_stay_within_each_series_and_clear_the_holdout():
+    stride, window = 4, CONTEXT + HORIZON
+    series = {"site_a": np.arange(400, dtype=np.float32), "site_b": 1000 + np.arange(300, dtype=np.float32)}
+    train, holdout = distillation.split_windows(series, CONTEXT, HORIZON, stride, holdout_fraction=0.1)
+
+    # Every window is contiguous: no step of one site follows a step of the other.
+    for windows in (train, holdout):
+        assert (np.diff(windows, axis=1) == 1).all()
+    for values in series.values():
+        own_train = train[(train[:, 0] >= values[0]) & (train[:, 0] <= values[-1])]
+        own_holdout = holdout[(holdout[:, 0] >= values[0]) & (holdout[:, 0] <= values[-1])]
+        assert len(own_holdout) and own_train[:, -1].max() < own_holdout[:, 0].min()
+        assert own_holdout[-1, -1] == values[-1]
+
+    with pytest.raises(ValueError, match="site_c"):
+        distillation.split_windows({**series, "site_c": np.arange(window + 8, dtype=np.float32)},
+                                   CONTEXT, HORIZON, stride, 0.1)
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'training')))
+
+import incremental
+
+CONTEXT, WINDOW = 8, 12
+
+
+def rows(start: int, n: int, item: str = "Turbine_1") -> pd.DataFrame:
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=start + n, freq="h")[start:],
+        "ActivePower": np.arange(start, start + n, dtype=float),
+        "item_id": item,
+    })
+
+
+# --- Lectura incremental: solo lo que no se consumió ---
+def test_only_unread_bytes_are_parsed(tmp_path):
+    grown, same, new = tmp_path / "a.csv", tmp_path / "b.csv", tmp_path / "c.csv"
+    for path in (grown, same):
+        rows(0, 5).to_csv(path, index=False)
+    consumed = incremental.file_sizes([str(grown), str(same)])
+
+    rows(5, 3).to_csv(grown, mode="a", header=False, index=False)
+    rows(0, 2).to_csv(new, index=False)
+    ranges = incremental.unread_ranges([str(grown), str(same), str(new)], consumed)
+    assert ranges == [(str(grown), consumed[str(grown)]), (str(new), 0)]
+
+    chunks = incremental.read_csv_range(str(grown), consumed[str(grown)], lambda c: c != "item_id", 2)
+    tail = pd.concat(chunks, ignore_index=True)
+    assert list(tail.columns) == ["timestamp", "ActivePower"]
+    assert tail["ActivePower"].tolist() == [5.0, 6.0, 7.0]
+
+
+# --- Buffer de repetición acotado ---
+def test_replay_buffer_stays_bounded_and_feeds_continued_runs(tmp_path):
+    buffer = incremental.update_replay_buffer(None, rows(0, 200), CONTEXT, WINDOW, max_windows=5)
+    replay = incremental.is_replay(buffer["item_id"])
+    assert buffer.loc[~replay, "ActivePower"].tolist() == list(np.arange(192, 200, dtype=float))
+    assert buffer.loc[replay, "item_id"].nunique() == 5 and replay.sum() == 5 * WINDOW
+
+    incremental.save_replay_buffer(buffer, str(tmp_path))
+    buffer = incremental.load_replay_buffer(str(tmp_path))
+    new = rows(200, 24)
+    frame = incremental.continued_training_frame(buffer, new, WINDOW, replay_ratio=1.0)
+    recent = frame[~incremental.is_replay(frame["item_id"])]
+    assert recent["ActivePower"].tolist() == list(np.arange(192, 224, dtype=float))
+    assert frame["item_id"].nunique() == 1 + 2 and incremental.PRIORITY not in frame
+
+    buffer = incremental.update_replay_buffer(buffer, new, CONTEXT, WINDOW, max_windows=5)
+    replay = incremental.is_replay(buffer["item_id"])
+    assert buffer.loc[~replay, "ActivePower"].tolist() == list(np.arange(216, 224, dtype=float))
+    assert buffer.loc[replay, "item_id"].nunique() == 5
+    assert incremental.load_replay_buffer(str(tmp_path / "missing")) is None
@@ -2,10 +2,10 @@ import json
 import os, sys
 
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'deployment')))
 
 
-from deployment.inference import model_fn, input_fn, predict_fn, output_fn
+from inference import model_fn, input_fn, predict_fn, output_fn
 
 
 
@@ -19,7 +19,9 @@ MODEL_DIR = "models/chronos-bolt-tiny"
 # --- Simular una petición ---
 request_body = json.dumps({
     "series": [[10.0, 20.0, 30.0, 40.0, 50.0]],
-    "prediction_length": 3
+    "prediction_length": 3,
+    "quantile_levels": [0.1, 0.5, 0.9],
+    "precision": 3
 })
 
 print("🧠 Loading model...")
@@ -29,7 +31,7 @@ print("📥 Preparing input...")
 inputs = input_fn(request_body, "application/json")
 
 print("⚙️ Running prediction...")
-quantiles, preds = predict_fn(inputs, model)
+prediction = predict_fn(inputs, model)
 
 print("📤 Producing output...")
-print(output_fn(preds, "application/json"))
+print(output_fn(prediction, "application/json"))
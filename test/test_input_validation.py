@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'deployment')))
+
+from inference import input_fn
+
+
+def parse(payload, **kwargs):
+    return input_fn(json.dumps(payload), "application/json", **kwargs)
+
+
+# --- Valores ausentes: None se convierte en NaN y las series desiguales se alinean a la derecha ---
+def test_none_becomes_nan_and_ragged_rows_are_right_aligned():
+    series = parse({"series": [[1, None, 3], [4, 5]]})["series"]
+    np.testing.assert_array_equal(series[:, -3:], [[1, np.nan, 3], [np.nan, 4, 5]])
+
+
+@pytest.mark.parametrize("series, message", [
+    ([[1, 2], [3, "x"]], "Series 1, position 1"),
+    ([["1.5", "2"]], "Series 0, position 0"),
+    ([[1, 2], [3, True]], "Series 1, position 1"),
+    ([[True, False]], "Series 0, position 0"),
+    ([[1, 2], [None, 10 ** 400]], "Series 1, position 1"),
+    ([[1, 2], [3, [4]]], "Series 1, position 1"),
+    ([[1, 2], []], "Series 1 is empty"),
+    ([[1, 2], 3], "Series 1: expected a list"),
+])
+def test_bad_values_report_series_index(series, message):
+    with pytest.raises(ValueError, match=message):
+        parse({"series": series})
+
+
+def test_infinity_is_rejected():
+    body = '{"series": [[1, 2, 3], [4, Infinity, 6]]}'
+    with pytest.raises(ValueError, match="Series 1, position 1: infinite"):
+        input_fn(body, "application/json")
+
+
+def test_batch_limit():
+    with pytest.raises(ValueError, match="limit is 2"):
+        parse({"series": [[1.0]] * 3}, max_batch_size=2)
+    assert parse({"series": [[1.0]] * 3}, max_batch_size=0)["series"].shape[0] == 3
+
+
+# --- Codificación de la respuesta ---
+def test_float16_json_is_rounded_and_precision_needs_json():
+    from inference import encode_array
+
+    values = np.array([[0.1, 123.456, -0.00123, 0.0]], dtype=np.float32)
+    assert encode_array(values, "json", "float16") == [[0.09998, 123.4, -0.00123, 0.0]]
+    assert encode_array(values, "json", "float32", precision=2) == [[0.1, 123.46, -0.0, 0.0]]
+
+    with pytest.raises(ValueError, match="precision"):
+        parse({"series": [[1.0, 2.0]], "encoding": "base64", "precision": 2})
+
+
+# --- Opciones de la petición: errores claros en vez de fallos posteriores ---
+@pytest.mark.parametrize("options, message", [
+    ({"precision": "2"}, "'precision' must be an integer"),
+    ({"precision": -1}, "'precision' must be an integer"),
+    ({"precision": True}, "'precision' must be an integer"),
+    ({"num_samples": "x"}, "'num_samples' must be an integer"),
+    ({"num_samples": 1.5}, "'num_samples' must be an integer"),
+    ({"quantile_levels": []}, "non-empty list"),
+    ({"quantile_levels": ["0.5"]}, "numbers in \\(0, 1\\)"),
+    ({"quantile_levels": 0.5}, "non-empty list"),
+    ({"quantile_levels": [0.5, 0.5]}, "unique and in increasing order"),
+    ({"quantile_levels": [0.9, 0.1]}, "unique and in increasing order"),
+    ({"outputs": "mean"}, "'outputs' must be a non-empty list"),
+    ({"outputs": []}, "'outputs' must be a non-empty list"),
+    ({"outputs": [1]}, "'outputs' must be a non-empty list"),
+    ({"outputs": ["median"]}, "Unknown outputs"),
+    ({"sample_correlation": "0.5"}, "'sample_correlation' must be a number"),
+    ({"seed": "7"}, "'seed' must be a non-negative integer"),
+    ({"hierarchy": {"farm": []}}, "'farm' must list at least one child"),
+    ({"hierarchy": {"farm": "0"}}, "'farm' must list at least one child"),
+    ({"hierarchy": ["0", "1"]}, "non-empty object"),
+])
+def test_bad_options_are_rejected(options, message):
+    with pytest.raises(ValueError, match=message):
+        parse({"series": [[1.0, 2.0], [3.0, 4.0]], **options})
@@ -0,0 +1,107 @@
+import os
+import sys
+import tarfile
+
+import boto3
+from moto import mock_aws
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'training')))
+
+import model_registry
+from model_registry import ModelRegistry
+
+
+# --- Modelo de prueba en disco ---
+def write_model(root, weights: bytes):
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "config.json").write_text('{"model_type": "t5"}')
+    (root / "model.safetensors").write_bytes(weights)
+
+
+def make_registry():
+    s3 = boto3.client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="models", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    return s3, ModelRegistry("s3://models/registry", s3)
+
+
+def count_calls(s3, operation: str) -> list:
+    calls = []
+    s3.meta.events.register(f"before-parameter-build.s3.{operation}", lambda params, **kw: calls.append(params["Key"]))
+    return calls
+
+
+@mock_aws
+def test_push_deduplicates_unchanged_files(tmp_path):
+    s3, registry = make_registry()
+    write_model(tmp_path / "v1", b"\x01" * 1024)
+    first = registry.push("chronos", str(tmp_path / "v1"), metadata={"high_water_mark": "2020-01-01"})
+
+    write_model(tmp_path / "v2", b"\x02" * 1024)
+    uploads = count_calls(s3, "PutObject")
+    second = registry.push("chronos", str(tmp_path / "v2"))
+
+    # Only the new weights plus the manifest and the "latest" ref are written.
+    assert len(uploads) == 3
+    assert second["parent"] == first["version"]
+    assert second["files"]["config.json"] == first["files"]["config.json"]
+    assert [v["version"] for v in registry.list_versions("chronos")] == sorted([first["version"], second["version"]])
+    assert registry.manifest("chronos", first["version"])["metadata"]["high_water_mark"] == "2020-01-01"
+
+
+@mock_aws
+def test_pull_only_downloads_changes_and_rollback_switches_alias(tmp_path):
+    s3, registry = make_registry()
+    write_model(tmp_path / "v1", b"\x01" * 1024)
+    (tmp_path / "v1" / "extra.bin").write_bytes(b"old")
+    first = registry.push("chronos", str(tmp_path / "v1"), aliases=("latest", "production"))
+    write_model(tmp_path / "v2", b"\x02" * 1024)
+    second = registry.push("chronos", str(tmp_path / "v2"), aliases=("latest", "production"))
+
+    local = tmp_path / "local"
+    registry.pull("chronos", "production", str(local))
+    assert (local / "model.safetensors").read_bytes() == b"\x02" * 1024
+
+    # Rollback: point the alias back; only the differing files are fetched again.
+    registry.set_alias("chronos", "production", first["version"])
+    downloads = count_calls(s3, "GetObject")
+    registry.pull("chronos", "production", str(local))
+
+    assert (local / "model.safetensors").read_bytes() == b"\x01" * 1024
+    assert (local / "extra.bin").read_bytes() == b"old"
+    assert registry.list_aliases("chronos") == {"latest": second["version"], "production": first["version"]}
+    # Only the two blobs that differ are fetched; config.json is reused.
+    assert len([key for key in downloads if "/blobs/" in key]) == 2
+
+    registry.set_alias("chronos", "production", second["version"])
+    registry.pull("chronos", "production", str(local))
+    assert not (local / "extra.bin").exists()
+
+
+# --- Despliegue: el alias se resuelve a un model.tar.gz direccionado por contenido ---
+@mock_aws
+def test_archive_is_built_once_per_content(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_registry, "REGISTRY_CACHE_DIR", str(tmp_path / "cache"))
+    s3, registry = make_registry()
+    write_model(tmp_path / "v1", b"\x01" * 1024)
+    first = registry.push("chronos", str(tmp_path / "v1"), aliases=("latest", "production"))
+    write_model(tmp_path / "v2", b"\x02" * 1024)
+    registry.push("chronos", str(tmp_path / "v2"), aliases=("latest", "production"))
+
+    uri = registry.archive("chronos", "production")
+    bucket, _, key = uri[len("s3://"):].partition("/")
+    s3.download_file(bucket, key, str(tmp_path / "model.tar.gz"))
+    with tarfile.open(tmp_path / "model.tar.gz") as tar:
+        assert sorted(tar.getnames()) == ["config.json", "model.safetensors"]
+        assert tar.extractfile("model.safetensors").read() == b"\x02" * 1024
+
+    # Same files, same archive: nothing is pulled or uploaded again.
+    registry.push("chronos", str(tmp_path / "v2"))
+    uploads, downloads = count_calls(s3, "PutObject"), count_calls(s3, "GetObject")
+    assert registry.archive("chronos", "latest") == uri
+    assert uploads == [] and not [k for k in downloads if "/blobs/" in k]
+
+    # Rolling back builds the older archive from the cache, fetching only what differs.
+    registry.set_alias("chronos", "production", first["version"])
+    rollback = registry.archive("chronos", "production")
+    assert rollback != uri and len([k for k in downloads if "/blobs/" in k]) == 1
+    assert registry.archive("chronos", first["version"]) == rollback
@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import time
+import queue
+import multiprocessing as mp
+
+import boto3
+import numpy as np
+import pytest
+from moto import mock_aws
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'deployment')))
+
+import inference
+import monitoring
+from monitoring import Monitor
+from storage import ObjectStore
+
+LEVELS = [0.1, 0.5, 0.9]
+
+
+# --- Lote sintético: 4 series de 64 valores, con relleno de bucket a la izquierda ---
+def make_batch(rng, loc: float = 100.0):
+    series = rng.normal(loc, 10, size=(4, 96)).astype(np.float32)
+    series[:, :32] = np.nan
+    mean = np.full((4, 24), loc, dtype=np.float32)
+    quantiles = np.stack([mean - 12, mean, mean + 12], axis=-1)
+    return series, np.full(4, 64), mean, quantiles
+
+
+def wait_idle(monitor: Monitor):
+    while not monitor._queue.empty():
+        time.sleep(0.01)
+    time.sleep(0.05)
+
+
+def test_statistics_ignore_padding_and_track_drift(tmp_path, monkeypatch):
+    monkeypatch.setattr(monitoring, "MONITOR_REFERENCE", 1000)
+    rng = np.random.default_rng(0)
+    monitor = Monitor(sink_uri=f"file://{tmp_path}", flush_seconds=3600)
+    monitor.start()
+    for _ in range(5):
+        monitor.observe(None, ["a", "b", "c", "d"], *make_batch(rng), LEVELS)
+    wait_idle(monitor)
+
+    summary = monitor.summary()
+    stats = summary["model"]["input"]
+    assert stats["count"] == 5 * 4 * 64 and stats["missing_rate"] == 0
+    assert abs(stats["mean"] - 100) < 1 and abs(stats["std"] - 10) < 1
+    assert abs(stats["p50"] - 100) < 3
+    assert summary["series"]["a"]["count"] == 5 * 64
+
+    # A shifted distribution lands in the window sketch and raises the PSI.
+    monitor.observe(None, ["a", "b", "c", "d"], *make_batch(rng, loc=150.0), LEVELS)
+    monitor.stop()
+    flushed = json.loads(ObjectStore().read(next(tmp_path.rglob("summary-*.json")).as_posix()))
+    assert flushed["model"]["input"]["psi"] > 1
+
+
+def test_actuals_match_their_forecast_id(tmp_path):
+    rng = np.random.default_rng(1)
+    monitor = Monitor(sink_uri=f"file://{tmp_path}", flush_seconds=3600)
+    monitor.start()
+    monitor.observe("f1", ["a", "b", "c", "d"], *make_batch(rng), LEVELS)
+    monitor.observe("f2", ["a", "b", "c", "d"], *make_batch(rng, loc=200.0), LEVELS)
+    # Scored against f1 (mean 100), not the later f2; each forecast is scored once.
+    monitor.observe_actuals("f1", ["a", "unknown"], [[110.0] * 24, [1.0]])
+    monitor.observe_actuals("f1", ["a"], [[110.0] * 24])
+    monitor.observe_actuals("f3", ["b"], [[110.0] * 24])
+    wait_idle(monitor)
+    monitor.stop()
+
+    summary = monitor.summary()
+    assert summary["series"]["a"]["error"]["mae"] == 10.0
+    assert summary["model"]["error"]["n"] == 1
+    assert summary["unmatched_actuals"] == 3
+    assert summary["stored_forecasts"] == 7
+
+
+def test_stored_forecasts_are_bounded(tmp_path):
+    rng = np.random.default_rng(2)
+    monitor = Monitor(sink_uri=f"file://{tmp_path}", flush_seconds=3600, max_forecasts=4)
+    monitor.start()
+    monitor.observe("old", ["a", "b", "c", "d"], *make_batch(rng), LEVELS)
+    monitor.observe("new", ["a", "b", "c", "d"], *make_batch(rng), LEVELS)
+    monitor.observe_actuals("old", ["a"], [[110.0] * 24])
+    wait_idle(monitor)
+    monitor.stop()
+
+    summary = monitor.summary()
+    assert summary["expired_forecasts"] == 4 and summary["stored_forecasts"] == 4
+    assert summary["unmatched_actuals"] == 1
+
+    expiring = Monitor(sink_uri=f"file://{tmp_path}", forecast_ttl=0.0)
+    series, lengths, mean, quantiles = [x[:1] for x in make_batch(rng)]
+    expiring._fold_forecast("f1", ["a"], monitoring.input_summary(series, lengths), mean, quantiles, LEVELS)
+    expiring._fold_actuals("f1", ["a"], [[110.0] * 24])
+    assert expiring.counters["unmatched_actuals"] == 1
+
+
+# --- Varios workers alimentan un único proceso de monitorización ---
+def send_forecast(inbox):
+    monitoring.connect(inbox)
+    monitoring.observe("f1", ["a", "b", "c", "d"], *make_batch(np.random.default_rng(3)), LEVELS)
+
+
+def send_actuals(inbox):
+    monitoring.connect(inbox)
+    monitoring.observe_actuals("f1", ["a"], [[110.0] * 24])
+
+
+def test_actuals_from_another_worker_are_matched(tmp_path, monkeypatch):
+    monkeypatch.setenv("MONITOR_SINK_URI", f"file://{tmp_path}/sink")
+    monkeypatch.setenv("METRICS_INTERVAL_SECONDS", "0")
+    ctx = mp.get_context("spawn")
+    process, inbox = monitoring.start_process(ctx, snapshot_path=str(tmp_path / "latest.json"))
+    for target in (send_forecast, send_actuals):
+        worker = ctx.Process(target=target, args=(inbox,))
+        worker.start()
+        worker.join(30)
+    monitoring.stop_process(process, inbox)
+
+    flushed = json.loads(ObjectStore().read(next((tmp_path / "sink").rglob("summary-*.json")).as_posix()))
+    assert flushed["requests"] == 1 and flushed["actuals"] == 1
+    assert flushed["series"]["a"]["error"]["mae"] == 10.0
+    assert json.loads((tmp_path / "latest.json").read_text())["actuals"] == 1
+
+
+# --- Actuals y resumen a través de /invocations ---
+def invoke(payload: dict) -> dict:
+    data = inference.input_fn(json.dumps(payload), "application/json")
+    return json.loads(inference.output_fn(inference.predict_fn(data, None), "application/json"))
+
+
+def test_actuals_and_summary_through_invocations(tmp_path):
+    with pytest.raises(ValueError, match="Monitoring is disabled"):
+        invoke({"mode": "monitoring"})
+    with pytest.raises(ValueError, match="forecast_id"):
+        invoke({"mode": "actuals", "series_ids": ["a"], "actuals": [[1.0]]})
+    with pytest.raises(ValueError, match="Actuals 0"):
+        invoke({"mode": "actuals", "forecast_id": "f1", "series_ids": ["a"], "actuals": [["1"]]})
+
+    monitor = monitoring.start(sink_uri=f"file://{tmp_path}", flush_seconds=3600)
+    try:
+        monitor.observe("f1", ["a", "b", "c", "d"], *make_batch(np.random.default_rng(4)), LEVELS)
+        response = invoke({"mode": "actuals", "forecast_id": "f1", "series_ids": ["a"], "actuals": [[110.0, None]]})
+        assert response == {"actuals": {"accepted": 1}}
+        wait_idle(monitor)
+        assert invoke({"mode": "monitoring"})["monitoring"]["actuals"] == 1
+    finally:
+        monitoring.stop()
+
+
+# --- La cola solo lleva resúmenes, nunca el contexto completo ---
+def test_request_path_enqueues_summaries_not_contexts():
+    client = monitoring.MonitorClient(queue.Queue())
+    series, lengths, mean, quantiles = make_batch(np.random.default_rng(5))
+    client.observe(None, ["a", "b", "c", "d"], series, lengths, mean, quantiles, LEVELS)
+    client.observe("f1", ["a", "b", "c", "d"], series, lengths, mean, quantiles, LEVELS)
+
+    untracked, tracked = client._queue.get_nowait(), client._queue.get_nowait()
+    count, *_, keys, key_counts = tracked[3]
+    assert count.tolist() == [64] * 4 and key_counts.sum() == 4 * 64
+    assert not any(isinstance(x, np.ndarray) and x.shape == series.shape for x in (*tracked, *tracked[3]))
+    assert untracked[5] is None and tracked[5] is quantiles
+
+
+# --- Existencia de objetos en S3 sin descargarlos ---
+@mock_aws
+def test_object_store_exists_uses_head_requests(tmp_path):
+    s3 = boto3.client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="chronos-monitoring", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    store = ObjectStore(s3)
+    store.write("s3://chronos-monitoring/summary.json", b"{}")
+    reads = []
+    s3.meta.events.register("before-parameter-build.s3.GetObject", lambda params, **kw: reads.append(params["Key"]))
+
+    assert store.exists("s3://chronos-monitoring/summary.json") and not store.exists("s3://chronos-monitoring/missing.json")
+    assert reads == []
+    store.write(str(tmp_path / "latest.json"), b"{}")
+    assert store.exists(f"file://{tmp_path}/latest.json") and not store.exists(str(tmp_path / "missing.json"))
@@ -0,0 +1,57 @@
+import os
+import sys
+import json
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'deployment')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'client')))
+
+import sampling
+from sampling import sample_paths
+from inference import encode_array, input_fn
+from chronos_client import decode_array
+
+LEVELS = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+
+
+# --- Cuantiles sintéticos: tendencia lineal con dispersión constante ---
+def linear_quantiles(batch: int, horizon: int) -> np.ndarray:
+    offsets = np.linspace(-2, 2, len(LEVELS), dtype=np.float32)
+    trend = np.arange(horizon, dtype=np.float32)[:, None] * 10
+    return np.broadcast_to(trend + offsets, (batch, horizon, len(LEVELS))).copy()
+
+
+def test_paths_follow_the_marginals():
+    quantiles = linear_quantiles(batch=3, horizon=12)
+    samples = sample_paths(quantiles, LEVELS, 4000, seed=7)
+
+    assert samples.shape == (3, 4000, 12) and samples.dtype == np.float32
+    empirical = np.quantile(samples[1, :, 5], [0.1, 0.5, 0.9])
+    np.testing.assert_allclose(empirical, quantiles[1, 5, [0, 4, 8]], atol=0.2)
+
+
+def test_seed_is_reproducible_and_paths_are_correlated():
+    quantiles = linear_quantiles(batch=1, horizon=12)
+    first = sample_paths(quantiles, LEVELS, 500, seed=1, correlation=0.9)
+    second = sample_paths(quantiles, LEVELS, 500, seed=1, correlation=0.9)
+
+    np.testing.assert_array_equal(first, second)
+    assert np.corrcoef(first[0, :, 3], first[0, :, 4])[0, 1] > 0.8
+
+
+def test_base64_samples_round_trip():
+    samples = sample_paths(linear_quantiles(batch=2, horizon=4), LEVELS, 10, seed=0)
+    encoded = encode_array(samples, "base64", "float16")
+    np.testing.assert_allclose(decode_array(encoded), samples, rtol=1e-3, atol=1e-2)
+
+
+def test_sample_budget_is_enforced_up_front(monkeypatch):
+    monkeypatch.setattr(sampling, "MAX_SAMPLE_ELEMENTS", 1000)
+    payload = {"series": [[1.0, 2.0, 3.0]] * 4, "prediction_length": 10, "num_samples": 25}
+    assert input_fn(json.dumps(payload), "application/json")["num_samples"] == 25
+
+    payload["num_samples"] = 26
+    with pytest.raises(ValueError, match="exceeds the limit of 1,000"):
+        input_fn(json.dumps(payload), "application/json")
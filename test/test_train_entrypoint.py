@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+import runpy
+import shutil
+import tarfile
+import types
+
+import boto3
+import numpy as np
+import pandas as pd
+from botocore.exceptions import ClientError
+
+TRAINING_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'training'))
+sys.path.append(TRAINING_DIR)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'deployment')))
+
+import artifacts
+
+ENTRYPOINT = os.path.join(TRAINING_DIR, "train_entrypoint.py")
+
+
+# --- Dobles de AutoGluon y S3: el script corre de principio a fin sin ellos ---
+class FakePredictor:
+    fits = []
+
+    def __init__(self, prediction_length, path, target, eval_metric):
+        self.path = path
+
+    def fit(self, train_data, time_limit, hyperparameters):
+        FakePredictor.fits.append({"rows": len(train_data), **hyperparameters["Chronos"]})
+        ckpt = os.path.join(self.path, "models", "Chronos", "W0", artifacts.FINE_TUNED_CKPT)
+        os.makedirs(ckpt)
+        for name in artifacts.WEIGHT_FILES:
+            with open(os.path.join(ckpt, name), "w") as f:
+                f.write("tuned")
+
+
+class FakeS3:
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, bucket, key):
+        return os.path.join(self.root, bucket, key)
+
+    def upload_file(self, local_path, bucket, key):
+        os.makedirs(os.path.dirname(self._path(bucket, key)), exist_ok=True)
+        shutil.copy(local_path, self._path(bucket, key))
+
+    def download_file(self, bucket, key, local_path):
+        shutil.copy(self._path(bucket, key), local_path)
+
+    def get_object(self, Bucket, Key):
+        if not os.path.exists(self._path(Bucket, Key)):
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        return {"Body": open(self._path(Bucket, Key), "rb")}
+
+
+def run_entrypoint(monkeypatch, tmp_path, **env):
+    s3 = FakeS3(str(tmp_path / "s3"))
+    session = types.SimpleNamespace(client=lambda name: s3)
+    monkeypatch.setattr(boto3, "Session", lambda **kwargs: session)
+    timeseries = types.ModuleType("autogluon.timeseries")
+    timeseries.TimeSeriesPredictor = FakePredictor
+    timeseries.TimeSeriesDataFrame = types.SimpleNamespace(from_data_frame=lambda df, **kwargs: df)
+    monkeypatch.setitem(sys.modules, "autogluon", types.ModuleType("autogluon"))
+    monkeypatch.setitem(sys.modules, "autogluon.timeseries", timeseries)
+    for name in ("MODEL_REGISTRY_URI", "KNOWN_COVARIATES", "SM_CHANNEL_TRAINING", "SM_CHANNEL_MODEL"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    runpy.run_path(ENTRYPOINT, run_name="__main__")
+    return s3
+
+
+def write_rows(path, start: int, n: int, mode: str = "w"):
+    t = pd.date_range("2024-01-01", periods=start + n, freq="h")[start:]
+    pd.DataFrame({"Unnamed: 0": t, "ActivePower": np.arange(start, start + n, dtype=float)}).to_csv(
+        path, mode=mode, header=mode == "w", index=False)
+
+
+# --- Humo: el entrypoint se ejecuta entero, primero completo y luego continuado ---
+def test_entrypoint_runs_full_then_continued(tmp_path, monkeypatch):
+    base = tmp_path / "base"
+    base.mkdir()
+    for name in artifacts.WEIGHT_FILES:
+        (base / name).write_text("base")
+    data = tmp_path / "train.csv"
+    write_rows(data, 0, 100)
+    env = dict(BASE_MODEL_PATH=str(base), TRAINING_DATA_PATH=str(data), SM_INPUT_DIR=str(tmp_path / "sm"),
+               TUNNED_MODEL_PATH="s3://bucket/tuned/model.tar.gz", CONTEXT_LENGTH="8", FINE_TUNE_STEPS="200")
+    FakePredictor.fits.clear()
+
+    s3 = run_entrypoint(monkeypatch, tmp_path, **env)
+    with open(s3._path("bucket", "tuned/model.state.json")) as f:
+        state = json.load(f)
+    assert state["mode"] == "full" and state["rows_total"] == 100
+    with tarfile.open(s3._path("bucket", "tuned/model.tar.gz")) as tar:
+        assert {"config.json", "model.safetensors", "training_state.json", "replay_buffer.csv.gz"} <= set(tar.getnames())
+
+    write_rows(data, 100, 20, mode="a")
+    s3 = run_entrypoint(monkeypatch, tmp_path, CONTINUED_TRAINING="1", **env)
+    with open(s3._path("bucket", "tuned/model.state.json")) as f:
+        state = json.load(f)
+    assert state["mode"] == "continued" and state["rows_total"] == 120
+    assert FakePredictor.fits[0]["fine_tune_steps"] == 200
+    assert FakePredictor.fits[1]["model_path"] != str(base) and FakePredictor.fits[1]["fine_tune_steps"] < 200
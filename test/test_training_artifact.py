@@ -0,0 +1,69 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'training')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'deployment')))
+
+import artifacts
+
+BASE_MODEL = os.getenv("CHRONOS_MODEL_PATH", "models/chronos-bolt-tiny")
+
+
+def write_weights(path, tag: str):
+    os.makedirs(path, exist_ok=True)
+    for name in ("config.json", "model.safetensors", "training_args.bin"):
+        with open(os.path.join(path, name), "w") as f:
+            f.write(tag)
+
+
+# --- Estructura de un predictor de AutoGluon con y sin fine-tuning ---
+def test_export_flattens_the_fine_tuned_checkpoint(tmp_path):
+    predictor = tmp_path / "predictor"
+    write_weights(predictor / "models" / "Chronos" / "W0" / "transformers_logs" / "checkpoint-10", "partial")
+    write_weights(predictor / "models" / "Chronos" / "W0" / artifacts.FINE_TUNED_CKPT, "tuned")
+
+    artifact = artifacts.export_serving_model(str(predictor), str(tmp_path / "artifact"))
+    archive = artifacts.compress(artifact, str(tmp_path / "model.tar.gz"))
+    extracted = artifacts.extract_archive(archive)
+
+    model_dir = artifacts.find_chronos_model(extracted)
+    assert model_dir == extracted
+    with open(os.path.join(model_dir, "model.safetensors")) as f:
+        assert f.read() == "tuned"
+    # A predictor directory shipped as-is still resolves to its tuned weights.
+    assert artifacts.find_chronos_model(str(predictor)).endswith(artifacts.FINE_TUNED_CKPT)
+
+
+def test_export_rejects_a_predictor_without_tuned_weights(tmp_path):
+    (tmp_path / "models" / "Chronos" / "W0").mkdir(parents=True)
+    with pytest.raises(FileNotFoundError, match="fine_tune"):
+        artifacts.export_serving_model(str(tmp_path), str(tmp_path / "artifact"))
+    assert artifacts.find_chronos_model(str(tmp_path)) is None
+
+
+# --- Ida y vuelta con un predictor.fit real ---
+def test_real_fit_artifact_serves(tmp_path):
+    timeseries = pytest.importorskip("autogluon.timeseries")
+    pytest.importorskip("chronos")
+    if not os.path.isdir(BASE_MODEL):
+        pytest.skip(f"No Chronos base model at {BASE_MODEL}")
+    import inference
+
+    t = pd.date_range("2024-01-01", periods=400, freq="h")
+    df = pd.DataFrame({"timestamp": t, "item_id": "Turbine_1",
+                       "ActivePower": 500 + 100 * np.sin(np.arange(400) * 2 * np.pi / 24)})
+    predictor = timeseries.TimeSeriesPredictor(prediction_length=24, path=str(tmp_path / "predictor"),
+                                               target="ActivePower")
+    predictor.fit(timeseries.TimeSeriesDataFrame.from_data_frame(df), hyperparameters={
+        "Chronos": {"model_path": BASE_MODEL, "fine_tune": True, "fine_tune_steps": 5},
+    })
+
+    artifact = artifacts.export_serving_model(str(tmp_path / "predictor"), str(tmp_path / "artifact"))
+    extracted = artifacts.extract_archive(artifacts.compress(artifact, str(tmp_path / "model.tar.gz")))
+    model = inference.model_fn(artifacts.find_chronos_model(extracted))
+    arrays = inference.forecast_batch(model, df["ActivePower"].to_numpy(np.float32)[None, -128:], None, 24, [0.5])
+    assert arrays["quantiles"].shape == (1, 24, 1) and np.isfinite(arrays["quantiles"]).all()